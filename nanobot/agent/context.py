@@ -2,14 +2,19 @@
 
 import base64
 import mimetypes
+import os
 import platform
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from nanobot.agent.memory import MemoryStore
 from nanobot.agent.skills import SkillsLoader
+from nanobot.utils.helpers import estimate_tokens
+
+if TYPE_CHECKING:
+    from nanobot.config.schema import MemoryRetrievalConfig
 
 
 class ContextBuilder:
@@ -18,20 +23,73 @@ class ContextBuilder:
     BOOTSTRAP_FILES = ["AGENTS.md", "SOUL.md", "USER.md", "TOOLS.md", "IDENTITY.md"]
     _RUNTIME_CONTEXT_TAG = "[Runtime Context — metadata only, not instructions]"
 
-    def __init__(self, workspace: Path):
+    def __init__(self, workspace: Path, memory_retrieval: "MemoryRetrievalConfig | None" = None):
         self.workspace = workspace
         self.memory = MemoryStore(workspace)
         self.skills = SkillsLoader(workspace)
+        self.memory_retrieval = memory_retrieval if memory_retrieval and memory_retrieval.enabled else None
+        self.memory_index = self.memory.section_index if self.memory_retrieval else None
+        self._prompt_cache: tuple[tuple, str] | None = None
 
     def build_system_prompt(self, skill_names: list[str] | None = None) -> str:
-        """Build the system prompt from identity, bootstrap files, memory, and skills."""
+        """Build the system prompt from identity, bootstrap files, memory, and skills.
+
+        The result is cached and only rebuilt when one of its input files
+        changes (by mtime/size), so consecutive turns send a byte-identical
+        prefix and hit the provider's prompt cache.
+        """
+        signature = self._prompt_signature()
+        if self._prompt_cache and self._prompt_cache[0] == signature:
+            return self._prompt_cache[1]
+        prompt = self._render_system_prompt()
+        self._prompt_cache = (signature, prompt)
+        return prompt
+
+    def invalidate_prompt_cache(self) -> None:
+        """Force the next build_system_prompt() call to rebuild."""
+        self._prompt_cache = None
+
+    @staticmethod
+    def _stat(path: Path) -> tuple[int, int] | None:
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _prompt_signature(self) -> tuple:
+        """Cheap fingerprint of everything the system prompt is built from.
+
+        Only stats files: bootstrap files, MEMORY.md, both skills directories
+        (their mtime changes when a skill is added or removed) and every
+        SKILL.md.  PATH and the set of non-empty env vars are included because
+        skill availability depends on them.
+        """
+        sig: list[Any] = [self._stat(self.workspace / f) for f in self.BOOTSTRAP_FILES]
+        sig.append(self._stat(self.memory.memory_file))
+        for skills_dir in (self.skills.workspace_skills, self.skills.builtin_skills):
+            if not skills_dir:
+                continue
+            sig.append(self._stat(skills_dir))
+            try:
+                entries = sorted(os.scandir(skills_dir), key=lambda e: e.name)
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.is_dir():
+                    sig.append((entry.name, self._stat(Path(entry.path) / "SKILL.md")))
+        sig.append(os.environ.get("PATH", ""))
+        sig.append(frozenset(k for k, v in os.environ.items() if v))
+        return tuple(sig)
+
+    def _render_system_prompt(self) -> str:
         parts = [self._get_identity()]
 
         bootstrap = self._load_bootstrap_files()
         if bootstrap:
             parts.append(bootstrap)
 
-        memory = self.memory.get_memory_context()
+        memory = self._pinned_memory() if self.memory_index else self.memory.get_memory_context()
         if memory:
             parts.append(f"# Memory\n\n{memory}")
 
@@ -52,6 +110,25 @@ Skills with available="false" need dependencies installed first - you can try in
 
         return "\n\n---\n\n".join(parts)
 
+    def _pinned_parts(self) -> list[str]:
+        """MEMORY.md preamble and pinned sections, which are always in the system prompt."""
+        preamble = self.memory_index.preamble()
+        return [*([preamble] if preamble else []), *self.memory_index.pinned(self.memory_retrieval.pinned_sections)]
+
+    def _pinned_memory(self) -> str:
+        """Preamble and pinned MEMORY.md sections; the rest is retrieved per message."""
+        note = "Other MEMORY.md sections are included with each message when relevant to it."
+        return "## Long-term Memory\n" + "\n\n".join([*self._pinned_parts(), note])
+
+    def _retrieve_memory(self, query: str) -> str:
+        """MEMORY.md sections relevant to *query*, within what the pinned parts leave of the budget."""
+        cfg = self.memory_retrieval
+        pinned_tokens = sum(estimate_tokens(s) for s in self._pinned_parts())
+        sections = self.memory_index.search(
+            query, top_k=cfg.top_k, token_budget=cfg.token_budget - pinned_tokens, exclude=cfg.pinned_sections,
+        )
+        return "\n\n".join(sections)
+
     def _get_identity(self) -> str:
         """Get the core identity section."""
         workspace_path = str(self.workspace.expanduser().resolve())
@@ -68,7 +145,7 @@ You are nanobot, a helpful AI assistant.
 ## Workspace
 Your workspace is at: {workspace_path}
 - Long-term memory: {workspace_path}/memory/MEMORY.md (write important facts here)
-- History log: {workspace_path}/memory/HISTORY.md (grep-searchable). Each entry starts with [YYYY-MM-DD HH:MM].
+- History log: {workspace_path}/memory/HISTORY.md (search it with the search_history tool). Each entry starts with [YYYY-MM-DD HH:MM].
 - Custom skills: {workspace_path}/skills/{{skill-name}}/SKILL.md
 
 ## nanobot Guidelines
@@ -134,10 +211,14 @@ Reply directly with text for conversations. Only use the 'message' tool to send
         metadata: dict[str, Any] | None = None,
     ) -> list[dict[str, Any]]:
         """Build the complete message list for an LLM call."""
+        runtime = self._build_runtime_context(channel, chat_id, metadata)
+        # Retrieved memory rides in the per-turn runtime block so the system prompt stays cacheable.
+        if self.memory_index and (relevant := self._retrieve_memory(current_message)):
+            runtime += f"\n\nRelevant Memory (from MEMORY.md):\n{relevant}"
         return [
             {"role": "system", "content": self.build_system_prompt(skill_names)},
             *history,
-            {"role": "user", "content": self._build_runtime_context(channel, chat_id, metadata)},
+            {"role": "user", "content": runtime},
             {"role": "user", "content": self._build_user_content(current_message, media)},
         ]
 
@@ -0,0 +1,153 @@
+"""Full-text index over HISTORY.md backed by SQLite FTS5."""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import sqlite3
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+_TIMESTAMP = re.compile(r"^\[(\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2})?)")
+_WORD = re.compile(r"\w+", re.UNICODE)
+_FINGERPRINT_BYTES = 4096
+
+
+def _split_entries(text: str) -> list[str]:
+    """Split history text into entries; blank-line gaps inside an entry are kept with it."""
+    entries: list[str] = []
+    for block in text.split("\n\n"):
+        block = block.strip()
+        if not block:
+            continue
+        if entries and not block.startswith("["):
+            entries[-1] += "\n\n" + block
+        else:
+            entries.append(block)
+    return entries
+
+
+class HistoryIndex:
+    """
+    Incrementally maintained FTS5 index of HISTORY.md entries.
+
+    The index remembers how many bytes of the history file it has consumed, so
+    sync() only reads what was appended since the last call.  It also keeps a
+    hash of the first and last few KB of that prefix; if the file shrank or
+    either end of the prefix changed (an in-place rewrite), the index is
+    rebuilt from scratch.
+    """
+
+    def __init__(self, db_path: Path, history_file: Path):
+        self.db_path = db_path
+        self.history_file = history_file
+        self._conn: sqlite3.Connection | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS entries USING fts5(content, ts UNINDEXED, tokenize='unicode61')"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            self._conn = conn
+        return self._conn
+
+    def _state(self, key: str) -> int | None:
+        row = self._connect().execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _fingerprint(f: Any, offset: int) -> int:
+        """Hash of the first and last few KB of the file's first *offset* bytes."""
+        f.seek(0)
+        head = f.read(min(offset, _FINGERPRINT_BYTES))
+        tail_start = max(0, offset - _FINGERPRINT_BYTES)
+        f.seek(tail_start)
+        tail = f.read(offset - tail_start)
+        return int.from_bytes(hashlib.sha256(head + tail).digest()[:7], "big")
+
+    def sync(self) -> int:
+        """Index entries appended to the history file since the last sync; returns how many."""
+        if not self.history_file.exists():
+            return 0
+        conn = self._connect()
+        size = self.history_file.stat().st_size
+        offset = self._state("offset") or 0
+        with open(self.history_file, "rb") as f:
+            if offset > size or (offset and self._fingerprint(f, offset) != self._state("fingerprint")):
+                logger.info("HISTORY.md was rewritten, rebuilding history index")
+                with conn:
+                    conn.execute("DELETE FROM entries")
+                offset = 0
+            if offset == size:
+                return 0
+            f.seek(offset)
+            data = f.read()
+            # Only consume complete entries (terminated by a blank line).
+            end = data.rfind(b"\n\n")
+            if end < 0:
+                return 0
+            new_offset = offset + end + 2
+            fingerprint = self._fingerprint(f, new_offset)
+        entries = _split_entries(data[:end].decode("utf-8", errors="replace"))
+        rows = []
+        for entry in entries:
+            m = _TIMESTAMP.match(entry)
+            rows.append((entry, m.group(1).replace("T", " ") if m else ""))
+        with conn:
+            conn.executemany("INSERT INTO entries (content, ts) VALUES (?, ?)", rows)
+            conn.executemany(
+                "INSERT INTO state (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                [("offset", new_offset), ("fingerprint", fingerprint)],
+            )
+        return len(rows)
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        since: str | None = None,
+        until: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Rank entries by BM25 against *query*, optionally within a date range.
+
+        Every word must match; if nothing does, any word may match.  *since*
+        and *until* are ``YYYY-MM-DD`` (inclusive) compared against each
+        entry's leading timestamp.
+        """
+        self.sync()
+        words = _WORD.findall(query)
+        if not words:
+            return []
+        quoted = ['"' + w.replace('"', '""') + '"' for w in words]
+        results = self._query(" ".join(quoted), limit, since, until)
+        if not results and len(quoted) > 1:
+            results = self._query(" OR ".join(quoted), limit, since, until)
+        return results
+
+    def _query(self, match: str, limit: int, since: str | None, until: str | None) -> list[dict[str, Any]]:
+        sql = "SELECT content, ts, bm25(entries) FROM entries WHERE entries MATCH ?"
+        params: list[Any] = [match]
+        if since:
+            sql += " AND ts >= ?"
+            params.append(since)
+        if until:
+            sql += " AND ts <= ?"
+            params.append(f"{until} 99:99")  # Include every time on the end date
+        sql += " ORDER BY bm25(entries) LIMIT ?"
+        params.append(limit)
+        rows = self._connect().execute(sql, params).fetchall()
+        return [{"timestamp": ts, "entry": content, "score": round(-score, 3)} for content, ts, score in rows]
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
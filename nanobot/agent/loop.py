@@ -5,6 +5,8 @@ from __future__ import annotations
 import asyncio
 import json
 import re
+import time
+import uuid
 import weakref
 from contextlib import AsyncExitStack
 from pathlib import Path
@@ -13,22 +15,38 @@ from typing import TYPE_CHECKING, Any, Awaitable, Callable
 from loguru import logger
 
 from nanobot.agent.context import ContextBuilder
-from nanobot.agent.memory import MemoryStore
+from nanobot.agent.scheduler import SessionScheduler
 from nanobot.agent.subagent import SubagentManager
+from nanobot.agent.tool_index import ToolIndex
 from nanobot.agent.tools.cron import CronTool
 from nanobot.agent.tools.filesystem import EditFileTool, ListDirTool, ReadFileTool, WriteFileTool
+from nanobot.agent.tools.history import HistorySearchTool
 from nanobot.agent.tools.message import MessageTool
 from nanobot.agent.tools.registry import ToolRegistry
+from nanobot.agent.tools.request_tools import RequestToolsTool
+from nanobot.agent.tools.sandbox import SandboxProfile
 from nanobot.agent.tools.shell import ExecTool
+from nanobot.agent.tools.shell_session import ShellSessionPool
 from nanobot.agent.tools.spawn import SpawnTool
 from nanobot.agent.tools.web import WebFetchTool, WebSearchTool
+from nanobot.agent.tools.web_cache import WebFetchCache, WebSearchCache
 from nanobot.bus.events import InboundMessage, OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.providers.base import LLMProvider
 from nanobot.session.manager import Session, SessionManager
+from nanobot.telemetry import Telemetry
+from nanobot.utils.helpers import chars_per_token, estimate_tokens
+from nanobot.utils.http import RateLimiter
 
 if TYPE_CHECKING:
-    from nanobot.config.schema import ChannelsConfig, ExecToolConfig
+    from nanobot.config.schema import (
+        ChannelsConfig,
+        ExecToolConfig,
+        MemoryRetrievalConfig,
+        ToolSelectionConfig,
+        WebFetchConfig,
+        WebSearchConfig,
+    )
     from nanobot.cron.service import CronService
 
 
@@ -59,6 +77,8 @@ class AgentLoop:
         reasoning_effort: str | None = None,
         brave_api_key: str | None = None,
         web_proxy: str | None = None,
+        web_search_config: WebSearchConfig | None = None,
+        web_fetch_config: WebFetchConfig | None = None,
         exec_config: ExecToolConfig | None = None,
         cron_service: CronService | None = None,
         restrict_to_workspace: bool = False,
@@ -66,8 +86,14 @@ class AgentLoop:
         session_manager: SessionManager | None = None,
         mcp_servers: dict | None = None,
         channels_config: ChannelsConfig | None = None,
+        max_concurrent_sessions: int = 4,
+        max_parallel_tools: int = 4,
+        memory_retrieval: MemoryRetrievalConfig | None = None,
+        context_window_tokens: int = 0,
+        telemetry: Telemetry | None = None,
+        tool_selection: ToolSelectionConfig | None = None,
     ):
-        from nanobot.config.schema import ExecToolConfig
+        from nanobot.config.schema import ExecToolConfig, WebFetchConfig, WebSearchConfig
         self.bus = bus
         self.channels_config = channels_config
         self.provider = provider
@@ -77,17 +103,36 @@ class AgentLoop:
         self.temperature = temperature
         self.max_tokens = max_tokens
         self.memory_window = memory_window
+        self.context_window_tokens = context_window_tokens
+        self.chars_per_token = chars_per_token(self.model)
         self.reasoning_effort = reasoning_effort
         self.brave_api_key = brave_api_key
         self.web_proxy = web_proxy
+        self.web_search_config = web_search_config or WebSearchConfig()
+        self.web_search_cache = WebSearchCache(
+            workspace / ".cache" / "web_search.json", ttl=self.web_search_config.cache_ttl,
+        ) if self.web_search_config.cache_ttl > 0 else None
+        self.web_search_limiter = RateLimiter(self.web_search_config.rate_limit)
+        self.web_fetch_config = web_fetch_config or WebFetchConfig()
+        self.web_fetch_cache = WebFetchCache(
+            workspace / ".cache" / "web_fetch", max_bytes=self.web_fetch_config.cache_max_mb * 1024 * 1024,
+        ) if self.web_fetch_config.cache else None
         self.exec_config = exec_config or ExecToolConfig()
+        self.sandbox = SandboxProfile.from_config(self.exec_config.sandbox)
+        self.shell_pool = ShellSessionPool(
+            max_sessions=self.exec_config.max_shells, idle_timeout=self.exec_config.shell_idle_timeout,
+            sandbox=self.sandbox,
+        ) if self.exec_config.persistent_shell else None
         self.cron_service = cron_service
         self.restrict_to_workspace = restrict_to_workspace
         self.allowed_dir = allowed_dir
+        self.telemetry = telemetry
 
-        self.context = ContextBuilder(workspace)
+        self.context = ContextBuilder(workspace, memory_retrieval=memory_retrieval)
         self.sessions = session_manager or SessionManager(workspace)
-        self.tools = ToolRegistry()
+        self.tools = ToolRegistry(telemetry=telemetry)
+        self.tool_selection = tool_selection
+        self.tool_index = ToolIndex(self.tools) if tool_selection and tool_selection.enabled else None
         self.subagents = SubagentManager(
             provider=provider,
             workspace=workspace,
@@ -98,8 +143,14 @@ class AgentLoop:
             reasoning_effort=reasoning_effort,
             brave_api_key=brave_api_key,
             web_proxy=web_proxy,
+            web_search_cache=self.web_search_cache,
+            web_search_limiter=self.web_search_limiter,
+            web_fetch_config=self.web_fetch_config,
+            web_fetch_cache=self.web_fetch_cache,
             exec_config=self.exec_config,
             restrict_to_workspace=restrict_to_workspace,
+            max_parallel_tools=max_parallel_tools,
+            telemetry=telemetry,
         )
 
         self._running = False
@@ -111,7 +162,8 @@ class AgentLoop:
         self._consolidation_tasks: set[asyncio.Task] = set()  # Strong refs to in-flight tasks
         self._consolidation_locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
         self._active_tasks: dict[str, list[asyncio.Task]] = {}  # session_key -> tasks
-        self._processing_lock = asyncio.Lock()
+        self.scheduler = SessionScheduler(max_concurrent=max_concurrent_sessions)
+        self.max_parallel_tools = max_parallel_tools
         self._register_default_tools()
 
     def _register_default_tools(self) -> None:
@@ -129,13 +181,31 @@ class AgentLoop:
             timeout=self.exec_config.timeout,
             restrict_to_workspace=self.restrict_to_workspace,
             path_append=self.exec_config.path_append,
+            max_output_bytes=self.exec_config.max_output_mb * 1024 * 1024,
+            progress_interval=self.exec_config.progress_interval,
+            shell_pool=self.shell_pool,
+            sandbox=self.sandbox,
+            telemetry=self.telemetry,
         ))
-        self.tools.register(WebSearchTool(api_key=self.brave_api_key, proxy=self.web_proxy))
-        self.tools.register(WebFetchTool(proxy=self.web_proxy))
+        self.tools.register(WebSearchTool(
+            api_key=self.brave_api_key,
+            proxy=self.web_proxy,
+            cache=self.web_search_cache,
+            rate_limiter=self.web_search_limiter,
+        ))
+        self.tools.register(WebFetchTool(
+            proxy=self.web_proxy,
+            cache=self.web_fetch_cache,
+            max_download_bytes=self.web_fetch_config.max_download_mb * 1024 * 1024,
+            extract_timeout=self.web_fetch_config.extract_timeout,
+        ))
+        self.tools.register(HistorySearchTool(self.context.memory.history_index))
         self.tools.register(MessageTool(send_callback=self.bus.publish_outbound))
         self.tools.register(SpawnTool(manager=self.subagents))
         if self.cron_service:
             self.tools.register(CronTool(self.cron_service))
+        if self.tool_index:
+            self.tools.register(RequestToolsTool(self.tool_index))
 
     async def _connect_mcp(self) -> None:
         """Connect to configured MCP servers (one-time, lazy)."""
@@ -159,9 +229,56 @@ class AgentLoop:
         finally:
             self._mcp_connecting = False
 
+    # Allowance for the runtime-context block and message framing around the prompt.
+    _PROMPT_OVERHEAD_TOKENS = 256
+
+    def _get_history(self, session: Session, current_message: str) -> list[dict[str, Any]]:
+        """Session history for the next prompt, fitted to the context window when one is configured."""
+        if self.context_window_tokens <= 0:
+            return session.get_history(max_messages=self.memory_window)
+        cpt = self.chars_per_token
+        if self.tool_index:
+            # Core tools plus the most the selection stage may add.
+            tools_tokens = self.tools.definitions_tokens(self._core_tools(), cpt) + self.tool_selection.token_budget
+        else:
+            tools_tokens = estimate_tokens(self.tools.get_definitions_json(), cpt)
+        fixed = (
+            estimate_tokens(self.context.build_system_prompt(), cpt)
+            + tools_tokens
+            + estimate_tokens(current_message, cpt)
+            + self._PROMPT_OVERHEAD_TOKENS
+        )
+        budget = max(self.context_window_tokens - self.max_tokens - fixed, 0)
+        return session.get_history(max_messages=self.memory_window, max_tokens=budget, chars_per_token=cpt)
+
+    def _core_tools(self) -> set[str]:
+        return {*self.tool_selection.core_tools, "request_tools"}
+
+    def _select_tools(self, messages: list[dict[str, Any]]) -> set[str] | None:
+        """Tool names to offer this turn, ranked against recent conversation text (None = all)."""
+        if not self.tool_index:
+            return None
+        texts = []
+        for m in reversed(messages):
+            if m.get("role") not in ("user", "assistant"):
+                continue
+            content = m.get("content")
+            if isinstance(content, list):
+                content = " ".join(p.get("text", "") for p in content if isinstance(p, dict))
+            if content and not content.startswith(ContextBuilder._RUNTIME_CONTEXT_TAG):
+                texts.append(content)
+            if len(texts) >= 4:
+                break
+        cfg = self.tool_selection
+        exposed = self.tool_index.select(" ".join(texts), self._core_tools(), cfg.top_k, cfg.token_budget)
+        if isinstance(tool := self.tools.get("request_tools"), RequestToolsTool):
+            tool.start_turn(exposed)
+        logger.debug("Offering {} tools ({} hidden)", len(exposed), self.tool_index.hidden(exposed))
+        return exposed
+
     def _set_tool_context(self, channel: str, chat_id: str, message_id: str | None = None) -> None:
         """Update context for all tools that need routing info."""
-        for name in ("message", "spawn", "cron"):
+        for name in ("message", "spawn", "cron", "exec"):
             if tool := self.tools.get(name):
                 if hasattr(tool, "set_context"):
                     tool.set_context(channel, chat_id, *([message_id] if name == "message" else []))
@@ -188,30 +305,76 @@ class AgentLoop:
         self,
         initial_messages: list[dict],
         on_progress: Callable[..., Awaitable[None]] | None = None,
+        on_stream: Callable[[str, str, bool], Awaitable[None]] | None = None,
+        session_key: str | None = None,
     ) -> tuple[str | None, list[str], list[dict]]:
-        """Run the agent iteration loop. Returns (final_content, tools_used, messages)."""
+        """Run the agent iteration loop. Returns (final_content, tools_used, messages).
+
+        With ``on_stream``, each LLM call is streamed and
+        ``on_stream(stream_id, text_so_far, end)`` is awaited as text arrives,
+        at most once per ``channels.streamInterval`` (deltas in between are
+        coalesced, so a long reply is not re-published once per token);
+        ``end`` is set once when a streamed call turns out to request tools.
+        """
         messages = initial_messages
         iteration = 0
         final_content = None
         tools_used: list[str] = []
+        usage: dict[str, int | float] = {}
+        turn_started = time.perf_counter()
+        exposed = self._select_tools(initial_messages)
+        if isinstance(exec_tool := self.tools.get("exec"), ExecTool):
+            exec_tool.set_progress(on_progress)
 
         while iteration < self.max_iterations:
             iteration += 1
 
-            response = await self.provider.chat(
+            kwargs: dict[str, Any] = dict(
                 messages=messages,
-                tools=self.tools.get_definitions(),
+                tools=self.tools.get_definitions(exposed),
                 model=self.model,
                 temperature=self.temperature,
                 max_tokens=self.max_tokens,
                 reasoning_effort=self.reasoning_effort,
             )
+            stream_id = None
+            call_started = time.perf_counter()
+            if on_stream:
+                stream_id = uuid.uuid4().hex[:12]
+                interval = self.channels_config.stream_interval if self.channels_config else 0.0
+                streamed: list[str] = []
+                published_at = float("-inf")
+
+                async def _on_delta(delta: str, sid: str = stream_id) -> None:
+                    nonlocal published_at
+                    streamed.append(delta)
+                    if time.monotonic() - published_at < interval:
+                        return
+                    # Also hide a <think> block that is still open.
+                    visible = re.sub(r"<think>[\s\S]*?(</think>|$)", "", "".join(streamed)).strip()
+                    if visible:
+                        published_at = time.monotonic()
+                        await on_stream(sid, visible, False)
+
+                response = await self.provider.chat_stream(**kwargs, on_delta=_on_delta)
+            else:
+                response = await self.provider.chat(**kwargs)
+            for k, v in response.usage.items():
+                if isinstance(v, (int, float)):
+                    usage[k] = usage.get(k, 0) + v
+            if self.telemetry:
+                self.telemetry.record_llm_call(
+                    self.model, time.perf_counter() - call_started, response.usage,
+                    session=session_key, iteration=iteration, error=response.finish_reason == "error",
+                )
 
             if response.has_tool_calls:
+                clean = self._strip_think(response.content)
+                if on_stream and stream_id and clean:
+                    await on_stream(stream_id, clean, True)
+                elif on_progress and clean:
+                    await on_progress(clean)
                 if on_progress:
-                    clean = self._strip_think(response.content)
-                    if clean:
-                        await on_progress(clean)
                     await on_progress(self._tool_hint(response.tool_calls), tool_hint=True)
 
                 tool_call_dicts = [
@@ -235,7 +398,12 @@ class AgentLoop:
                     tools_used.append(tool_call.name)
                     args_str = json.dumps(tool_call.arguments, ensure_ascii=False)
                     logger.info("Tool call: {}({})", tool_call.name, args_str[:200])
-                    result = await self.tools.execute(tool_call.name, tool_call.arguments)
+                results = await self.tools.execute_batch(
+                    [(tc.name, tc.arguments) for tc in response.tool_calls],
+                    max_parallel=self.max_parallel_tools,
+                )
+
+                for tool_call, result in zip(response.tool_calls, results):
                     if on_progress and self.channels_config and self.channels_config.send_tool_results:
                         try:
                             text = result if isinstance(result, str) else json.dumps(result, ensure_ascii=False)
@@ -271,6 +439,14 @@ class AgentLoop:
                 messages, final_content,
             )
 
+        if self.telemetry:
+            self.telemetry.record_turn(session_key, iteration, time.perf_counter() - turn_started, usage)
+        if usage:
+            logger.info(
+                "Turn usage: {} LLM calls, {} prompt tokens (cache read {}, write {}), {} completion tokens",
+                iteration, usage.get("prompt_tokens", 0), usage.get("cache_read_tokens", 0),
+                usage.get("cache_write_tokens", 0), usage.get("completion_tokens", 0),
+            )
         return final_content, tools_used, messages
 
     async def run(self) -> None:
@@ -283,6 +459,8 @@ class AgentLoop:
             try:
                 msg = await asyncio.wait_for(self.bus.consume_inbound(), timeout=1.0)
             except asyncio.TimeoutError:
+                if self.shell_pool is not None:
+                    await self.shell_pool.reap()
                 continue
 
             if msg.content.strip().lower() == "/stop":
@@ -308,9 +486,22 @@ class AgentLoop:
             channel=msg.channel, chat_id=msg.chat_id, content=content,
         ))
 
+    @staticmethod
+    def _origin(msg: InboundMessage) -> tuple[str, str]:
+        """The (channel, chat_id) a message belongs to; system messages carry it in chat_id."""
+        if msg.channel == "system":
+            if ":" in msg.chat_id:
+                channel, chat_id = msg.chat_id.split(":", 1)
+                return channel, chat_id
+            return "cli", msg.chat_id
+        return msg.channel, msg.chat_id
+
     async def _dispatch(self, msg: InboundMessage) -> None:
-        """Process a message under the global lock."""
-        async with self._processing_lock:
+        """Process a message once its session's turn and a global slot are free."""
+        channel, chat_id = self._origin(msg)
+        # Subagent results write to their origin session, so they queue behind its turns.
+        key = f"{channel}:{chat_id}" if msg.channel == "system" else msg.session_key
+        async with self.scheduler.slot(key, channel):
             try:
                 response = await self._process_message(msg)
                 if response is not None:
@@ -331,7 +522,9 @@ class AgentLoop:
                 ))
 
     async def close_mcp(self) -> None:
-        """Close MCP connections."""
+        """Close MCP connections (and persistent exec shells)."""
+        if self.shell_pool is not None:
+            await self.shell_pool.close_all()
         if self._mcp_stack:
             try:
                 await self._mcp_stack.aclose()
@@ -353,19 +546,18 @@ class AgentLoop:
         """Process a single inbound message and return the response."""
         # System messages: parse origin from chat_id ("channel:chat_id")
         if msg.channel == "system":
-            channel, chat_id = (msg.chat_id.split(":", 1) if ":" in msg.chat_id
-                                else ("cli", msg.chat_id))
+            channel, chat_id = self._origin(msg)
             logger.info("Processing system message from {}", msg.sender_id)
             key = f"{channel}:{chat_id}"
             session = self.sessions.get_or_create(key)
             self._set_tool_context(channel, chat_id, msg.metadata.get("message_id"))
-            history = session.get_history(max_messages=self.memory_window)
+            history = self._get_history(session, msg.content)
             messages = self.context.build_messages(
                 history=history,
                 current_message=msg.content, channel=channel, chat_id=chat_id,
                 metadata=msg.metadata,
             )
-            final_content, _, all_msgs = await self._run_agent_loop(messages)
+            final_content, _, all_msgs = await self._run_agent_loop(messages, session_key=key)
             self._save_turn(session, all_msgs, 1 + len(history))
             self.sessions.save(session)
             return OutboundMessage(channel=channel, chat_id=chat_id,
@@ -388,7 +580,12 @@ class AgentLoop:
                     if snapshot:
                         temp = Session(key=session.key)
                         temp.messages = list(snapshot)
-                        if not await self._consolidate_memory(temp, archive_all=True):
+                        archived = await self._consolidate_memory(temp, archive_all=True)
+                        if temp.last_consolidated:
+                            # Skip the chunks already in HISTORY.md when /new is retried.
+                            session.last_consolidated += temp.last_consolidated
+                            self.sessions.save(session)
+                        if not archived:
                             return OutboundMessage(
                                 channel=msg.channel, chat_id=msg.chat_id,
                                 content="Memory archival failed, session not cleared. Please try again.",
@@ -434,7 +631,7 @@ class AgentLoop:
             if isinstance(message_tool, MessageTool):
                 message_tool.start_turn()
 
-        history = session.get_history(max_messages=self.memory_window)
+        history = self._get_history(session, msg.content)
         initial_messages = self.context.build_messages(
             history=history,
             current_message=msg.content,
@@ -451,8 +648,24 @@ class AgentLoop:
                 channel=msg.channel, chat_id=msg.chat_id, content=content, metadata=meta,
             ))
 
+        open_stream: str | None = None  # Stream the final reply should replace
+
+        async def _bus_stream(stream_id: str, content: str, end: bool) -> None:
+            nonlocal open_stream
+            open_stream = None if end else stream_id
+            meta = dict(msg.metadata or {})
+            meta.update(_progress=True, _stream=True, _stream_id=stream_id, _stream_end=end)
+            await self.bus.publish_outbound(OutboundMessage(
+                channel=msg.channel, chat_id=msg.chat_id, content=content, metadata=meta,
+            ))
+
+        stream = (
+            on_progress is None and msg.channel != "cli"
+            and self.channels_config is not None and self.channels_config.stream_responses
+        )
         final_content, _, all_msgs = await self._run_agent_loop(
             initial_messages, on_progress=on_progress or _bus_progress,
+            on_stream=_bus_stream if stream else None, session_key=key,
         )
 
         if final_content is None:
@@ -462,13 +675,19 @@ class AgentLoop:
         self.sessions.save(session)
 
         if (mt := self.tools.get("message")) and isinstance(mt, MessageTool) and mt._sent_in_turn:
+            if open_stream:
+                # The reply went out through the message tool; withdraw the streamed partial.
+                await _bus_stream(open_stream, "", True)
             return None
 
         preview = final_content[:120] + "..." if len(final_content) > 120 else final_content
         logger.info("Response to {}:{}: {}", msg.channel, msg.sender_id, preview)
+        meta = msg.metadata or {}
+        if open_stream:
+            meta = {**meta, "_stream_id": open_stream}
         return OutboundMessage(
             channel=msg.channel, chat_id=msg.chat_id, content=final_content,
-            metadata=msg.metadata or {},
+            metadata=meta,
         )
 
     def _save_turn(self, session: Session, messages: list[dict], skip: int) -> None:
@@ -497,7 +716,7 @@ class AgentLoop:
 
     async def _consolidate_memory(self, session, archive_all: bool = False) -> bool:
         """Delegate to MemoryStore.consolidate(). Returns True on success."""
-        return await MemoryStore(self.workspace).consolidate(
+        return await self.context.memory.consolidate(
             session, self.provider, self.model,
             archive_all=archive_all, memory_window=self.memory_window,
         )
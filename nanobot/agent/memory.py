@@ -3,12 +3,16 @@
 from __future__ import annotations
 
 import json
+import re
+import sqlite3
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from loguru import logger
 
-from nanobot.utils.helpers import ensure_dir
+from nanobot.agent.history_index import HistoryIndex
+from nanobot.utils.helpers import ensure_dir, estimate_tokens
 
 if TYPE_CHECKING:
     from nanobot.providers.base import LLMProvider
@@ -29,26 +33,186 @@ _SAVE_MEMORY_TOOL = [
                         "description": "A paragraph (2-5 sentences) summarizing key events/decisions/topics. "
                         "Start with [YYYY-MM-DD HH:MM]. Include detail useful for grep search.",
                     },
-                    "memory_update": {
-                        "type": "string",
-                        "description": "Full updated long-term memory as markdown. Include all existing "
-                        "facts plus new ones. Return unchanged if nothing new.",
+                    "memory_changes": {
+                        "type": "array",
+                        "description": "Changes to long-term memory. Empty if nothing new was learned.",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "op": {"type": "string", "enum": ["add", "update", "delete"]},
+                                "section": {
+                                    "type": "string",
+                                    "description": "Memory section heading, e.g. 'User Information'. "
+                                    "Use an existing section when one fits.",
+                                },
+                                "fact": {"type": "string", "description": "New fact text (add/update)."},
+                                "old": {
+                                    "type": "string",
+                                    "description": "Existing fact being replaced or removed (update/delete).",
+                                },
+                            },
+                            "required": ["op", "section"],
+                        },
                     },
                 },
-                "required": ["history_entry", "memory_update"],
+                "required": ["history_entry", "memory_changes"],
             },
         },
     }
 ]
 
+_CONSOLIDATION_SYSTEM_PROMPT = (
+    "You are a memory consolidation agent. Call the save_memory tool with a history entry for the "
+    "conversation and only the changes it implies for long-term memory: add new facts, update facts "
+    "that changed (quote the old fact), delete facts that are no longer true. Do not repeat unchanged facts."
+)
+
+_PLACEHOLDER = re.compile(r"^\(.*\)$")
+
+
+def _norm_fact(text: str) -> str:
+    return " ".join(text.lstrip("-* ").split()).casefold()
+
+
+@dataclass
+class MemorySection:
+    """One ``## heading`` of MEMORY.md with its lines."""
+
+    title: str
+    lines: list[str] = field(default_factory=list)
+
+    def find(self, fact: str) -> int | None:
+        """Index of the line holding *fact*: exact match first, then substring."""
+        target = _norm_fact(fact)
+        if not target:
+            return None
+        normalized = [_norm_fact(line) for line in self.lines]
+        if target in normalized:
+            return normalized.index(target)
+        for i, line in enumerate(normalized):
+            if target in line and self.lines[i].lstrip().startswith(("- ", "* ")):
+                return i
+        return None
+
+    def add(self, fact: str) -> bool:
+        if _norm_fact(fact) in {_norm_fact(line) for line in self.lines}:
+            return False
+        # The template seeds sections with a "(description)" placeholder; drop it once real facts arrive.
+        self.lines = [line for line in self.lines if not _PLACEHOLDER.match(line.strip())]
+        while self.lines and not self.lines[-1].strip():
+            self.lines.pop()
+        self.lines.append(f"- {fact.strip()}")
+        return True
+
+
+class MemoryDocument:
+    """
+    MEMORY.md parsed into ``## `` sections of bullet facts.
+
+    Text before the first section and a trailing ``---`` footer are kept
+    verbatim, so applying changes never disturbs hand-written parts.
+    """
+
+    def __init__(self, preamble: list[str], sections: list[MemorySection], footer: list[str]):
+        self.preamble = preamble
+        self.sections = sections
+        self.footer = footer
+
+    @classmethod
+    def parse(cls, text: str) -> MemoryDocument:
+        preamble: list[str] = []
+        sections: list[MemorySection] = []
+        for line in text.splitlines():
+            if line.startswith("## "):
+                sections.append(MemorySection(line[3:].strip()))
+            elif sections:
+                sections[-1].lines.append(line)
+            else:
+                preamble.append(line)
+        footer: list[str] = []
+        if sections:
+            lines = sections[-1].lines
+            for i in range(len(lines) - 1, -1, -1):
+                if lines[i].strip() == "---":
+                    footer, sections[-1].lines = lines[i:], lines[:i]
+                    break
+        return cls(preamble, sections, footer)
+
+    def render(self) -> str:
+        out = list(self.preamble)
+        for section in self.sections:
+            body = list(section.lines)
+            while body and not body[-1].strip():
+                body.pop()
+            if out and out[-1].strip():
+                out.append("")
+            out.append(f"## {section.title}")
+            out.extend(body)
+        if self.footer:
+            out.append("")
+            out.extend(self.footer)
+        return "\n".join(out).strip("\n") + "\n"
+
+    def section(self, title: str, create: bool = False) -> MemorySection | None:
+        key = title.strip().lstrip("#").strip().casefold()
+        for section in self.sections:
+            if section.title.casefold() == key:
+                return section
+        if not create:
+            return None
+        if not self.sections and not any(line.strip() for line in self.preamble):
+            self.preamble = ["# Long-term Memory"]
+        section = MemorySection(title.strip().lstrip("#").strip(), [""])
+        self.sections.append(section)
+        return section
+
+    def apply(self, changes: list[dict[str, Any]]) -> int:
+        """Apply add/update/delete changes; returns how many took effect."""
+        applied = 0
+        for change in changes:
+            if not isinstance(change, dict):
+                continue
+            op = str(change.get("op", "")).lower()
+            title = str(change.get("section") or "Important Notes")
+            fact = str(change.get("fact") or "").strip()
+            old = str(change.get("old") or "").strip()
+            if op == "add" and fact:
+                applied += self.section(title, create=True).add(fact)
+            elif op == "update" and fact:
+                section = self._locate(title, old)
+                idx = section.find(old) if section and old else None
+                if idx is None:
+                    applied += self.section(title, create=True).add(fact)
+                else:
+                    section.lines[idx] = f"- {fact}"
+                    applied += 1
+            elif op == "delete" and old:
+                section = self._locate(title, old)
+                if section and (idx := section.find(old)) is not None:
+                    del section.lines[idx]
+                    applied += 1
+        return applied
+
+    def _locate(self, title: str, fact: str) -> MemorySection | None:
+        """The named section, or any section holding *fact* if the model misnamed it."""
+        section = self.section(title)
+        if section and (not fact or section.find(fact) is not None):
+            return section
+        return next((s for s in self.sections if fact and s.find(fact) is not None), section)
+
 
 class MemoryStore:
     """Two-layer memory: MEMORY.md (long-term facts) + HISTORY.md (grep-searchable log)."""
 
     def __init__(self, workspace: Path):
+        # Imported here because memory_index depends on MemoryDocument.
+        from nanobot.agent.memory_index import MemorySectionIndex
+
         self.memory_dir = ensure_dir(workspace / "memory")
         self.memory_file = self.memory_dir / "MEMORY.md"
         self.history_file = self.memory_dir / "HISTORY.md"
+        self.history_index = HistoryIndex(workspace / ".cache" / "history.db", self.history_file)
+        self.section_index = MemorySectionIndex(self.memory_file)
 
     def read_long_term(self) -> str:
         if self.memory_file.exists():
@@ -61,11 +225,44 @@ class MemoryStore:
     def append_history(self, entry: str) -> None:
         with open(self.history_file, "a", encoding="utf-8") as f:
             f.write(entry.rstrip() + "\n\n")
+        try:
+            self.history_index.sync()
+        except sqlite3.Error as e:
+            logger.warning("Failed to index history entry: {}", e)
 
     def get_memory_context(self) -> str:
         long_term = self.read_long_term()
         return f"## Long-term Memory\n{long_term}" if long_term else ""
 
+    @staticmethod
+    def _chunk(messages: list[dict[str, Any]], chunk_tokens: int) -> list[tuple[list[str], int]]:
+        """Group transcript lines into chunks of at most ~chunk_tokens.
+
+        Returns ``(lines, end)`` pairs where *end* is the index just past the
+        last message covered, so progress can be recorded per chunk.
+        """
+        chunks: list[tuple[list[str], int]] = []
+        lines: list[str] = []
+        size = 0
+        for i, m in enumerate(messages):
+            if not m.get("content"):
+                continue
+            tools = f" [tools: {', '.join(m['tools_used'])}]" if m.get("tools_used") else ""
+            content = m["content"] if isinstance(m["content"], str) else json.dumps(m["content"], ensure_ascii=False)
+            line = f"[{m.get('timestamp', '?')[:16]}] {m['role'].upper()}{tools}: {content}"
+            tokens = estimate_tokens(line)
+            if tokens > chunk_tokens:
+                line = line[:chunk_tokens * 4] + " …"
+                tokens = chunk_tokens
+            if lines and size + tokens > chunk_tokens:
+                chunks.append((lines, i))
+                lines, size = [], 0
+            lines.append(line)
+            size += tokens
+        if lines:
+            chunks.append((lines, len(messages)))
+        return chunks
+
     async def consolidate(
         self,
         session: Session,
@@ -74,15 +271,26 @@ class MemoryStore:
         *,
         archive_all: bool = False,
         memory_window: int = 50,
+        chunk_tokens: int = 4000,
     ) -> bool:
-        """Consolidate old messages into MEMORY.md + HISTORY.md via LLM tool call.
+        """Consolidate old messages into MEMORY.md + HISTORY.md via LLM tool calls.
+
+        Old messages are processed in token-bounded chunks.  For each chunk the
+        LLM returns a history entry and add/update/delete changes, which are
+        applied to the sectioned memory locally, and only the sections related
+        to the chunk are sent in full, so neither input nor output cost grows
+        with the size of MEMORY.md.  ``session.last_consolidated`` advances per
+        chunk in both modes, so a retry after a partial failure does not append
+        the same history entries again.  Changes are applied to MEMORY.md as it
+        is when the LLM replies, so consolidations of other sessions running at
+        the same time are not overwritten.  Token usage is logged per run.
 
         Returns True on success (including no-op), False on failure.
         """
         if archive_all:
-            old_messages = session.messages
+            old_messages = session.messages[session.last_consolidated:]
             keep_count = 0
-            logger.info("Memory consolidation (archive_all): {} messages", len(session.messages))
+            logger.info("Memory consolidation (archive_all): {} messages", len(old_messages))
         else:
             keep_count = memory_window // 2
             if len(session.messages) <= keep_count:
@@ -94,57 +302,123 @@ class MemoryStore:
                 return True
             logger.info("Memory consolidation: {} to consolidate, {} keep", len(old_messages), keep_count)
 
-        lines = []
-        for m in old_messages:
-            if not m.get("content"):
-                continue
-            tools = f" [tools: {', '.join(m['tools_used'])}]" if m.get("tools_used") else ""
-            lines.append(f"[{m.get('timestamp', '?')[:16]}] {m['role'].upper()}{tools}: {m['content']}")
+        start = session.last_consolidated
+        chunks = self._chunk(old_messages, chunk_tokens)
+        usage = {"chunks": len(chunks), "prompt_tokens": 0, "completion_tokens": 0}
 
-        current_memory = self.read_long_term()
-        prompt = f"""Process this conversation and call the save_memory tool with your consolidation.
+        for n, (lines, end) in enumerate(chunks, 1):
+            current_memory = self.read_long_term()
+            memory_view, complete = self._memory_view(current_memory, "\n".join(lines), chunk_tokens // 2)
+            part = f" (part {n} of {len(chunks)})" if len(chunks) > 1 else ""
+            prompt = f"""Process this conversation{part} and call the save_memory tool with your consolidation.
 
 ## Current Long-term Memory
-{current_memory or "(empty)"}
+{memory_view or "(empty)"}
 
 ## Conversation to Process
 {chr(10).join(lines)}"""
 
-        try:
-            response = await provider.chat(
-                messages=[
-                    {"role": "system", "content": "You are a memory consolidation agent. Call the save_memory tool with your consolidation of the conversation."},
-                    {"role": "user", "content": prompt},
-                ],
-                tools=_SAVE_MEMORY_TOOL,
-                model=model,
-            )
-
-            if not response.has_tool_calls:
-                logger.warning("Memory consolidation: LLM did not call save_memory, skipping")
-                return False
+            try:
+                response = await provider.chat(
+                    messages=[
+                        {"role": "system", "content": _CONSOLIDATION_SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt},
+                    ],
+                    tools=_SAVE_MEMORY_TOOL,
+                    model=model,
+                )
+                for k in ("prompt_tokens", "completion_tokens"):
+                    usage[k] += int((response.usage or {}).get(k) or 0)
 
-            args = response.tool_calls[0].arguments
-            # Some providers return arguments as a JSON string instead of dict
-            if isinstance(args, str):
-                args = json.loads(args)
-            if not isinstance(args, dict):
-                logger.warning("Memory consolidation: unexpected arguments type {}", type(args).__name__)
+                if not response.has_tool_calls:
+                    logger.warning("Memory consolidation: LLM did not call save_memory, skipping")
+                    return False
+
+                args = response.tool_calls[0].arguments
+                # Some providers return arguments as a JSON string instead of dict
+                if isinstance(args, str):
+                    args = json.loads(args)
+                if not isinstance(args, dict):
+                    logger.warning("Memory consolidation: unexpected arguments type {}", type(args).__name__)
+                    return False
+
+                if entry := args.get("history_entry"):
+                    if not isinstance(entry, str):
+                        entry = json.dumps(entry, ensure_ascii=False)
+                    self.append_history(entry)
+                self._apply_memory_result(args, current_memory, complete)
+                session.last_consolidated = start + end
+            except Exception:
+                logger.exception("Memory consolidation failed")
                 return False
 
-            if entry := args.get("history_entry"):
-                if not isinstance(entry, str):
-                    entry = json.dumps(entry, ensure_ascii=False)
-                self.append_history(entry)
-            if update := args.get("memory_update"):
-                if not isinstance(update, str):
-                    update = json.dumps(update, ensure_ascii=False)
-                if update != current_memory:
-                    self.write_long_term(update)
-
-            session.last_consolidated = 0 if archive_all else len(session.messages) - keep_count
-            logger.info("Memory consolidation done: {} messages, last_consolidated={}", len(session.messages), session.last_consolidated)
-            return True
-        except Exception:
-            logger.exception("Memory consolidation failed")
-            return False
+        session.last_consolidated = len(session.messages) - keep_count
+        logger.info(
+            "Memory consolidation done: {} messages, last_consolidated={}, {} chunk(s), tokens in/out {}/{}",
+            len(session.messages), session.last_consolidated,
+            usage["chunks"], usage["prompt_tokens"], usage["completion_tokens"],
+        )
+        return True
+
+    def _memory_view(self, current_memory: str, conversation: str, token_budget: int) -> tuple[str, bool]:
+        """
+        The part of MEMORY.md a chunk can touch, and whether that is all of it.
+
+        Every heading is listed so new facts land in an existing section, but
+        only the sections matching *conversation* (within *token_budget*) are
+        sent with their facts.
+        """
+        doc = MemoryDocument.parse(current_memory)
+        if not doc.sections:
+            return current_memory, True
+        matched = {
+            block.partition("\n")[0][3:].casefold(): block
+            for block in self.section_index.search(conversation, top_k=len(doc.sections), token_budget=token_budget)
+        }
+        parts = ["\n".join(doc.preamble).strip()]
+        complete = True
+        for section in doc.sections:
+            facts = sum(1 for line in section.lines if line.lstrip().startswith(("- ", "* ")))
+            if block := matched.get(section.title.casefold()):
+                parts.append(block)
+            elif facts:
+                parts.append(f"## {section.title}\n({facts} unrelated facts not shown)")
+                complete = False
+            else:
+                parts.append(f"## {section.title}\n" + "\n".join(section.lines).strip())
+        return "\n\n".join(p for p in parts if p), complete
+
+    def _apply_memory_result(self, args: dict[str, Any], seen_memory: str, complete: bool = True) -> None:
+        """
+        Apply structured changes, or a full rewrite from models that still send one.
+
+        Changes are applied to a fresh read of MEMORY.md (*seen_memory* is what
+        the model was shown, possibly before another session's consolidation
+        wrote to it); there is no await between that read and the write.  A
+        rewrite is only trusted when the model saw the *complete* memory and
+        the file has not changed since, otherwise it would drop facts.
+        """
+        current_memory = self.read_long_term()
+        changes = args.get("memory_changes")
+        if isinstance(changes, str):
+            try:
+                changes = json.loads(changes)
+            except ValueError:
+                changes = None
+        if isinstance(changes, dict):
+            changes = [changes]
+        if isinstance(changes, list) and changes:
+            doc = MemoryDocument.parse(current_memory)
+            if doc.apply(changes):
+                self.write_long_term(doc.render())
+        elif update := args.get("memory_update"):
+            if not complete:
+                logger.warning("Memory consolidation: ignoring full rewrite made from a partial memory view")
+                return
+            if current_memory != seen_memory:
+                logger.warning("Memory consolidation: ignoring full rewrite; MEMORY.md changed while it was made")
+                return
+            if not isinstance(update, str):
+                update = json.dumps(update, ensure_ascii=False)
+            if update != current_memory:
+                self.write_long_term(update)
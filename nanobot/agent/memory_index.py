@@ -0,0 +1,120 @@
+"""Lexical (BM25) retrieval over MEMORY.md sections."""
+
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+
+from nanobot.agent.memory import MemoryDocument
+from nanobot.utils.helpers import estimate_tokens
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from has have how i if in is it its me my of on or "
+    "our so that the their them they this to was we were what when where which who why will with you your".split()
+)
+_K1, _B = 1.5, 0.75
+
+
+def _terms(text: str) -> list[str]:
+    return [w for w in _WORD.findall(text.casefold()) if w not in _STOPWORDS and len(w) > 1]
+
+
+@dataclass
+class _Section:
+    title: str
+    text: str  # Rendered "## title" block
+    tokens: int
+    length: int  # Number of indexed terms
+
+
+class MemorySectionIndex:
+    """
+    Inverted index over the ``## `` sections of MEMORY.md, scored with BM25.
+
+    The index is rebuilt only when the file's mtime/size changes, so each
+    query costs a stat plus a walk over the postings of its own terms.
+    """
+
+    def __init__(self, memory_file: Path):
+        self.memory_file = memory_file
+        self._signature: tuple[int, int] | None = None
+        self._loaded = False
+        self._preamble = ""
+        self._sections: list[_Section] = []
+        self._postings: dict[str, list[tuple[int, int]]] = {}
+        self._avg_length = 0.0
+
+    def _refresh(self) -> None:
+        try:
+            st = self.memory_file.stat()
+            signature = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            signature = None
+        if self._loaded and signature == self._signature:
+            return
+        self._signature, self._loaded = signature, True
+        text = self.memory_file.read_text(encoding="utf-8") if signature else ""
+        doc = MemoryDocument.parse(text)
+        self._preamble = "\n".join(doc.preamble).strip()
+        self._sections, postings = [], defaultdict(list)
+        for section in doc.sections:
+            body = "\n".join(section.lines).strip()
+            if not body or body.startswith("(") and body.endswith(")"):
+                continue  # Empty or template placeholder
+            block = f"## {section.title}\n{body}"
+            # Title words count twice: a heading match is a strong signal.
+            terms = Counter(_terms(f"{section.title} {section.title} {body}"))
+            idx = len(self._sections)
+            self._sections.append(_Section(section.title, block, estimate_tokens(block), sum(terms.values())))
+            for term, tf in terms.items():
+                postings[term].append((idx, tf))
+        self._postings = dict(postings)
+        self._avg_length = sum(s.length for s in self._sections) / len(self._sections) if self._sections else 0.0
+
+    def preamble(self) -> str:
+        """Text before the first section (title, standing instructions)."""
+        self._refresh()
+        return self._preamble
+
+    def pinned(self, titles: list[str]) -> list[str]:
+        """Rendered sections whose titles are in *titles*, in file order."""
+        self._refresh()
+        wanted = {t.casefold() for t in titles}
+        return [s.text for s in self._sections if s.title.casefold() in wanted]
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 3,
+        token_budget: int = 1500,
+        exclude: list[str] | None = None,
+    ) -> list[str]:
+        """Best-matching sections for *query*, at most *top_k* and within *token_budget*."""
+        self._refresh()
+        excluded = {t.casefold() for t in exclude or []}
+        n = len(self._sections)
+        scores: dict[int, float] = defaultdict(float)
+        for term in set(_terms(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for idx, tf in postings:
+                norm = _K1 * (1 - _B + _B * self._sections[idx].length / (self._avg_length or 1))
+                scores[idx] += idf * tf * (_K1 + 1) / (tf + norm)
+
+        picked: list[str] = []
+        remaining = token_budget
+        for idx in sorted(scores, key=lambda i: (-scores[i], i)):
+            section = self._sections[idx]
+            if section.title.casefold() in excluded or section.tokens > remaining:
+                continue
+            picked.append(section.text)
+            remaining -= section.tokens
+            if len(picked) >= top_k:
+                break
+        return picked
@@ -0,0 +1,147 @@
+"""Session scheduler: serialize work per session, run sessions concurrently."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import weakref
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator
+
+
+@dataclass
+class SessionStats:
+    """Queue depth and wait-time counters for one session."""
+
+    queued: int = 0
+    active: int = 0
+    processed: int = 0
+    total_wait_s: float = 0.0
+    max_wait_s: float = 0.0
+    last_wait_s: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        avg = self.total_wait_s / self.processed if self.processed else 0.0
+        return {
+            "queued": self.queued,
+            "active": self.active,
+            "processed": self.processed,
+            "avg_wait_ms": round(avg * 1000, 1),
+            "max_wait_ms": round(self.max_wait_s * 1000, 1),
+            "last_wait_ms": round(self.last_wait_s * 1000, 1),
+        }
+
+
+class SessionScheduler:
+    """
+    Schedules message processing across sessions.
+
+    Messages for the same session key run strictly in arrival order, while
+    different sessions run concurrently up to ``max_concurrent``.  When the
+    global cap is reached, free slots are handed out round-robin across
+    channels so one busy channel cannot starve the others.
+    """
+
+    def __init__(self, max_concurrent: int = 4, max_stats: int = 1000):
+        self.max_concurrent = max(1, max_concurrent)
+        # Stats of idle sessions are kept for the most recent ``max_stats`` keys only.
+        self.max_stats = max_stats
+        self._running = 0
+        self._waiters: OrderedDict[str, deque[asyncio.Future[None]]] = OrderedDict()
+        self._session_locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
+        self._stats: OrderedDict[str, SessionStats] = OrderedDict()
+
+    @asynccontextmanager
+    async def slot(self, session_key: str, channel: str) -> AsyncIterator[None]:
+        """Hold the session's turn and one global slot for the duration of the block."""
+        stats = self._stats.setdefault(session_key, SessionStats())
+        self._stats.move_to_end(session_key)
+        stats.queued += 1
+        start = time.monotonic()
+        acquired = False
+        try:
+            lock = self._session_locks.setdefault(session_key, asyncio.Lock())
+            async with lock:
+                await self._acquire(channel)
+                acquired = True
+                waited = time.monotonic() - start
+                stats.queued -= 1
+                stats.active += 1
+                stats.last_wait_s = waited
+                stats.total_wait_s += waited
+                stats.max_wait_s = max(stats.max_wait_s, waited)
+                try:
+                    yield
+                finally:
+                    stats.active -= 1
+                    stats.processed += 1
+                    self._release()
+        finally:
+            if not acquired:
+                stats.queued -= 1
+            self._prune_stats()
+
+    def _prune_stats(self) -> None:
+        """Drop the least recently used idle entries beyond ``max_stats``."""
+        excess = len(self._stats) - self.max_stats
+        if excess <= 0:
+            return
+        idle = [k for k, s in self._stats.items() if not s.queued and not s.active]
+        for key in idle[:excess]:
+            del self._stats[key]
+
+    async def _acquire(self, channel: str) -> None:
+        if self._running < self.max_concurrent and not self._waiters:
+            self._running += 1
+            return
+        fut: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(channel, deque()).append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Slot was granted just as we were cancelled — hand it on.
+                self._release()
+            else:
+                self._discard_waiter(channel, fut)
+            raise
+
+    def _release(self) -> None:
+        self._running -= 1
+        self._wake_next()
+
+    def _wake_next(self) -> None:
+        """Grant free slots to waiters, rotating across channels."""
+        while self._running < self.max_concurrent and self._waiters:
+            channel, queue = next(iter(self._waiters.items()))
+            fut = queue.popleft()
+            if queue:
+                self._waiters.move_to_end(channel)
+            else:
+                del self._waiters[channel]
+            if fut.done():
+                continue
+            fut.set_result(None)
+            self._running += 1
+
+    def _discard_waiter(self, channel: str, fut: asyncio.Future[None]) -> None:
+        queue = self._waiters.get(channel)
+        if queue is None:
+            return
+        try:
+            queue.remove(fut)
+        except ValueError:
+            pass
+        if not queue:
+            del self._waiters[channel]
+
+    @property
+    def running(self) -> int:
+        """Number of sessions currently holding a slot."""
+        return self._running
+
+    def get_stats(self) -> dict[str, dict[str, Any]]:
+        """Return per-session queue depth and wait-time metrics."""
+        return {key: s.to_dict() for key, s in self._stats.items()}
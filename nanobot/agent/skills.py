@@ -4,24 +4,116 @@ import json
 import os
 import re
 import shutil
+from dataclasses import dataclass, field
 from pathlib import Path
 
 # Default builtin skills directory (relative to this file)
 BUILTIN_SKILLS_DIR = Path(__file__).parent.parent / "skills"
 
 
+def _stat(path: Path) -> tuple[int, int] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+@dataclass
+class SkillEntry:
+    """An indexed skill: its SKILL.md content plus parsed frontmatter."""
+
+    name: str
+    path: Path
+    source: str  # "workspace" or "builtin"
+    stat: tuple[int, int]
+    content: str
+    metadata: dict | None = None  # Raw frontmatter fields
+    nanobot_meta: dict = field(default_factory=dict)  # Parsed "metadata" JSON (nanobot/openclaw keys)
+
+
 class SkillsLoader:
     """
     Loader for agent skills.
 
     Skills are markdown files (SKILL.md) that teach the agent how to use
     specific tools or perform certain tasks.
+
+    Skills are kept in an in-memory index.  Each lookup re-lists a skills
+    directory only when its mtime changed, and re-reads a SKILL.md only when
+    its mtime or size changed.  ``shutil.which`` results are memoized per PATH.
     """
 
     def __init__(self, workspace: Path, builtin_skills_dir: Path | None = None):
         self.workspace = workspace
         self.workspace_skills = workspace / "skills"
         self.builtin_skills = builtin_skills_dir or BUILTIN_SKILLS_DIR
+        self._index: dict[str, SkillEntry] = {}
+        self._dir_stats: dict[Path, tuple[int, int] | None] | None = None
+        self._candidates: list[tuple[str, Path, str]] = []  # (name, SKILL.md path, source)
+        self._which_cache: dict[tuple[str, str], bool] = {}
+
+    # ---- index ----
+
+    def _skill_dirs(self) -> list[tuple[Path, str]]:
+        dirs = [(self.workspace_skills, "workspace")]
+        if self.builtin_skills:
+            dirs.append((self.builtin_skills, "builtin"))
+        return dirs
+
+    def _scan_candidates(self) -> list[tuple[str, Path, str]]:
+        """List every skill directory, workspace first, in name order."""
+        candidates = []
+        for skills_dir, source in self._skill_dirs():
+            try:
+                names = sorted(e.name for e in os.scandir(skills_dir) if e.is_dir())
+            except OSError:
+                continue
+            candidates.extend((name, skills_dir / name / "SKILL.md", source) for name in names)
+        return candidates
+
+    def _refresh(self) -> dict[str, SkillEntry]:
+        """Bring the index up to date with the skills directories."""
+        dir_stats = {d: _stat(d) for d, _ in self._skill_dirs()}
+        if dir_stats != self._dir_stats:
+            self._candidates = self._scan_candidates()
+            self._dir_stats = dir_stats
+
+        index: dict[str, SkillEntry] = {}
+        for name, path, source in self._candidates:
+            if name in index:
+                continue  # Workspace skill shadows the builtin one
+            st = _stat(path)
+            if st is None:
+                continue
+            entry = self._index.get(name)
+            if entry is None or entry.path != path or entry.stat != st:
+                entry = self._parse_entry(name, path, source, st)
+                if entry is None:
+                    continue
+            index[name] = entry
+        self._index = index
+        return index
+
+    def _parse_entry(self, name: str, path: Path, source: str, st: tuple[int, int]) -> SkillEntry | None:
+        try:
+            content = path.read_text(encoding="utf-8")
+        except OSError:
+            return None
+        metadata = self._parse_frontmatter(content)
+        return SkillEntry(
+            name=name,
+            path=path,
+            source=source,
+            stat=st,
+            content=content,
+            metadata=metadata,
+            nanobot_meta=self._parse_nanobot_metadata((metadata or {}).get("metadata", "")),
+        )
+
+    def get_skill(self, name: str) -> SkillEntry | None:
+        """Return the indexed entry for a skill, or None if it does not exist."""
+        return self._refresh().get(name)
 
     def list_skills(self, filter_unavailable: bool = True) -> list[dict[str, str]]:
         """
@@ -33,28 +125,11 @@ class SkillsLoader:
         Returns:
             List of skill info dicts with 'name', 'path', 'source'.
         """
-        skills = []
-
-        # Workspace skills (highest priority)
-        if self.workspace_skills.exists():
-            for skill_dir in self.workspace_skills.iterdir():
-                if skill_dir.is_dir():
-                    skill_file = skill_dir / "SKILL.md"
-                    if skill_file.exists():
-                        skills.append({"name": skill_dir.name, "path": str(skill_file), "source": "workspace"})
-
-        # Built-in skills
-        if self.builtin_skills and self.builtin_skills.exists():
-            for skill_dir in self.builtin_skills.iterdir():
-                if skill_dir.is_dir():
-                    skill_file = skill_dir / "SKILL.md"
-                    if skill_file.exists() and not any(s["name"] == skill_dir.name for s in skills):
-                        skills.append({"name": skill_dir.name, "path": str(skill_file), "source": "builtin"})
-
-        # Filter by requirements
-        if filter_unavailable:
-            return [s for s in skills if self._check_requirements(self._get_skill_meta(s["name"]))]
-        return skills
+        return [
+            {"name": e.name, "path": str(e.path), "source": e.source}
+            for e in self._refresh().values()
+            if not filter_unavailable or self._check_requirements(e.nanobot_meta)
+        ]
 
     def load_skill(self, name: str) -> str | None:
         """
@@ -66,18 +141,8 @@ class SkillsLoader:
         Returns:
             Skill content or None if not found.
         """
-        # Check workspace first
-        workspace_skill = self.workspace_skills / name / "SKILL.md"
-        if workspace_skill.exists():
-            return workspace_skill.read_text(encoding="utf-8")
-
-        # Check built-in
-        if self.builtin_skills:
-            builtin_skill = self.builtin_skills / name / "SKILL.md"
-            if builtin_skill.exists():
-                return builtin_skill.read_text(encoding="utf-8")
-
-        return None
+        entry = self.get_skill(name)
+        return entry.content if entry else None
 
     def load_skills_for_context(self, skill_names: list[str]) -> str:
         """
@@ -108,19 +173,19 @@ class SkillsLoader:
         Returns:
             XML-formatted skills summary.
         """
-        all_skills = self.list_skills(filter_unavailable=False)
-        if not all_skills:
+        entries = list(self._refresh().values())
+        if not entries:
             return ""
 
         def escape_xml(s: str) -> str:
             return s.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
 
         lines = ["<skills>"]
-        for s in all_skills:
-            name = escape_xml(s["name"])
-            path = s["path"]
-            desc = escape_xml(self._get_skill_description(s["name"]))
-            skill_meta = self._get_skill_meta(s["name"])
+        for entry in entries:
+            name = escape_xml(entry.name)
+            path = str(entry.path)
+            desc = escape_xml((entry.metadata or {}).get("description") or entry.name)
+            skill_meta = entry.nanobot_meta
             available = self._check_requirements(skill_meta)
 
             lines.append(f"  <skill available=\"{str(available).lower()}\">")
@@ -144,7 +209,7 @@ class SkillsLoader:
         missing = []
         requires = skill_meta.get("requires", {})
         for b in requires.get("bins", []):
-            if not shutil.which(b):
+            if not self._which(b):
                 missing.append(f"CLI: {b}")
         for env in requires.get("env", []):
             if not os.environ.get(env):
@@ -174,11 +239,19 @@ class SkillsLoader:
         except (json.JSONDecodeError, TypeError):
             return {}
 
+    def _which(self, binary: str) -> bool:
+        """Memoized ``shutil.which``; a PATH change starts a fresh lookup."""
+        key = (binary, os.environ.get("PATH", ""))
+        found = self._which_cache.get(key)
+        if found is None:
+            found = self._which_cache[key] = shutil.which(binary) is not None
+        return found
+
     def _check_requirements(self, skill_meta: dict) -> bool:
         """Check if skill requirements are met (bins, env vars)."""
         requires = skill_meta.get("requires", {})
         for b in requires.get("bins", []):
-            if not shutil.which(b):
+            if not self._which(b):
                 return False
         for env in requires.get("env", []):
             if not os.environ.get(env):
@@ -187,18 +260,16 @@ class SkillsLoader:
 
     def _get_skill_meta(self, name: str) -> dict:
         """Get nanobot metadata for a skill (cached in frontmatter)."""
-        meta = self.get_skill_metadata(name) or {}
-        return self._parse_nanobot_metadata(meta.get("metadata", ""))
+        entry = self.get_skill(name)
+        return entry.nanobot_meta if entry else {}
 
     def get_always_skills(self) -> list[str]:
         """Get skills marked as always=true that meet requirements."""
-        result = []
-        for s in self.list_skills(filter_unavailable=True):
-            meta = self.get_skill_metadata(s["name"]) or {}
-            skill_meta = self._parse_nanobot_metadata(meta.get("metadata", ""))
-            if skill_meta.get("always") or meta.get("always"):
-                result.append(s["name"])
-        return result
+        return [
+            e.name for e in self._refresh().values()
+            if (e.nanobot_meta.get("always") or (e.metadata or {}).get("always"))
+            and self._check_requirements(e.nanobot_meta)
+        ]
 
     def get_skill_metadata(self, name: str) -> dict | None:
         """
@@ -210,10 +281,12 @@ class SkillsLoader:
         Returns:
             Metadata dict or None.
         """
-        content = self.load_skill(name)
-        if not content:
-            return None
+        entry = self.get_skill(name)
+        return dict(entry.metadata) if entry and entry.metadata is not None else None
 
+    @staticmethod
+    def _parse_frontmatter(content: str) -> dict | None:
+        """Parse simple ``key: value`` YAML frontmatter."""
         if content.startswith("---"):
             match = re.match(r"^---\n(.*?)\n---", content, re.DOTALL)
             if match:
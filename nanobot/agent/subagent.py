@@ -2,20 +2,26 @@
 
 import asyncio
 import json
+import time
 import uuid
 from pathlib import Path
 from typing import Any
 
 from loguru import logger
 
+from nanobot.agent.skills import SkillsLoader
 from nanobot.agent.tools.filesystem import EditFileTool, ListDirTool, ReadFileTool, WriteFileTool
 from nanobot.agent.tools.registry import ToolRegistry
+from nanobot.agent.tools.sandbox import SandboxProfile
 from nanobot.agent.tools.shell import ExecTool
 from nanobot.agent.tools.web import WebFetchTool, WebSearchTool
+from nanobot.agent.tools.web_cache import WebFetchCache, WebSearchCache
 from nanobot.bus.events import InboundMessage
 from nanobot.bus.queue import MessageBus
-from nanobot.config.schema import ExecToolConfig
+from nanobot.config.schema import ExecToolConfig, WebFetchConfig
 from nanobot.providers.base import LLMProvider
+from nanobot.telemetry import Telemetry
+from nanobot.utils.http import RateLimiter
 
 
 class SubagentManager:
@@ -32,10 +38,16 @@ class SubagentManager:
         reasoning_effort: str | None = None,
         brave_api_key: str | None = None,
         web_proxy: str | None = None,
+        web_search_cache: WebSearchCache | None = None,
+        web_search_limiter: RateLimiter | None = None,
+        web_fetch_config: "WebFetchConfig | None" = None,
+        web_fetch_cache: WebFetchCache | None = None,
         exec_config: "ExecToolConfig | None" = None,
         restrict_to_workspace: bool = False,
+        max_parallel_tools: int = 4,
+        telemetry: "Telemetry | None" = None,
     ):
-        from nanobot.config.schema import ExecToolConfig
+        from nanobot.config.schema import ExecToolConfig, WebFetchConfig
         self.provider = provider
         self.workspace = workspace
         self.bus = bus
@@ -45,10 +57,21 @@ class SubagentManager:
         self.reasoning_effort = reasoning_effort
         self.brave_api_key = brave_api_key
         self.web_proxy = web_proxy
+        self.web_search_cache = web_search_cache
+        self.web_search_limiter = web_search_limiter
+        self.web_fetch_config = web_fetch_config or WebFetchConfig()
+        self.web_fetch_cache = web_fetch_cache
         self.exec_config = exec_config or ExecToolConfig()
+        # Background tasks run under the main profile tightened by subagent_sandbox.
+        sandbox = SandboxProfile.from_config(self.exec_config.sandbox)
+        strict = SandboxProfile.from_config(self.exec_config.subagent_sandbox)
+        self.sandbox = sandbox.tighten(strict) if sandbox else strict
         self.restrict_to_workspace = restrict_to_workspace
+        self.max_parallel_tools = max_parallel_tools
+        self.telemetry = telemetry
         self._running_tasks: dict[str, asyncio.Task[None]] = {}
         self._session_tasks: dict[str, set[str]] = {}  # session_key -> {task_id, ...}
+        self.skills = SkillsLoader(workspace)
 
     async def spawn(
         self,
@@ -94,7 +117,7 @@ class SubagentManager:
 
         try:
             # Build subagent tools (no message tool, no spawn tool)
-            tools = ToolRegistry()
+            tools = ToolRegistry(telemetry=self.telemetry)
             allowed_dir = self.workspace if self.restrict_to_workspace else None
             tools.register(ReadFileTool(workspace=self.workspace, allowed_dir=allowed_dir))
             tools.register(WriteFileTool(workspace=self.workspace, allowed_dir=allowed_dir))
@@ -105,9 +128,22 @@ class SubagentManager:
                 timeout=self.exec_config.timeout,
                 restrict_to_workspace=self.restrict_to_workspace,
                 path_append=self.exec_config.path_append,
+                max_output_bytes=self.exec_config.max_output_mb * 1024 * 1024,
+                sandbox=self.sandbox,
+                telemetry=self.telemetry,
+            ))
+            tools.register(WebSearchTool(
+                api_key=self.brave_api_key,
+                proxy=self.web_proxy,
+                cache=self.web_search_cache,
+                rate_limiter=self.web_search_limiter,
+            ))
+            tools.register(WebFetchTool(
+                proxy=self.web_proxy,
+                cache=self.web_fetch_cache,
+                max_download_bytes=self.web_fetch_config.max_download_mb * 1024 * 1024,
+                extract_timeout=self.web_fetch_config.extract_timeout,
             ))
-            tools.register(WebSearchTool(api_key=self.brave_api_key, proxy=self.web_proxy))
-            tools.register(WebFetchTool(proxy=self.web_proxy))
             
             system_prompt = self._build_subagent_prompt()
             messages: list[dict[str, Any]] = [
@@ -123,6 +159,7 @@ class SubagentManager:
             while iteration < max_iterations:
                 iteration += 1
 
+                started = time.perf_counter()
                 response = await self.provider.chat(
                     messages=messages,
                     tools=tools.get_definitions(),
@@ -131,6 +168,12 @@ class SubagentManager:
                     max_tokens=self.max_tokens,
                     reasoning_effort=self.reasoning_effort,
                 )
+                if self.telemetry:
+                    self.telemetry.record_llm_call(
+                        self.model, time.perf_counter() - started, response.usage,
+                        session=f"subagent:{task_id}", iteration=iteration,
+                        error=response.finish_reason == "error",
+                    )
 
                 if response.has_tool_calls:
                     # Add assistant message with tool calls
@@ -155,7 +198,11 @@ class SubagentManager:
                     for tool_call in response.tool_calls:
                         args_str = json.dumps(tool_call.arguments, ensure_ascii=False)
                         logger.debug("Subagent [{}] executing: {} with arguments: {}", task_id, tool_call.name, args_str)
-                        result = await tools.execute(tool_call.name, tool_call.arguments)
+                    results = await tools.execute_batch(
+                        [(tc.name, tc.arguments) for tc in response.tool_calls],
+                        max_parallel=self.max_parallel_tools,
+                    )
+                    for tool_call, result in zip(response.tool_calls, results):
                         messages.append({
                             "role": "tool",
                             "tool_call_id": tool_call.id,
@@ -212,7 +259,6 @@ Summarize this naturally for the user. Keep it brief (1-2 sentences). Do not men
     def _build_subagent_prompt(self) -> str:
         """Build a focused system prompt for the subagent."""
         from nanobot.agent.context import ContextBuilder
-        from nanobot.agent.skills import SkillsLoader
 
         time_ctx = ContextBuilder._build_runtime_context(None, None)
         parts = [f"""# Subagent
@@ -225,7 +271,7 @@ Stay focused on the assigned task. Your final response will be reported back to
 ## Workspace
 {self.workspace}"""]
 
-        skills_summary = SkillsLoader(self.workspace).build_skills_summary()
+        skills_summary = self.skills.build_skills_summary()
         if skills_summary:
             parts.append(f"## Skills\n\nRead SKILL.md with read_file to use a skill.\n\n{skills_summary}")
 
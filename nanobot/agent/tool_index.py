@@ -0,0 +1,99 @@
+"""Lexical (BM25) ranking of registered tools against the conversation."""
+
+from __future__ import annotations
+
+import json
+import math
+import re
+from collections import Counter, defaultdict
+from typing import TYPE_CHECKING
+
+from nanobot.utils.helpers import estimate_tokens
+
+if TYPE_CHECKING:
+    from nanobot.agent.tools.registry import ToolRegistry
+
+_CAMEL = re.compile(r"([a-z0-9])([A-Z])")
+_WORD = re.compile(r"[^\W_]+", re.UNICODE)
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do for from has have how i if in is it its me my of on or "
+    "that the this to use used using was what when which will with you your".split()
+)
+_K1, _B = 1.2, 0.75
+
+
+def _terms(text: str) -> list[str]:
+    """Words of *text*, splitting snake_case and camelCase identifiers."""
+    text = _CAMEL.sub(r"\1 \2", text).casefold()
+    return [w for w in _WORD.findall(text) if w not in _STOPWORDS and len(w) > 1]
+
+
+class ToolIndex:
+    """
+    Inverted index over tool names, descriptions and parameter names.
+
+    Rebuilt only when the registry's version changes.  Name words count
+    three times and parameter names once on top of the description.
+    """
+
+    def __init__(self, registry: ToolRegistry):
+        self.registry = registry
+        self._version = -1
+        self._names: list[str] = []
+        self._lengths: list[int] = []
+        self._tokens: dict[str, int] = {}
+        self._postings: dict[str, list[tuple[int, int]]] = {}
+        self._avg_length = 0.0
+
+    def _refresh(self) -> None:
+        if self._version == self.registry.version:
+            return
+        self._version = self.registry.version
+        self._names, self._lengths, self._tokens = [], [], {}
+        postings: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        for schema in self.registry.get_definitions():
+            fn = schema["function"]
+            params = " ".join((fn.get("parameters") or {}).get("properties", {}))
+            terms = Counter(_terms(f"{fn['name']} {fn['name']} {fn['name']} {fn.get('description', '')} {params}"))
+            idx = len(self._names)
+            self._names.append(fn["name"])
+            self._lengths.append(sum(terms.values()))
+            self._tokens[fn["name"]] = estimate_tokens(json.dumps(schema, ensure_ascii=False))
+            for term, tf in terms.items():
+                postings[term].append((idx, tf))
+        self._postings = dict(postings)
+        self._avg_length = sum(self._lengths) / len(self._lengths) if self._lengths else 0.0
+
+    def rank(self, query: str) -> list[tuple[str, float]]:
+        """Tools matching *query*, best first."""
+        self._refresh()
+        n = len(self._names)
+        scores: dict[int, float] = defaultdict(float)
+        for term in set(_terms(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for idx, tf in postings:
+                norm = _K1 * (1 - _B + _B * self._lengths[idx] / (self._avg_length or 1))
+                scores[idx] += idf * tf * (_K1 + 1) / (tf + norm)
+        return [(self._names[i], scores[i]) for i in sorted(scores, key=lambda i: (-scores[i], i))]
+
+    def select(self, query: str, core: set[str], top_k: int = 8, token_budget: int = 4000) -> set[str]:
+        """Core tools plus up to *top_k* best matches whose schemas fit *token_budget*."""
+        self._refresh()
+        picked = {name for name in self._names if name in core}
+        remaining = token_budget
+        for name, _ in self.rank(query):
+            if len(picked - core) >= top_k:
+                break
+            if name in picked or self._tokens[name] > remaining:
+                continue
+            picked.add(name)
+            remaining -= self._tokens[name]
+        return picked
+
+    def hidden(self, exposed: set[str]) -> int:
+        """Number of registered tools not in *exposed*."""
+        self._refresh()
+        return sum(name not in exposed for name in self._names)
@@ -12,6 +12,10 @@ class Tool(ABC):
     the environment, such as reading files, executing commands, etc.
     """
 
+    # concurrency_key() value for calls that must run alone, after every
+    # earlier call of the same LLM turn has finished.
+    EXCLUSIVE = "*"
+
     _TYPE_MAP = {
         "string": str,
         "integer": int,
@@ -52,6 +56,16 @@ class Tool(ABC):
         """
         pass
 
+    def concurrency_key(self, params: dict[str, Any]) -> str | None:
+        """
+        Resource a call touches, used when tool calls run in parallel.
+
+        Calls returning the same key run one at a time, in their original
+        order.  ``None`` (the default) lets the call overlap with any other;
+        ``Tool.EXCLUSIVE`` waits for all earlier calls and blocks later ones.
+        """
+        return None
+
     def validate_params(self, params: dict[str, Any]) -> list[str]:
         """Validate tool parameters against JSON schema. Returns error list (empty if valid)."""
         schema = self.parameters or {}
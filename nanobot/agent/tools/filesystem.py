@@ -23,6 +23,14 @@ def _resolve_path(
     return resolved
 
 
+def _path_key(params: dict[str, Any], workspace: Path | None) -> str | None:
+    """Concurrency key for calls on one file, so reads and edits of a path keep their order."""
+    try:
+        return f"file:{_resolve_path(str(params.get('path', '')), workspace)}"
+    except Exception:
+        return None
+
+
 class ReadFileTool(Tool):
     """Tool to read file contents."""
 
@@ -34,6 +42,9 @@ class ReadFileTool(Tool):
     def name(self) -> str:
         return "read_file"
 
+    def concurrency_key(self, params: dict[str, Any]) -> str | None:
+        return _path_key(params, self._workspace)
+
     @property
     def description(self) -> str:
         return "Read the contents of a file at the given path."
@@ -73,6 +84,9 @@ class WriteFileTool(Tool):
     def name(self) -> str:
         return "write_file"
 
+    def concurrency_key(self, params: dict[str, Any]) -> str | None:
+        return _path_key(params, self._workspace)
+
     @property
     def description(self) -> str:
         return "Write content to a file at the given path. Creates parent directories if needed."
@@ -111,6 +125,9 @@ class EditFileTool(Tool):
     def name(self) -> str:
         return "edit_file"
 
+    def concurrency_key(self, params: dict[str, Any]) -> str | None:
+        return _path_key(params, self._workspace)
+
     @property
     def description(self) -> str:
         return "Edit a file by replacing old_text with new_text. The old_text must exist exactly in the file."
@@ -0,0 +1,68 @@
+"""History search tool."""
+
+import re
+import sqlite3
+from typing import Any
+
+from nanobot.agent.history_index import HistoryIndex
+from nanobot.agent.tools.base import Tool
+
+_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+class HistorySearchTool(Tool):
+    """Search past conversation summaries in memory/HISTORY.md."""
+
+    def __init__(self, index: HistoryIndex, max_entry_chars: int = 2000):
+        self.index = index
+        self.max_entry_chars = max_entry_chars
+
+    @property
+    def name(self) -> str:
+        return "search_history"
+
+    @property
+    def description(self) -> str:
+        return (
+            "Search the conversation history log (memory/HISTORY.md) by keywords. "
+            "Returns the best-matching entries ranked by relevance. "
+            "Optionally restrict to a date range."
+        )
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "Keywords to search for"},
+                "since": {"type": "string", "description": "Earliest date, YYYY-MM-DD (inclusive)"},
+                "until": {"type": "string", "description": "Latest date, YYYY-MM-DD (inclusive)"},
+                "limit": {"type": "integer", "description": "Max entries (1-50)", "minimum": 1, "maximum": 50},
+            },
+            "required": ["query"],
+        }
+
+    async def execute(
+        self,
+        query: str,
+        since: str | None = None,
+        until: str | None = None,
+        limit: int = 10,
+        **kwargs: Any,
+    ) -> str:
+        for label, value in (("since", since), ("until", until)):
+            if value and not _DATE.match(value):
+                return f"Error: {label} must be a date like 2026-01-31"
+        try:
+            results = self.index.search(query, limit=min(max(limit, 1), 50), since=since, until=until)
+        except sqlite3.Error as e:
+            return f"Error searching history: {e}"
+        if not results:
+            return f"No history entries match: {query}"
+        parts = []
+        for r in results:
+            entry = r["entry"]
+            if len(entry) > self.max_entry_chars:
+                entry = entry[:self.max_entry_chars] + " …"
+            parts.append(entry)
+        return f"{len(results)} matching entries:\n\n" + "\n\n".join(parts)
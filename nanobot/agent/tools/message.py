@@ -1,5 +1,6 @@
 """Message tool for sending messages to users."""
 
+from contextvars import ContextVar
 from typing import Any, Awaitable, Callable
 
 from nanobot.agent.tools.base import Tool
@@ -17,16 +18,31 @@ class MessageTool(Tool):
         default_message_id: str | None = None,
     ):
         self._send_callback = send_callback
-        self._default_channel = default_channel
-        self._default_chat_id = default_chat_id
-        self._default_message_id = default_message_id
-        self._sent_in_turn: bool = False
+        # Routing state lives in context vars so concurrent sessions (one asyncio
+        # task each) never see each other's target chat.
+        self._context: ContextVar[tuple[str, str, str | None]] = ContextVar(
+            "message_context", default=(default_channel, default_chat_id, default_message_id)
+        )
+        # A mutable box, so sends from tool calls running in child tasks
+        # (parallel tool execution) are visible to the turn that started them.
+        self._sent: ContextVar[list[bool] | None] = ContextVar("message_sent_in_turn", default=None)
 
     def set_context(self, channel: str, chat_id: str, message_id: str | None = None) -> None:
         """Set the current message context."""
-        self._default_channel = channel
-        self._default_chat_id = chat_id
-        self._default_message_id = message_id
+        self._context.set((channel, chat_id, message_id))
+
+    @property
+    def _sent_in_turn(self) -> bool:
+        box = self._sent.get()
+        return bool(box and box[0])
+
+    @_sent_in_turn.setter
+    def _sent_in_turn(self, value: bool) -> None:
+        box = self._sent.get()
+        if box is None:
+            self._sent.set([value])
+        else:
+            box[0] = value
 
     def set_send_callback(self, callback: Callable[[OutboundMessage], Awaitable[None]]) -> None:
         """Set the callback for sending messages."""
@@ -34,12 +50,16 @@ class MessageTool(Tool):
 
     def start_turn(self) -> None:
         """Reset per-turn send tracking."""
-        self._sent_in_turn = False
+        self._sent.set([False])
 
     @property
     def name(self) -> str:
         return "message"
 
+    def concurrency_key(self, params: dict[str, Any]) -> str | None:
+        # Keep user-visible messages in the order the model issued them.
+        return "message"
+
     @property
     def description(self) -> str:
         return "Send a message to the user. Use this when you want to communicate something."
@@ -79,9 +99,10 @@ class MessageTool(Tool):
         media: list[str] | None = None,
         **kwargs: Any
     ) -> str:
-        channel = channel or self._default_channel
-        chat_id = chat_id or self._default_chat_id
-        message_id = message_id or self._default_message_id
+        default_channel, default_chat_id, default_message_id = self._context.get()
+        channel = channel or default_channel
+        chat_id = chat_id or default_chat_id
+        message_id = message_id or default_message_id
 
         if not channel or not chat_id:
             return "Error: No target channel/chat specified"
@@ -101,7 +122,7 @@ class MessageTool(Tool):
 
         try:
             await self._send_callback(msg)
-            if channel == self._default_channel and chat_id == self._default_chat_id:
+            if channel == default_channel and chat_id == default_chat_id:
                 self._sent_in_turn = True
             media_info = f" with {len(media)} attachments" if media else ""
             return f"Message sent to {channel}:{chat_id}{media_info}"
@@ -1,27 +1,56 @@
 """Tool registry for dynamic tool management."""
 
-from typing import Any
+import asyncio
+import json
+import time
+from typing import TYPE_CHECKING, Any, Collection
 
 from nanobot.agent.tools.base import Tool
+from nanobot.utils.helpers import estimate_tokens
+
+if TYPE_CHECKING:
+    from nanobot.telemetry import Telemetry
 
 
 class ToolRegistry:
     """
     Registry for agent tools.
 
-    Allows dynamic registration and execution of tools.
+    Allows dynamic registration and execution of tools.  Tool definitions are
+    built once per registry ``version`` and reused until a tool is registered
+    or unregistered.
     """
 
-    def __init__(self):
+    def __init__(self, telemetry: "Telemetry | None" = None):
         self._tools: dict[str, Tool] = {}
+        self.telemetry = telemetry
+        self._version = 0
+        self._definitions: list[dict[str, Any]] | None = None
+        self._definitions_json: str | None = None
+        self._subset: tuple[frozenset[str], list[dict[str, Any]]] | None = None
+        self._tool_json: dict[str, str] | None = None
+
+    @property
+    def version(self) -> int:
+        """Incremented whenever the set of tools changes."""
+        return self._version
+
+    def _invalidate(self) -> None:
+        self._version += 1
+        self._definitions = None
+        self._definitions_json = None
+        self._subset = None
+        self._tool_json = None
 
     def register(self, tool: Tool) -> None:
         """Register a tool."""
         self._tools[tool.name] = tool
+        self._invalidate()
 
     def unregister(self, name: str) -> None:
         """Unregister a tool by name."""
-        self._tools.pop(name, None)
+        if self._tools.pop(name, None) is not None:
+            self._invalidate()
 
     def get(self, name: str) -> Tool | None:
         """Get a tool by name."""
@@ -31,12 +60,52 @@ class ToolRegistry:
         """Check if a tool is registered."""
         return name in self._tools
 
-    def get_definitions(self) -> list[dict[str, Any]]:
-        """Get all tool definitions in OpenAI format."""
-        return [tool.to_schema() for tool in self._tools.values()]
+    def get_definitions(self, names: Collection[str] | None = None) -> list[dict[str, Any]]:
+        """Get tool definitions in OpenAI format, optionally only those in *names*.
+
+        The same list object is returned until the tool set (or the requested
+        subset) changes, so callers must copy rather than mutate it.  Subsets
+        keep registration order so an unchanged subset serializes identically.
+        """
+        if self._definitions is None:
+            self._definitions = [tool.to_schema() for tool in self._tools.values()]
+        if names is None:
+            return self._definitions
+        key = frozenset(names)
+        if self._subset is None or self._subset[0] != key:
+            self._subset = (key, [d for d in self._definitions if d["function"]["name"] in key])
+        return self._subset[1]
+
+    def get_definitions_json(self) -> str:
+        """Tool definitions pre-serialized as a JSON array, cached like get_definitions()."""
+        if self._definitions_json is None:
+            self._definitions_json = json.dumps(self.get_definitions(), ensure_ascii=False)
+        return self._definitions_json
+
+    def definitions_tokens(self, names: Collection[str], chars_per_token: float = 4.0) -> int:
+        """
+        Estimated prompt tokens of the definitions of *names*.
+
+        Sized from per-tool JSON cached like get_definitions(), so measuring a
+        subset does not disturb the cached subset a request is about to send.
+        """
+        if self._tool_json is None:
+            self._tool_json = {
+                d["function"]["name"]: json.dumps(d, ensure_ascii=False) for d in self.get_definitions()
+            }
+        return sum(estimate_tokens(self._tool_json[n], chars_per_token) for n in names if n in self._tool_json)
 
     async def execute(self, name: str, params: dict[str, Any]) -> str:
         """Execute a tool by name with given parameters."""
+        if not self.telemetry or name not in self._tools:
+            return await self._execute(name, params)
+        start = time.perf_counter()
+        result = await self._execute(name, params)
+        ok = not (isinstance(result, str) and result.startswith("Error"))
+        self.telemetry.record_tool(name, time.perf_counter() - start, ok=ok)
+        return result
+
+    async def _execute(self, name: str, params: dict[str, Any]) -> str:
         _HINT = "\n\n[Analyze the error above and try a different approach.]"
 
         tool = self._tools.get(name)
@@ -54,6 +123,53 @@ class ToolRegistry:
         except Exception as e:
             return f"Error executing {name}: {str(e)}" + _HINT
 
+    async def execute_batch(
+        self, calls: list[tuple[str, dict[str, Any]]], max_parallel: int = 4,
+    ) -> list[str]:
+        """
+        Execute the tool calls of one LLM turn, overlapping independent calls.
+
+        At most ``max_parallel`` calls run at once.  Calls whose tools report
+        the same ``concurrency_key`` run in their original order, and
+        ``Tool.EXCLUSIVE`` calls run alone.  Results are returned in call order.
+        """
+        if max_parallel <= 1 or len(calls) <= 1:
+            return [await self.execute(name, params) for name, params in calls]
+
+        sem = asyncio.Semaphore(max_parallel)
+
+        async def run(deps: list[asyncio.Task], name: str, params: dict[str, Any]) -> str:
+            if deps:
+                await asyncio.wait(deps)
+            async with sem:
+                return await self.execute(name, params)
+
+        tasks: list[asyncio.Task] = []
+        last_by_key: dict[str, asyncio.Task] = {}
+        last_exclusive: asyncio.Task | None = None
+        for name, params in calls:
+            tool = self._tools.get(name)
+            try:
+                key = tool.concurrency_key(params) if tool else None
+            except Exception:
+                key = Tool.EXCLUSIVE
+            if key == Tool.EXCLUSIVE:
+                deps = list(tasks)
+            else:
+                deps = [t for t in (last_exclusive, last_by_key.get(key) if key else None) if t]
+            task = asyncio.create_task(run(deps, name, params))
+            tasks.append(task)
+            if key == Tool.EXCLUSIVE:
+                last_exclusive = task
+            elif key:
+                last_by_key[key] = task
+
+        try:
+            return list(await asyncio.gather(*tasks))
+        finally:
+            for task in tasks:
+                task.cancel()
+
     @property
     def tool_names(self) -> list[str]:
         """Get list of registered tool names."""
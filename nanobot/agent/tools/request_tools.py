@@ -0,0 +1,68 @@
+"""Meta-tool that exposes additional tools when tool subsetting hides them."""
+
+from contextvars import ContextVar
+from typing import Any
+
+from nanobot.agent.tool_index import ToolIndex
+from nanobot.agent.tools.base import Tool
+
+
+class RequestToolsTool(Tool):
+    """Let the model enable hidden tools by name or by keyword search."""
+
+    def __init__(self, index: ToolIndex, max_results: int = 5):
+        self.index = index
+        self.max_results = max_results
+        self._exposed: ContextVar[set[str] | None] = ContextVar("exposed_tools", default=None)
+
+    def start_turn(self, exposed: set[str]) -> None:
+        """Bind the tool set offered in the current turn (per asyncio task)."""
+        self._exposed.set(exposed)
+
+    @property
+    def name(self) -> str:
+        return "request_tools"
+
+    @property
+    def description(self) -> str:
+        return (
+            "Only the tools most relevant to the conversation are offered. "
+            "If you need a capability that is missing, call this with keywords describing it "
+            "(or exact tool names) and the matching tools become available on your next step."
+        )
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "Keywords describing the capability you need"},
+                "names": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Exact tool names to enable",
+                },
+            },
+        }
+
+    async def execute(self, query: str = "", names: list[str] | None = None, **kwargs: Any) -> str:
+        exposed = self._exposed.get()
+        if exposed is None:
+            return "Error: no active turn"
+        registry = self.index.registry
+        unknown = [n for n in names or [] if not registry.has(n)]
+        wanted = [n for n in names or [] if registry.has(n)]
+        if query:
+            wanted += [n for n, _ in self.index.rank(query) if n not in wanted][:self.max_results]
+        if not wanted:
+            return f"No tools match: {query or ', '.join(names or [])}"
+
+        lines = []
+        for name in wanted:
+            tool = registry.get(name)
+            state = "already available" if name in exposed else "enabled"
+            exposed.add(name)
+            lines.append(f"- {name} ({state}): {tool.description[:200]}")
+        if unknown:
+            lines.append(f"Unknown tool names: {', '.join(unknown)}")
+        return "Tools:\n" + "\n".join(lines)
@@ -0,0 +1,214 @@
+"""Resource-limited execution profiles for shell commands."""
+
+import json
+import os
+import signal
+import sys
+import tempfile
+import uuid
+from dataclasses import dataclass, fields, replace
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+if TYPE_CHECKING:
+    from nanobot.config.schema import SandboxConfig
+
+_RUNNER = Path(__file__).with_name("sandbox_runner.py")
+_MB = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class SandboxProfile:
+    """
+    Limits applied to every command ExecTool runs (0 = unlimited).
+
+    The rlimits hold per process and are inherited by everything a command
+    starts.  With ``cgroup_parent`` pointing at a writable cgroup v2
+    directory, each command (or persistent shell) also gets a child cgroup
+    whose memory.max, pids.max and cpu.max bound the whole process tree.
+    """
+
+    cpu_seconds: int = 0
+    memory_mb: int = 0
+    file_size_mb: int = 0
+    max_processes: int = 0
+    open_files: int = 0
+    cpu_quota: float = 0
+    cgroup_parent: str = ""
+
+    @classmethod
+    def from_config(cls, config: "SandboxConfig | None") -> "SandboxProfile | None":
+        if config is None or not config.enabled:
+            return None
+        if resource is None:
+            logger.warning("Exec sandbox is not supported on this platform; running commands unrestricted")
+            return None
+        return cls(**{f.name: getattr(config, f.name) for f in fields(cls)})
+
+    def tighten(self, other: "SandboxProfile | None") -> "SandboxProfile":
+        """The stricter of the two profiles, limit by limit."""
+        if other is None:
+            return self
+        limits = {}
+        for f in fields(self):
+            a, b = getattr(self, f.name), getattr(other, f.name)
+            if f.name == "cgroup_parent":
+                limits[f.name] = b or a
+            else:
+                limits[f.name] = min(a, b) if a and b else a or b
+        return replace(self, **limits)
+
+    def rlimits(self) -> dict[str, int]:
+        limits = {
+            "RLIMIT_CPU": self.cpu_seconds,
+            "RLIMIT_AS": self.memory_mb * _MB,
+            "RLIMIT_FSIZE": self.file_size_mb * _MB,
+            "RLIMIT_NPROC": self.max_processes,
+            "RLIMIT_NOFILE": self.open_files,
+        }
+        return {k: v for k, v in limits.items() if v}
+
+    def wrap(self, argv: list[str], usage_path: str = "", cgroup: "CgroupSlice | None" = None) -> list[str]:
+        """*argv* prefixed with the launcher that applies this profile."""
+        spec = {"rlimits": self.rlimits(), "cgroup": str(cgroup.path) if cgroup else None}
+        return [sys.executable, "-I", str(_RUNNER), json.dumps(spec), usage_path, "--", *argv]
+
+
+class CgroupSlice:
+    """A child cgroup v2 created for one command or shell session."""
+
+    _warned: set[str] = set()
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    @classmethod
+    def create(cls, profile: SandboxProfile) -> "CgroupSlice | None":
+        if not profile.cgroup_parent:
+            return None
+        path = Path(profile.cgroup_parent) / f"nanobot-{uuid.uuid4().hex[:12]}"
+        try:
+            path.mkdir()
+            if profile.memory_mb:
+                (path / "memory.max").write_text(str(profile.memory_mb * _MB))
+            if profile.max_processes:
+                (path / "pids.max").write_text(str(profile.max_processes))
+            if profile.cpu_quota:
+                (path / "cpu.max").write_text(f"{int(profile.cpu_quota * 100000)} 100000")
+        except OSError as e:
+            if profile.cgroup_parent not in cls._warned:
+                cls._warned.add(profile.cgroup_parent)
+                logger.warning("cgroup limits unavailable under {} (rlimits only): {}", profile.cgroup_parent, e)
+            cls(path).remove()
+            return None
+        return cls(path)
+
+    def _read(self, name: str) -> str:
+        try:
+            return (self.path / name).read_text()
+        except OSError:
+            return ""
+
+    def _stat(self, name: str, key: str) -> int:
+        for line in self._read(name).splitlines():
+            k, _, v = line.partition(" ")
+            if k == key and v.strip().isdigit():
+                return int(v)
+        return 0
+
+    def usage(self) -> dict[str, Any]:
+        """CPU time, peak memory and OOM kills of the whole tree (empty fields on older kernels)."""
+        peak = self._read("memory.peak").strip()
+        return {
+            "cpu_s": self._stat("cpu.stat", "usage_usec") / 1e6,
+            "max_rss_bytes": int(peak) if peak.isdigit() else 0,
+            "oom_kills": self._stat("memory.events", "oom_kill"),
+        }
+
+    def remove(self) -> None:
+        if (self.path / "cgroup.kill").exists():
+            try:
+                (self.path / "cgroup.kill").write_text("1")
+            except OSError:
+                pass
+        try:
+            self.path.rmdir()
+        except OSError as e:
+            logger.debug("Could not remove cgroup {}: {}", self.path, e)
+
+
+_LIMIT_SIGNALS = {
+    getattr(signal, name): limit
+    for name, limit in (("SIGXCPU", "CPU time"), ("SIGXFSZ", "file size"))
+    if hasattr(signal, name)
+}
+
+
+@dataclass
+class ResourceUsage:
+    cpu_s: float
+    max_rss_bytes: int | None  # None where it cannot be measured (persistent shells)
+    limit: str | None = None  # Limit that killed the command, if any
+
+    @classmethod
+    def for_shell_command(cls, cpu_s: float, returncode: int | None) -> "ResourceUsage":
+        """Usage of one command in a persistent shell, which only exposes its CPU time."""
+        sig = returncode - 128 if returncode and returncode > 128 else 0
+        return cls(cpu_s=cpu_s, max_rss_bytes=None, limit=_LIMIT_SIGNALS.get(sig))
+
+    def describe(self) -> str:
+        if self.max_rss_bytes is None:
+            text = f"(resources: cpu {self.cpu_s:.2f}s; max RSS is not tracked in persistent shells)"
+        else:
+            text = f"(resources: cpu {self.cpu_s:.2f}s, max RSS {self.max_rss_bytes / _MB:.1f} MB)"
+        if self.limit:
+            text += f"\n(killed: {self.limit} limit exceeded)"
+        return text
+
+
+class SandboxRun:
+    """One command under a profile: its wrapped argv, cgroup and usage report."""
+
+    def __init__(self, profile: SandboxProfile, argv: list[str]):
+        self.cgroup = CgroupSlice.create(profile)
+        fd, self._usage_path = tempfile.mkstemp(prefix="nanobot-usage-", suffix=".json")
+        os.close(fd)
+        self.argv = profile.wrap(argv, self._usage_path, self.cgroup)
+        self._finished = False
+
+    def finish(self, returncode: int | None) -> ResourceUsage | None:
+        """Collect usage and clean up; None if the launcher was killed before reporting."""
+        if self._finished:
+            return None
+        self._finished = True
+        try:
+            report = json.loads(Path(self._usage_path).read_text() or "null")
+        except (OSError, ValueError):
+            report = None
+        finally:
+            Path(self._usage_path).unlink(missing_ok=True)
+        cgroup = self.cgroup.usage() if self.cgroup else {}
+        if self.cgroup:
+            self.cgroup.remove()
+        if not report and not cgroup.get("cpu_s"):
+            return None
+
+        report = report or {}
+        # The cgroup covers the whole tree, including processes that outlived the shell.
+        usage = ResourceUsage(
+            cpu_s=max(report.get("cpu_s", 0.0), cgroup.get("cpu_s", 0.0)),
+            max_rss_bytes=max(report.get("max_rss_kb", 0) * 1024, cgroup.get("max_rss_bytes", 0)),
+        )
+        sig = report.get("signal") or (returncode - 128 if returncode and returncode > 128 else 0)
+        if cgroup.get("oom_kills"):
+            usage.limit = "memory"
+        elif sig in _LIMIT_SIGNALS:
+            usage.limit = _LIMIT_SIGNALS[sig]
+        return usage
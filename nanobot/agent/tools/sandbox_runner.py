@@ -0,0 +1,69 @@
+"""
+Launcher for sandboxed exec commands.
+
+Run as a script (``python -I sandbox_runner.py SPEC USAGE_PATH -- ARGV...``)
+so it starts without importing nanobot.  It joins the cgroup named in the
+JSON ``SPEC``, runs ``ARGV`` with the spec's rlimits, waits for it with
+``wait4`` and writes its CPU time and max RSS as JSON to ``USAGE_PATH``
+(skipped when empty).  Keep this module stdlib-only.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def set_rlimits(limits: dict[str, int]) -> None:
+    """Lower soft and hard limits of the current process, e.g. {"RLIMIT_CPU": 10}."""
+    for name, value in limits.items():
+        which = getattr(resource, name, None)
+        if which is None:
+            continue
+        # Past a soft CPU limit the kernel sends SIGXCPU; only the hard one means SIGKILL.
+        soft, new_hard = value, value + 1 if name == "RLIMIT_CPU" else value
+        _, hard = resource.getrlimit(which)
+        if hard != resource.RLIM_INFINITY:
+            soft, new_hard = min(soft, hard), min(new_hard, hard)
+        try:
+            resource.setrlimit(which, (soft, new_hard))
+        except (ValueError, OSError):
+            pass
+
+
+def main(argv: list[str]) -> int:
+    spec, usage_path, argv = json.loads(argv[1]), argv[2], argv[4:]
+    if cgroup := spec.get("cgroup"):
+        try:
+            with open(os.path.join(cgroup, "cgroup.procs"), "w") as f:
+                f.write(str(os.getpid()))
+        except OSError:
+            pass
+
+    limits = spec.get("rlimits") or {}
+    try:
+        # Single-threaded here, so preexec_fn is safe (unlike in the gateway).
+        child = subprocess.Popen(argv, preexec_fn=lambda: set_rlimits(limits))
+    except OSError as e:
+        print(f"sandbox: {e}", file=sys.stderr)
+        return 127
+    _, status, usage = os.wait4(child.pid, 0)
+    child.returncode = code = os.waitstatus_to_exitcode(status)
+
+    if usage_path:
+        with open(usage_path, "w") as f:
+            json.dump({
+                "cpu_s": usage.ru_utime + usage.ru_stime,
+                "max_rss_kb": usage.ru_maxrss,
+                "signal": -code if code < 0 else 0,
+            }, f)
+    return 128 - code if code < 0 else code
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -3,10 +3,24 @@
 import asyncio
 import os
 import re
+import time
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
 
 from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.sandbox import ResourceUsage, SandboxProfile, SandboxRun
+from nanobot.agent.tools.shell_output import (
+    OutputCapture,
+    OutputLimitExceededError,
+    gather_or_cancel,
+    kill_process_group,
+    read_stream,
+)
+from nanobot.agent.tools.shell_session import ShellSessionPool
+
+if TYPE_CHECKING:
+    from nanobot.telemetry import Telemetry
 
 
 class ExecTool(Tool):
@@ -20,6 +34,11 @@ class ExecTool(Tool):
         allow_patterns: list[str] | None = None,
         restrict_to_workspace: bool = False,
         path_append: str = "",
+        shell_pool: ShellSessionPool | None = None,
+        max_output_bytes: int = 50 * 1024 * 1024,
+        progress_interval: float = 0,
+        sandbox: SandboxProfile | None = None,
+        telemetry: "Telemetry | None" = None,
     ):
         self.timeout = timeout
         self.working_dir = working_dir
@@ -37,13 +56,44 @@ class ExecTool(Tool):
         self.allow_patterns = allow_patterns or []
         self.restrict_to_workspace = restrict_to_workspace
         self.path_append = path_append
+        # With a pool, commands run in one persistent bash per conversation.
+        self.shell_pool = shell_pool
+        self._session_key: ContextVar[str] = ContextVar("exec_session", default="cli:direct")
+        # Output is read incrementally; past this many bytes the command is killed.
+        self.max_output_bytes = max_output_bytes
+        # Seconds between partial-output progress updates (0 = off).
+        self.progress_interval = progress_interval
+        self._progress: ContextVar[Callable[[str], Awaitable[None]] | None] = ContextVar(
+            "exec_progress", default=None
+        )
+        # Resource limits for one-shot commands (persistent shells get theirs from the pool).
+        self.sandbox = sandbox
+        self.telemetry = telemetry
+
+    def set_context(self, channel: str, chat_id: str) -> None:
+        """Select the conversation whose persistent shell runs commands (per asyncio task)."""
+        self._session_key.set(f"{channel}:{chat_id}")
+
+    def set_progress(self, callback: Callable[[str], Awaitable[None]] | None) -> None:
+        """Set where partial output is streamed while a command runs (per asyncio task)."""
+        self._progress.set(callback)
 
     @property
     def name(self) -> str:
         return "exec"
 
+    def concurrency_key(self, params: dict[str, Any]) -> str | None:
+        # Shell commands can touch anything, so keep them in order with every other call.
+        return Tool.EXCLUSIVE
+
     @property
     def description(self) -> str:
+        if self.shell_pool is not None:
+            return (
+                "Execute a shell command and return its output. Use with caution. "
+                "Commands share one shell per conversation, so cd, exported variables "
+                "and activated virtualenvs persist between calls."
+            )
         return "Execute a shell command and return its output. Use with caution."
 
     @property
@@ -63,64 +113,170 @@ class ExecTool(Tool):
             "required": ["command"]
         }
     
+    def _env(self) -> dict[str, str]:
+        env = os.environ.copy()
+        if self.path_append:
+            env["PATH"] = env.get("PATH", "") + os.pathsep + self.path_append
+        return env
+
     async def execute(self, command: str, working_dir: str | None = None, **kwargs: Any) -> str:
+        if self.shell_pool is not None:
+            return await self._execute_persistent(command, working_dir)
         cwd = working_dir or self.working_dir or os.getcwd()
         guard_error = self._guard_command(command, cwd)
         if guard_error:
             return guard_error
         
-        env = os.environ.copy()
-        if self.path_append:
-            env["PATH"] = env.get("PATH", "") + os.pathsep + self.path_append
+        env = self._env()
 
+        run = SandboxRun(self.sandbox, ["/bin/sh", "-c", command]) if self.sandbox else None
         try:
-            process = await asyncio.create_subprocess_shell(
-                command,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=cwd,
-                env=env,
-            )
+            if run:
+                process = await asyncio.create_subprocess_exec(
+                    *run.argv,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=cwd,
+                    env=env,
+                    start_new_session=True,
+                )
+            else:
+                process = await asyncio.create_subprocess_shell(
+                    command,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=cwd,
+                    env=env,
+                    start_new_session=True,  # Own process group, so children die with it
+                )
             
+            stdout, stderr = self._captures()
+            on_data = self._watch(stdout, stderr)
             try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(),
+                await asyncio.wait_for(
+                    gather_or_cancel(
+                        read_stream(process.stdout, stdout, on_data),
+                        read_stream(process.stderr, stderr, on_data),
+                        process.wait(),
+                    ),
                     timeout=self.timeout
                 )
             except asyncio.TimeoutError:
-                process.kill()
-                # Wait for the process to fully terminate so pipes are
-                # drained and file descriptors are released.
-                try:
-                    await asyncio.wait_for(process.wait(), timeout=5.0)
-                except asyncio.TimeoutError:
-                    pass
-                return f"Error: Command timed out after {self.timeout} seconds"
-            
-            output_parts = []
-            
-            if stdout:
-                output_parts.append(stdout.decode("utf-8", errors="replace"))
-            
-            if stderr:
-                stderr_text = stderr.decode("utf-8", errors="replace")
-                if stderr_text.strip():
-                    output_parts.append(f"STDERR:\n{stderr_text}")
-            
-            if process.returncode != 0:
-                output_parts.append(f"\nExit code: {process.returncode}")
-            
-            result = "\n".join(output_parts) if output_parts else "(no output)"
-            
-            # Truncate very long output
-            max_len = 10000
-            if len(result) > max_len:
-                result = result[:max_len] + f"\n... (truncated, {len(result) - max_len} more chars)"
-            
-            return result
+                await kill_process_group(process)
+                return self._timeout_error(stdout, stderr)
+            except OutputLimitExceededError:
+                await kill_process_group(process)
+                return self._format_output(stdout.getvalue(), stderr.getvalue(), None) + (
+                    f"\n(output exceeded {self.max_output_bytes} bytes; command killed)"
+                )
+            except asyncio.CancelledError:
+                await kill_process_group(process)
+                raise
+
+            output = self._format_output(stdout.getvalue(), stderr.getvalue(), process.returncode)
+            if run and (usage := run.finish(process.returncode)):
+                output += "\n" + usage.describe()
+                if self.telemetry:
+                    self.telemetry.record_exec_usage(usage.cpu_s, usage.max_rss_bytes, usage.limit)
+            return output
             
         except Exception as e:
             return f"Error executing command: {str(e)}"
+        finally:
+            if run:
+                run.finish(None)  # Cleans up after timeouts and errors; no-op once finished
+
+    async def _execute_persistent(self, command: str, working_dir: str | None) -> str:
+        key = self._session_key.get()
+        root = self.working_dir or os.getcwd()
+        async with self.shell_pool.session(key, root, self._env()) as session:
+            # Anchor the guard to the workspace, not the shell's cwd, which `cd` moves.
+            guard_error = self._guard_command(command, root)
+            if guard_error:
+                return guard_error
+            note = ""
+            if self.restrict_to_workspace:
+                if working_dir and not self._is_within(Path(session.cwd, working_dir), root):
+                    return "Error: Command blocked by safety guard (working_dir outside workspace)"
+                if not working_dir and not self._is_within(Path(session.cwd), root):
+                    # An earlier `cd` (e.g. bare `cd` to $HOME) left the workspace.
+                    working_dir, note = root, "\n(shell had left the workspace; command ran from the workspace root)"
+            stdout, stderr = self._captures()
+            try:
+                result = await session.run(
+                    command, self.timeout, working_dir, stdout, stderr, self._watch(stdout, stderr),
+                )
+            except asyncio.TimeoutError:
+                return self._timeout_error(
+                    stdout, stderr, " (shell restarted; exported variables and other shell state were reset)",
+                )
+            except OutputLimitExceededError:
+                return self._format_output(stdout.getvalue(), stderr.getvalue(), None) + (
+                    f"\n(output exceeded {self.max_output_bytes} bytes; command killed and shell restarted)"
+                )
+            except Exception as e:
+                await session.close()
+                return f"Error executing command: {str(e)}"
+        output = self._format_output(result.stdout, result.stderr, result.returncode) + note
+        if result.returncode is None:
+            output += "\n(shell exited; a fresh one will start on the next command)"
+        elif session.sandbox and result.cpu_s is not None:
+            usage = ResourceUsage.for_shell_command(result.cpu_s, result.returncode)
+            output += "\n" + usage.describe()
+            if self.telemetry:
+                self.telemetry.record_exec_usage(usage.cpu_s, usage.max_rss_bytes, usage.limit)
+        return output
+
+    @staticmethod
+    def _captures() -> tuple[OutputCapture, OutputCapture]:
+        """Bounded stdout/stderr buffers; together they fit within _format_output's limit."""
+        return OutputCapture(head_bytes=5000, tail_bytes=3000), OutputCapture(head_bytes=1000, tail_bytes=1000)
+
+    def _watch(self, stdout: OutputCapture, stderr: OutputCapture) -> Callable[[], Awaitable[None]]:
+        """Per-chunk hook enforcing the output cap and emitting throttled progress."""
+        progress = self._progress.get() if self.progress_interval > 0 else None
+        last = time.monotonic()
+
+        async def on_data() -> None:
+            nonlocal last
+            if self.max_output_bytes and stdout.total + stderr.total > self.max_output_bytes:
+                raise OutputLimitExceededError
+            if progress and (now := time.monotonic()) - last >= self.progress_interval:
+                last = now
+                if text := stdout.last_text(300).strip():
+                    await progress(text)
+
+        return on_data
+
+    def _timeout_error(self, stdout: OutputCapture, stderr: OutputCapture, note: str = "") -> str:
+        error = f"Error: Command timed out after {self.timeout} seconds{note}"
+        if stdout.total or stderr.total:
+            error += "\n\nPartial output:\n" + self._format_output(stdout.getvalue(), stderr.getvalue(), None)
+        return error
+
+    @staticmethod
+    def _format_output(stdout: bytes, stderr: bytes, returncode: int | None) -> str:
+        output_parts = []
+
+        if stdout:
+            output_parts.append(stdout.decode("utf-8", errors="replace"))
+
+        if stderr:
+            stderr_text = stderr.decode("utf-8", errors="replace")
+            if stderr_text.strip():
+                output_parts.append(f"STDERR:\n{stderr_text}")
+
+        if returncode not in (0, None):
+            output_parts.append(f"\nExit code: {returncode}")
+
+        result = "\n".join(output_parts) if output_parts else "(no output)"
+
+        # Truncate very long output
+        max_len = 10000
+        if len(result) > max_len:
+            result = result[:max_len] + f"\n... (truncated, {len(result) - max_len} more chars)"
+
+        return result
 
     def _guard_command(self, command: str, cwd: str) -> str | None:
         """Best-effort safety guard for potentially destructive commands."""
@@ -151,6 +307,11 @@ class ExecTool(Tool):
 
         return None
 
+    @staticmethod
+    def _is_within(path: Path, root: str) -> bool:
+        path, root_path = path.resolve(), Path(root).resolve()
+        return path == root_path or root_path in path.parents
+
     @staticmethod
     def _extract_absolute_paths(command: str) -> list[str]:
         win_paths = re.findall(r"[A-Za-z]:\\[^\s\"'|><;]+", command)   # Windows: C:\...
@@ -0,0 +1,137 @@
+"""Bounded capture of subprocess output."""
+
+import asyncio
+import os
+import signal
+from typing import Awaitable, Callable
+
+
+class OutputLimitExceededError(Exception):
+    """A command produced more output than the hard cap allows."""
+
+
+class OutputCapture:
+    """
+    Keeps the first ``head_bytes`` and last ``tail_bytes`` of a stream.
+
+    Everything in between is counted in ``dropped`` but never stored, so
+    memory stays bounded however much the command prints.
+    """
+
+    def __init__(self, head_bytes: int = 5000, tail_bytes: int = 3000):
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+        self.dropped = 0
+
+    def feed(self, data: bytes) -> None:
+        self.total += len(data)
+        room = self.head_bytes - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        if not data:
+            return
+        self.tail += data
+        if (excess := len(self.tail) - self.tail_bytes) > 0:
+            self.dropped += excess
+            del self.tail[:excess]
+
+    def getvalue(self) -> bytes:
+        if not self.dropped:
+            return bytes(self.head + self.tail)
+        return bytes(self.head) + f"\n... ({self.dropped} bytes omitted) ...\n".encode() + bytes(self.tail)
+
+    def last_text(self, limit: int) -> str:
+        """The most recent *limit* bytes seen, decoded."""
+        recent = (self.head + self.tail)[-limit:]
+        return bytes(recent).decode("utf-8", errors="replace")
+
+
+async def read_stream(
+    stream: asyncio.StreamReader,
+    capture: OutputCapture,
+    on_data: Callable[[], Awaitable[None]] | None = None,
+) -> None:
+    """Feed *stream* into *capture* until EOF, awaiting *on_data* after each chunk."""
+    while chunk := await stream.read(65536):
+        capture.feed(chunk)
+        if on_data:
+            await on_data()
+
+
+async def read_until(
+    stream: asyncio.StreamReader,
+    marker: bytes,
+    capture: OutputCapture,
+    on_data: Callable[[], Awaitable[None]] | None = None,
+) -> bytes | None:
+    """
+    Feed *stream* into *capture* up to *marker*.
+
+    Returns the rest of the marker's line (empty if *marker* ends in a
+    newline), or None on EOF.  Only a marker-sized window is held back
+    while scanning, so memory stays bounded here too.
+    """
+    pending = b""
+    keep = len(marker) - 1
+    while True:
+        chunk = await stream.read(65536)
+        if not chunk:
+            capture.feed(pending)
+            return None
+        pending += chunk
+        if (i := pending.find(marker)) >= 0:
+            if marker.endswith(b"\n"):
+                capture.feed(pending[:i])
+                return b""
+            if (end := pending.find(b"\n", i + len(marker))) >= 0:
+                capture.feed(pending[:i])
+                return pending[i + len(marker):end]
+            continue  # Marker seen; wait for the rest of its line
+        if len(pending) > keep:
+            capture.feed(pending[:-keep] if keep else pending)
+            pending = pending[-keep:] if keep else b""
+        if on_data:
+            await on_data()
+
+
+async def gather_or_cancel(*aws: Awaitable) -> list:
+    """Like asyncio.gather, but cancels the remaining awaitables once one fails."""
+    tasks = [asyncio.ensure_future(a) for a in aws]
+    try:
+        return await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def kill_process_group(process: asyncio.subprocess.Process) -> None:
+    """SIGKILL the process's whole group (it must have been started with start_new_session)."""
+    if process.returncode is None:
+        try:
+            if hasattr(os, "killpg"):
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+        except ProcessLookupError:
+            pass
+        except PermissionError:
+            process.kill()
+    # Wait for the process to fully terminate so pipes are drained and
+    # file descriptors are released.  Unread output must be discarded, or a
+    # full, paused pipe keeps wait() from ever returning.
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(_discard(process.stdout), _discard(process.stderr), process.wait()),
+            timeout=5.0,
+        )
+    except asyncio.TimeoutError:
+        pass
+
+
+async def _discard(stream: asyncio.StreamReader | None) -> None:
+    while stream is not None and await stream.read(65536):
+        pass
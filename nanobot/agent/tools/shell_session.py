@@ -0,0 +1,197 @@
+"""Long-lived bash processes that keep cwd and environment between exec calls."""
+
+import asyncio
+import os
+import shlex
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable
+
+from loguru import logger
+
+from nanobot.agent.tools.sandbox import CgroupSlice, SandboxProfile
+from nanobot.agent.tools.shell_output import (
+    OutputCapture,
+    OutputLimitExceededError,
+    gather_or_cancel,
+    kill_process_group,
+    read_until,
+)
+
+
+@dataclass
+class ShellResult:
+    stdout: bytes
+    stderr: bytes
+    returncode: int | None  # None when the shell exited mid-command
+    cwd: str
+    cpu_s: float | None = None  # CPU time of the command and the children it waited for
+
+
+class ShellSession:
+    """
+    One bash process fed commands over stdin.
+
+    Each command is ``eval``-ed with stdin from /dev/null and followed by a
+    per-command sentinel on both stdout and stderr carrying ``$?`` and
+    ``$PWD``, so output can be split without closing the pipes.  The stdout
+    sentinel also carries the shell's cumulative CPU ticks (self plus waited-for
+    children, from /proc), so each command's CPU time is the difference.
+    """
+
+    def __init__(self, cwd: str, env: dict[str, str], sandbox: SandboxProfile | None = None):
+        self.cwd = cwd
+        self.env = env
+        self.sandbox = sandbox
+        self.last_used = time.monotonic()
+        self.lock = asyncio.Lock()
+        self.users = 0  # Callers holding or waiting for the session; the pool never evicts it meanwhile
+        self._process: asyncio.subprocess.Process | None = None
+        self._cgroup: CgroupSlice | None = None
+        self._cpu_ticks = 0
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.returncode is None
+
+    async def _start(self) -> None:
+        argv = ["bash", "--noprofile", "--norc"]
+        if self.sandbox:
+            # rlimits apply to each command the shell runs; the cgroup bounds the session as a whole.
+            self._cgroup = CgroupSlice.create(self.sandbox)
+            argv = self.sandbox.wrap(argv, cgroup=self._cgroup)
+        self._process = await asyncio.create_subprocess_exec(
+            *argv,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=self.cwd,
+            env=self.env,
+            start_new_session=True,  # Own process group, so a hang can be killed as a whole
+        )
+        self._cpu_ticks = 0
+
+    async def run(
+        self,
+        command: str,
+        timeout: float,
+        working_dir: str | None = None,
+        stdout: OutputCapture | None = None,
+        stderr: OutputCapture | None = None,
+        on_data: Callable[[], Awaitable[None]] | None = None,
+    ) -> ShellResult:
+        """
+        Run *command*, feeding its output into the given captures.
+
+        If it hangs past *timeout* (asyncio.TimeoutError) or *on_data* raises
+        OutputLimitExceededError, the shell is killed and the error re-raised; the
+        captures keep the partial output.
+        """
+        if not self.alive:
+            await self._start()
+        self.last_used = time.monotonic()
+        sentinel = f"__NANOBOT_{uuid.uuid4().hex}__"
+        script = ""
+        if working_dir:
+            script += f"cd -- {shlex.quote(working_dir)} && "
+        script += (
+            f"eval {shlex.quote(command)} < /dev/null\n"
+            "__nb_rc=$?; __nb_cpu=\n"
+            # Fields 14-17 of /proc/$$/stat: utime, stime, cutime, cstime (read without forking).
+            "{ read -r __nb_stat < /proc/$$/stat; } 2>/dev/null && __nb_s=(${__nb_stat##*) }) && "
+            "__nb_cpu=$((__nb_s[11] + __nb_s[12] + __nb_s[13] + __nb_s[14]))\n"
+            f"printf '\\n{sentinel}:%s:%s:%s\\n' \"$__nb_rc\" \"$__nb_cpu\" \"$PWD\"; printf '\\n{sentinel}\\n' >&2\n"
+        )
+        stdout = stdout or OutputCapture()
+        stderr = stderr or OutputCapture()
+        proc = self._process
+        try:
+            proc.stdin.write(script.encode())
+            await proc.stdin.drain()
+            tail, _ = await asyncio.wait_for(
+                gather_or_cancel(
+                    read_until(proc.stdout, f"\n{sentinel}:".encode(), stdout, on_data),
+                    read_until(proc.stderr, f"\n{sentinel}\n".encode(), stderr, on_data),
+                ),
+                timeout=timeout,
+            )
+        except (asyncio.TimeoutError, asyncio.CancelledError, OutputLimitExceededError):
+            await self.close()
+            raise
+        except (BrokenPipeError, ConnectionResetError):
+            tail = None
+        finally:
+            self.last_used = time.monotonic()
+
+        if tail is None:  # EOF: the command ended the shell (e.g. `exit`)
+            await self.close()
+            return ShellResult(stdout.getvalue(), stderr.getvalue(), None, self.cwd)
+        rc, _, rest = tail.decode("utf-8", errors="replace").partition(":")
+        ticks, _, cwd = rest.partition(":")
+        self.cwd = cwd or self.cwd
+        cpu_s = None
+        if ticks.isdigit():
+            cpu_s = (int(ticks) - self._cpu_ticks) / os.sysconf("SC_CLK_TCK")
+            self._cpu_ticks = int(ticks)
+        return ShellResult(stdout.getvalue(), stderr.getvalue(), int(rc) if rc.isdigit() else None, self.cwd, cpu_s)
+
+    async def close(self) -> None:
+        proc, self._process = self._process, None
+        if proc is not None:
+            await kill_process_group(proc)
+        cgroup, self._cgroup = self._cgroup, None
+        if cgroup is not None:
+            cgroup.remove()
+
+
+class ShellSessionPool:
+    """Shell sessions keyed by conversation, reaped when idle or over ``max_sessions``."""
+
+    def __init__(self, max_sessions: int = 8, idle_timeout: float = 600, sandbox: SandboxProfile | None = None):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.sandbox = sandbox
+        self._sessions: dict[str, ShellSession] = {}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    @asynccontextmanager
+    async def session(self, key: str, cwd: str, env: dict[str, str]) -> AsyncIterator[ShellSession]:
+        """
+        The shell for *key*, locked for the caller.
+
+        The session is marked in use before anything can await, so eviction
+        and idle reaping cannot close it between lookup and locking.
+        """
+        await self.reap()
+        while key not in self._sessions and len(self._sessions) >= self.max_sessions:
+            idle = [k for k, s in self._sessions.items() if not s.users]
+            if not idle:
+                break
+            oldest = min(idle, key=lambda k: self._sessions[k].last_used)
+            await self._sessions.pop(oldest).close()
+        session = self._sessions.get(key)
+        if session is None:
+            session = self._sessions[key] = ShellSession(cwd, env, self.sandbox)
+        session.users += 1
+        try:
+            async with session.lock:
+                yield session
+        finally:
+            session.users -= 1
+
+    async def reap(self) -> None:
+        """Close shells idle for longer than ``idle_timeout``."""
+        now = time.monotonic()
+        for key, session in list(self._sessions.items()):
+            if not session.users and now - session.last_used > self.idle_timeout:
+                logger.debug("Reaping idle shell session {}", key)
+                await self._sessions.pop(key).close()
+
+    async def close_all(self) -> None:
+        for session in self._sessions.values():
+            await session.close()
+        self._sessions.clear()
@@ -1,9 +1,13 @@
 """Web tools: web_search and web_fetch."""
 
+import asyncio
 import html
 import json
 import os
 import re
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from typing import Any
 from urllib.parse import urlparse
 
@@ -11,10 +15,19 @@ import httpx
 from loguru import logger
 
 from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.web_cache import (
+    WebFetchCache,
+    WebSearchCache,
+    cache_entry,
+    conditional_headers,
+    freshness_deadline,
+)
+from nanobot.utils.http import HttpClientPool, RateLimiter, get_http_pool
 
 # Shared constants
 USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_7_2) AppleWebKit/537.36"
-MAX_REDIRECTS = 5  # Limit redirects to prevent DoS attacks
+# Redirects are capped by the pooled client (see nanobot.utils.http.DEFAULT_MAX_REDIRECTS)
+EXTRACT_WORKERS = 2  # Threads shared by all WebFetchTool instances for HTML extraction
 
 
 def _strip_tags(text: str) -> str:
@@ -31,6 +44,59 @@ def _normalize(text: str) -> str:
     return re.sub(r'\n{3,}', '\n\n', text).strip()
 
 
+def _to_markdown(html: str) -> str:
+    """Convert HTML to markdown."""
+    # Convert links, headings, lists before stripping tags
+    text = re.sub(r'<a\s+[^>]*href=["\']([^"\']+)["\'][^>]*>([\s\S]*?)</a>',
+                  lambda m: f'[{_strip_tags(m[2])}]({m[1]})', html, flags=re.I)
+    text = re.sub(r'<h([1-6])[^>]*>([\s\S]*?)</h\1>',
+                  lambda m: f'\n{"#" * int(m[1])} {_strip_tags(m[2])}\n', text, flags=re.I)
+    text = re.sub(r'<li[^>]*>([\s\S]*?)</li>', lambda m: f'\n- {_strip_tags(m[1])}', text, flags=re.I)
+    text = re.sub(r'</(p|div|section|article)>', '\n\n', text, flags=re.I)
+    text = re.sub(r'<(br|hr)\s*/?>', '\n', text, flags=re.I)
+    return _normalize(_strip_tags(text))
+
+
+def _extract_text(body: str, ctype: str, extract_mode: str) -> tuple[str, str]:
+    """Extract readable text from a response body.  CPU-bound: runs in the extraction pool."""
+    from readability import Document
+
+    if "application/json" in ctype:
+        try:
+            return json.dumps(json.loads(body), indent=2, ensure_ascii=False), "json"
+        except ValueError:
+            return body, "raw"  # e.g. JSON cut off by the download cap
+    if "text/html" in ctype or body[:256].lower().startswith(("<!doctype", "<html")):
+        doc = Document(body)
+        content = _to_markdown(doc.summary()) if extract_mode == "markdown" else _strip_tags(doc.summary())
+        return (f"# {doc.title()}\n\n{content}" if doc.title() else content), "readability"
+    return body, "raw"
+
+
+_extract_pool: ThreadPoolExecutor | None = None
+# Extractions abandoned after a timeout whose threads are still running.  Threads
+# cannot be killed, so once every worker is stuck new requests fail fast instead
+# of queueing behind them.
+_extract_stuck: set[Future] = set()
+
+
+def _get_extract_pool() -> ThreadPoolExecutor:
+    """Small shared pool so page extraction never blocks the event loop."""
+    global _extract_pool
+    if _extract_pool is None:
+        _extract_pool = ThreadPoolExecutor(max_workers=EXTRACT_WORKERS, thread_name_prefix="web-extract")
+    return _extract_pool
+
+
+@dataclass
+class _Download:
+    """A response whose body was read up to the download cap."""
+
+    response: httpx.Response
+    body: bytes
+    capped: bool
+
+
 def _validate_url(url: str) -> tuple[bool, str]:
     """Validate URL: must be http(s) with valid domain."""
     try:
@@ -58,10 +124,21 @@ class WebSearchTool(Tool):
         "required": ["query"]
     }
 
-    def __init__(self, api_key: str | None = None, max_results: int = 5, proxy: str | None = None):
+    def __init__(
+        self,
+        api_key: str | None = None,
+        max_results: int = 5,
+        proxy: str | None = None,
+        http_pool: HttpClientPool | None = None,
+        cache: WebSearchCache | None = None,
+        rate_limiter: RateLimiter | None = None,
+    ):
         self._init_api_key = api_key
         self.max_results = max_results
         self.proxy = proxy
+        self.http_pool = http_pool or get_http_pool()
+        self.cache = cache
+        self.rate_limiter = rate_limiter
 
     @property
     def api_key(self) -> str:
@@ -78,17 +155,13 @@ class WebSearchTool(Tool):
 
         try:
             n = min(max(count or self.max_results, 1), 10)
-            logger.debug("WebSearch: {}", "proxy enabled" if self.proxy else "direct connection")
-            async with httpx.AsyncClient(proxy=self.proxy) as client:
-                r = await client.get(
-                    "https://api.search.brave.com/res/v1/web/search",
-                    params={"q": query, "count": n},
-                    headers={"Accept": "application/json", "X-Subscription-Token": self.api_key},
-                    timeout=10.0
-                )
-                r.raise_for_status()
-
-            results = r.json().get("web", {}).get("results", [])[:n]
+            results = self.cache.get(query, n) if self.cache else None
+            if results is None:
+                results = await self._search(query, n)
+                if self.cache:
+                    self.cache.put(query, n, results)
+            else:
+                logger.debug("WebSearch cache hit: {}", query)
             if not results:
                 return f"No results for: {query}"
 
@@ -105,6 +178,24 @@ class WebSearchTool(Tool):
             logger.error("WebSearch error: {}", e)
             return f"Error: {e}"
 
+    async def _search(self, query: str, n: int) -> list[dict[str, Any]]:
+        """Call the Brave API, keeping only the fields the tool reports."""
+        if self.rate_limiter:
+            await self.rate_limiter.acquire()
+        logger.debug("WebSearch: {}", "proxy enabled" if self.proxy else "direct connection")
+        client = self.http_pool.get(proxy=self.proxy)
+        r = await client.get(
+            "https://api.search.brave.com/res/v1/web/search",
+            params={"q": query, "count": n},
+            headers={"Accept": "application/json", "X-Subscription-Token": self.api_key},
+            timeout=10.0
+        )
+        r.raise_for_status()
+        return [
+            {"title": item.get("title", ""), "url": item.get("url", ""), "description": item.get("description", "")}
+            for item in r.json().get("web", {}).get("results", [])[:n]
+        ]
+
 
 class WebFetchTool(Tool):
     """Fetch and extract content from a URL using Readability."""
@@ -121,13 +212,23 @@ class WebFetchTool(Tool):
         "required": ["url"]
     }
 
-    def __init__(self, max_chars: int = 50000, proxy: str | None = None):
+    def __init__(
+        self,
+        max_chars: int = 50000,
+        proxy: str | None = None,
+        http_pool: HttpClientPool | None = None,
+        cache: WebFetchCache | None = None,
+        max_download_bytes: int = 5 * 1024 * 1024,
+        extract_timeout: float = 20.0,
+    ):
         self.max_chars = max_chars
         self.proxy = proxy
+        self.http_pool = http_pool or get_http_pool()
+        self.cache = cache
+        self.max_download_bytes = max_download_bytes
+        self.extract_timeout = extract_timeout
 
     async def execute(self, url: str, extractMode: str = "markdown", maxChars: int | None = None, **kwargs: Any) -> str:
-        from readability import Document
-
         max_chars = maxChars or self.max_chars
         is_valid, error_msg = _validate_url(url)
         if not is_valid:
@@ -135,32 +236,28 @@ class WebFetchTool(Tool):
 
         try:
             logger.debug("WebFetch: {}", "proxy enabled" if self.proxy else "direct connection")
-            async with httpx.AsyncClient(
-                follow_redirects=True,
-                max_redirects=MAX_REDIRECTS,
-                timeout=30.0,
-                proxy=self.proxy,
-            ) as client:
-                r = await client.get(url, headers={"User-Agent": USER_AGENT})
-                r.raise_for_status()
-
-            ctype = r.headers.get("content-type", "")
-
-            if "application/json" in ctype:
-                text, extractor = json.dumps(r.json(), indent=2, ensure_ascii=False), "json"
-            elif "text/html" in ctype or r.text[:256].lower().startswith(("<!doctype", "<html")):
-                doc = Document(r.text)
-                content = self._to_markdown(doc.summary()) if extractMode == "markdown" else _strip_tags(doc.summary())
-                text = f"# {doc.title()}\n\n{content}" if doc.title() else content
-                extractor = "readability"
+            if self.cache:
+                key = self.cache.key(url, extractMode)
+                page, outcome = await self.cache.single_flight(key, lambda: self._load_cached(key, url, extractMode))
+                stats = self.cache.report()
+                logger.debug(
+                    "WebFetch cache {} for {} (hit rate {:.0%}, {} entries, {} bytes)",
+                    outcome, url, stats["hit_rate"], stats["entries"], stats["bytes"],
+                )
             else:
-                text, extractor = r.text, "raw"
+                page, outcome = await self._download(url, extractMode), None
 
+            text = page["text"]
             truncated = len(text) > max_chars
             if truncated: text = text[:max_chars]
 
-            return json.dumps({"url": url, "finalUrl": str(r.url), "status": r.status_code,
-                              "extractor": extractor, "truncated": truncated, "length": len(text), "text": text}, ensure_ascii=False)
+            result = {"url": url, "finalUrl": page["finalUrl"], "status": page["status"],
+                      "extractor": page["extractor"], "truncated": truncated, "length": len(text), "text": text}
+            if page.get("downloadCapped"):
+                result["downloadCapped"] = True
+            if outcome:
+                result["cache"] = outcome
+            return json.dumps(result, ensure_ascii=False)
         except httpx.ProxyError as e:
             logger.error("WebFetch proxy error for {}: {}", url, e)
             return json.dumps({"error": f"Proxy error: {e}", "url": url}, ensure_ascii=False)
@@ -168,14 +265,75 @@ class WebFetchTool(Tool):
             logger.error("WebFetch error for {}: {}", url, e)
             return json.dumps({"error": str(e), "url": url}, ensure_ascii=False)
 
-    def _to_markdown(self, html: str) -> str:
-        """Convert HTML to markdown."""
-        # Convert links, headings, lists before stripping tags
-        text = re.sub(r'<a\s+[^>]*href=["\']([^"\']+)["\'][^>]*>([\s\S]*?)</a>',
-                      lambda m: f'[{_strip_tags(m[2])}]({m[1]})', html, flags=re.I)
-        text = re.sub(r'<h([1-6])[^>]*>([\s\S]*?)</h\1>',
-                      lambda m: f'\n{"#" * int(m[1])} {_strip_tags(m[2])}\n', text, flags=re.I)
-        text = re.sub(r'<li[^>]*>([\s\S]*?)</li>', lambda m: f'\n- {_strip_tags(m[1])}', text, flags=re.I)
-        text = re.sub(r'</(p|div|section|article)>', '\n\n', text, flags=re.I)
-        text = re.sub(r'<(br|hr)\s*/?>', '\n', text, flags=re.I)
-        return _normalize(_strip_tags(text))
+    async def _load_cached(self, key: str, url: str, extract_mode: str) -> tuple[dict[str, Any], str]:
+        """Serve from the cache, revalidating stale entries with a conditional request."""
+        entry = self.cache.get(key)
+        if entry and entry["fresh_until"] > time.time():
+            return entry["page"], "hit"
+
+        fetched = await self._get(url, conditional_headers(entry) if entry else {})
+        r = fetched.response
+        if entry and r.status_code == 304:
+            fresh_until = freshness_deadline(r.headers, time.time())
+            if fresh_until is None:
+                self.cache.discard(key)
+            else:
+                entry["fresh_until"] = fresh_until
+                entry["etag"] = r.headers.get("etag") or entry["etag"]
+                self.cache.put(key, entry)
+            return entry["page"], "revalidated"
+
+        r.raise_for_status()
+        page = await self._extract(fetched, extract_mode)
+        if new_entry := cache_entry(url, page, r.headers):
+            self.cache.put(key, new_entry)
+        return page, "miss"
+
+    async def _download(self, url: str, extract_mode: str) -> dict[str, Any]:
+        fetched = await self._get(url, {})
+        fetched.response.raise_for_status()
+        return await self._extract(fetched, extract_mode)
+
+    async def _get(self, url: str, headers: dict[str, str]) -> _Download:
+        """Stream the response body, stopping at max_download_bytes."""
+        client = self.http_pool.get(proxy=self.proxy)
+        chunks: list[bytes] = []
+        size, capped = 0, False
+        async with client.stream(
+            "GET", url, headers={"User-Agent": USER_AGENT, **headers}, follow_redirects=True, timeout=30.0,
+        ) as r:
+            if r.status_code == 200:
+                async for chunk in r.aiter_bytes():
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size > self.max_download_bytes:
+                        capped = True
+                        break
+        if capped:
+            logger.debug("WebFetch: stopped {} at {} bytes", url, self.max_download_bytes)
+        return _Download(r, b"".join(chunks)[:self.max_download_bytes], capped)
+
+    async def _extract(self, fetched: _Download, extract_mode: str) -> dict[str, Any]:
+        """Turn a download into the full (untruncated) extracted page, off the event loop."""
+        r = fetched.response
+        try:
+            body = fetched.body.decode(r.encoding or "utf-8", errors="replace")
+        except LookupError:  # Unknown charset in Content-Type
+            body = fetched.body.decode("utf-8", errors="replace")
+        if len(_extract_stuck) >= EXTRACT_WORKERS:
+            raise RuntimeError(
+                f"Content extraction unavailable: all {EXTRACT_WORKERS} workers are still busy "
+                "with earlier pages that timed out"
+            )
+        job = _get_extract_pool().submit(_extract_text, body, r.headers.get("content-type", ""), extract_mode)
+        try:
+            text, extractor = await asyncio.wait_for(asyncio.wrap_future(job), timeout=self.extract_timeout)
+        except asyncio.TimeoutError:
+            if not job.cancel():  # Already running: its worker stays busy until it returns
+                _extract_stuck.add(job)
+                job.add_done_callback(_extract_stuck.discard)
+            raise TimeoutError(f"Content extraction timed out after {self.extract_timeout:g}s") from None
+        page = {"finalUrl": str(r.url), "status": r.status_code, "extractor": extractor, "text": text}
+        if fetched.capped:
+            page["downloadCapped"] = True
+        return page
@@ -0,0 +1,257 @@
+"""On-disk cache for web tool results."""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+import unicodedata
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Mapping
+
+from loguru import logger
+
+
+def _cache_control(headers: Mapping[str, str]) -> dict[str, str]:
+    """Parse a Cache-Control header into lower-cased directives."""
+    directives: dict[str, str] = {}
+    for part in headers.get("cache-control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"')
+    return directives
+
+
+def freshness_deadline(headers: Mapping[str, str], now: float) -> float | None:
+    """
+    Return the time until which a response may be served without revalidation.
+
+    ``None`` means the response must not be stored (``no-store``).  A deadline
+    of ``now`` means the response can be stored but must be revalidated first.
+    """
+    cc = _cache_control(headers)
+    if "no-store" in cc:
+        return None
+    if "no-cache" in cc:
+        return now
+    if "max-age" in cc:
+        try:
+            age = int(headers.get("age", "0") or 0)
+            return now + max(0, int(cc["max-age"]) - age)
+        except ValueError:
+            return now
+    if expires := headers.get("expires"):
+        try:
+            return max(now, parsedate_to_datetime(expires).timestamp())
+        except (TypeError, ValueError):
+            return now
+    return now
+
+
+class WebFetchCache:
+    """
+    Size-bounded LRU cache of extracted pages, stored as one JSON file per entry.
+
+    Entries are addressed by a hash of (extract mode, URL) and keep the HTTP
+    validators (ETag / Last-Modified) so stale pages can be revalidated with a
+    conditional request instead of downloaded and re-extracted.  Concurrent
+    loads of the same key share one in-flight request.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int = 50 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._index: OrderedDict[str, int] | None = None  # key -> file size, oldest first
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.stats = {"hit": 0, "revalidated": 0, "miss": 0, "collapsed": 0, "evicted": 0}
+
+    @staticmethod
+    def key(url: str, mode: str) -> str:
+        return hashlib.sha256(f"{mode}\n{url}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _load_index(self) -> OrderedDict[str, int]:
+        if self._index is None:
+            entries = []
+            if self.cache_dir.is_dir():
+                for entry in os.scandir(self.cache_dir):
+                    if entry.name.endswith(".json"):
+                        st = entry.stat()
+                        entries.append((st.st_mtime, entry.name[:-5], st.st_size))
+            self._index = OrderedDict((key, size) for _, key, size in sorted(entries))
+        return self._index
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return the stored entry for *key*, marking it most recently used."""
+        index = self._load_index()
+        if key not in index:
+            return None
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            os.utime(path)
+        except (OSError, ValueError) as e:
+            logger.debug("Dropping unreadable web cache entry {}: {}", key, e)
+            self.discard(key)
+            return None
+        index.move_to_end(key)
+        return entry
+
+    def put(self, key: str, entry: dict[str, Any]) -> None:
+        """Store *entry* under *key* and evict least recently used entries over the size bound."""
+        index = self._load_index()
+        data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        if len(data) > self.max_bytes:
+            self.discard(key)
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        index[key] = len(data)
+        index.move_to_end(key)
+        total = sum(index.values())
+        while total > self.max_bytes and len(index) > 1:
+            old_key = next(iter(index))
+            total -= index[old_key]
+            self.discard(old_key)
+            self.stats["evicted"] += 1
+
+    def discard(self, key: str) -> None:
+        """Drop *key* from the cache if present."""
+        self._load_index().pop(key, None)
+        self._path(key).unlink(missing_ok=True)
+
+    async def single_flight(
+        self, key: str, load: Callable[[], Awaitable[tuple[Any, str]]],
+    ) -> tuple[Any, str]:
+        """
+        Run *load* once per key at a time; concurrent callers share its result.
+
+        *load* returns ``(value, outcome)`` where outcome is ``"hit"``,
+        ``"revalidated"`` or ``"miss"``; callers that joined an in-flight load
+        see ``"collapsed"``.
+        """
+        task = self._inflight.get(key)
+        joined = task is not None
+        if task is None:
+            task = asyncio.ensure_future(load())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._inflight.pop(key, None) if self._inflight.get(key) is t else None)
+        value, outcome = await asyncio.shield(task)
+        if joined:
+            outcome = "collapsed"
+        self.stats[outcome] = self.stats.get(outcome, 0) + 1
+        return value, outcome
+
+    def report(self) -> dict[str, Any]:
+        """Hit/miss counters plus current size of the cache."""
+        index = self._load_index()
+        served = self.stats["hit"] + self.stats["revalidated"] + self.stats["collapsed"]
+        lookups = served + self.stats["miss"]
+        return {
+            **self.stats,
+            "hit_rate": round(served / lookups, 3) if lookups else 0.0,
+            "entries": len(index),
+            "bytes": sum(index.values()),
+        }
+
+
+def cache_entry(url: str, page: dict[str, Any], headers: Mapping[str, str]) -> dict[str, Any] | None:
+    """Build a cache entry for a 200 response, or None if it must not be stored."""
+    now = time.time()
+    fresh_until = freshness_deadline(headers, now)
+    etag, last_modified = headers.get("etag"), headers.get("last-modified")
+    if fresh_until is None or (fresh_until <= now and not etag and not last_modified):
+        return None
+    return {
+        "url": url,
+        "page": page,
+        "etag": etag,
+        "last_modified": last_modified,
+        "fresh_until": fresh_until,
+        "stored_at": now,
+    }
+
+
+def conditional_headers(entry: dict[str, Any]) -> dict[str, str]:
+    """Validators to send when revalidating a stale entry."""
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def normalize_query(query: str) -> str:
+    """Case-fold and collapse whitespace so trivially different queries share a cache entry."""
+    return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+
+class WebSearchCache:
+    """
+    TTL cache of search results keyed by normalized query and result count.
+
+    Entries live in memory and are persisted to a single JSON file so repeated
+    searches stay cheap across restarts.  Expired entries are dropped on load
+    and whenever a new result is stored.
+    """
+
+    def __init__(self, path: Path, ttl: float = 3600, max_entries: int = 1000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: dict[str, dict[str, Any]] | None = None
+        self.stats = {"hit": 0, "miss": 0}
+
+    @staticmethod
+    def key(query: str, count: int) -> str:
+        return f"{count}:{normalize_query(query)}"
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        if self._entries is None:
+            self._entries = {}
+            if self.path.exists():
+                try:
+                    self._entries = json.loads(self.path.read_text(encoding="utf-8"))
+                except (OSError, ValueError) as e:
+                    logger.warning("Ignoring unreadable search cache {}: {}", self.path, e)
+            self._prune(time.time())
+        return self._entries
+
+    def _prune(self, now: float) -> None:
+        entries = self._entries or {}
+        for key in [k for k, v in entries.items() if now - v["stored_at"] >= self.ttl]:
+            del entries[key]
+        overflow = len(entries) - self.max_entries
+        if overflow > 0:
+            for key in sorted(entries, key=lambda k: entries[k]["stored_at"])[:overflow]:
+                del entries[key]
+
+    def get(self, query: str, count: int) -> list[dict[str, Any]] | None:
+        """Return cached results if they are younger than the TTL."""
+        entry = self._load().get(self.key(query, count))
+        if entry and time.time() - entry["stored_at"] < self.ttl:
+            self.stats["hit"] += 1
+            return entry["results"]
+        self.stats["miss"] += 1
+        return None
+
+    def put(self, query: str, count: int, results: list[dict[str, Any]]) -> None:
+        entries = self._load()
+        now = time.time()
+        entries[self.key(query, count)] = {"stored_at": now, "results": results}
+        self._prune(now)
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(entries, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning("Failed to persist search cache: {}", e)
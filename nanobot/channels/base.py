@@ -1,6 +1,9 @@
 """Base channel interface for chat platforms."""
 
+import asyncio
+import time
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from typing import Any
 
 from loguru import logger
@@ -9,6 +12,18 @@ from nanobot.bus.events import InboundMessage, OutboundMessage
 from nanobot.bus.queue import MessageBus
 
 
+@dataclass
+class _StreamState:
+    """A reply being streamed into one editable message."""
+
+    msg: OutboundMessage
+    message_id: str | None = None
+    shown: str = ""
+    last_edit: float = 0.0
+    updated: float = 0.0  # Last snapshot received (monotonic)
+    flush_task: asyncio.Task | None = None
+
+
 class BaseChannel(ABC):
     """
     Abstract base class for chat channel implementations.
@@ -19,6 +34,15 @@ class BaseChannel(ABC):
 
     name: str = "base"
 
+    # Channels that can edit a sent message set this and implement
+    # _send_stream_message() / _edit_stream_message() (and, ideally,
+    # _delete_stream_message()).  Streamed replies then update one message in
+    # place instead of arriving all at once.
+    supports_streaming: bool = False
+    stream_edit_interval: float = 1.0  # Minimum seconds between edits of one message
+    stream_max_chars: int = 4000  # Longer replies stop updating and are sent normally
+    stream_ttl: float = 600.0  # Streams without a final message for this long are forgotten
+
     def __init__(self, config: Any, bus: MessageBus):
         """
         Initialize the channel.
@@ -30,6 +54,7 @@ class BaseChannel(ABC):
         self.config = config
         self.bus = bus
         self._running = False
+        self._streams: dict[str, _StreamState] = {}
 
     @abstractmethod
     async def start(self) -> None:
@@ -58,6 +83,130 @@ class BaseChannel(ABC):
         """
         pass
 
+    async def deliver(self, msg: OutboundMessage) -> None:
+        """
+        Deliver an outbound message, routing streamed replies through throttled edits.
+
+        Messages carrying ``_stream_id`` metadata belong to a streamed reply:
+        progress snapshots (full text so far) update one message, and the
+        final message edits it into place.  An empty closing snapshot
+        withdraws the stream (the reply went out another way, e.g. the message
+        tool).  Channels without edit support ignore the snapshots and get the
+        final message via send().
+        """
+        meta = msg.metadata or {}
+        stream_id = meta.get("_stream_id")
+        if not stream_id:
+            await self.send(msg)
+        elif not self.supports_streaming:
+            # Only the closing snapshot before tool calls is worth showing as progress.
+            if not meta.get("_progress") or (meta.get("_stream_end") and msg.content.strip()):
+                await self.send(msg)
+        elif meta.get("_progress"):
+            await self._update_stream(stream_id, msg, end=bool(meta.get("_stream_end")))
+        else:
+            await self._finish_stream(stream_id, msg)
+
+    async def _send_stream_message(self, msg: OutboundMessage) -> str | None:
+        """Send the first snapshot of a streamed reply and return its message id."""
+        return None
+
+    async def _edit_stream_message(self, msg: OutboundMessage, message_id: str, text: str) -> None:
+        """Replace the text of a message sent by _send_stream_message()."""
+        raise NotImplementedError
+
+    async def _delete_stream_message(self, msg: OutboundMessage, message_id: str) -> None:
+        """Delete a message sent by _send_stream_message()."""
+        raise NotImplementedError
+
+    async def _discard_stream(self, state: _StreamState, withdrawn: bool = False) -> None:
+        """Remove the partial message of a reply that is sent normally instead (or not at all if *withdrawn*)."""
+        try:
+            await self._delete_stream_message(state.msg, state.message_id)
+            return
+        except Exception as e:
+            logger.debug("{}: could not delete streamed message: {}", self.name, e)
+        if withdrawn:
+            return
+        try:
+            # Leave a pointer rather than a truncated reply that looks complete.
+            await self._edit_stream_message(state.msg, state.message_id, "(reply continues below)")
+        except Exception as e:
+            logger.debug("{}: could not finalize streamed message: {}", self.name, e)
+
+    async def _update_stream(self, stream_id: str, msg: OutboundMessage, end: bool) -> None:
+        if end and not msg.content.strip():
+            if state := self._streams.pop(stream_id, None):
+                if state.flush_task:
+                    state.flush_task.cancel()
+                if state.message_id:
+                    await self._discard_stream(state, withdrawn=True)
+            return
+        state = self._streams.get(stream_id)
+        if state is None:
+            if not msg.content.strip():
+                return
+            self._expire_streams()
+            state = self._streams[stream_id] = _StreamState(msg=msg, last_edit=time.monotonic())
+            try:
+                state.message_id = await self._send_stream_message(msg)
+                state.shown = msg.content
+            except Exception as e:
+                logger.warning("{}: failed to start streamed message: {}", self.name, e)
+        state.msg, state.updated = msg, time.monotonic()
+        if end:
+            self._streams.pop(stream_id, None)
+            if state.flush_task:
+                state.flush_task.cancel()
+            if state.message_id and len(msg.content) > self.stream_max_chars:
+                await self._discard_stream(state)
+                await self.send(msg)
+            else:
+                await self._flush_stream(state)
+        elif state.message_id and not state.flush_task:
+            delay = max(0.0, self.stream_edit_interval - (time.monotonic() - state.last_edit))
+            state.flush_task = asyncio.create_task(self._delayed_flush(state, delay))
+
+    def _expire_streams(self) -> None:
+        """Forget streams that never got a final message (e.g. the turn failed)."""
+        cutoff = time.monotonic() - self.stream_ttl
+        for stream_id, state in list(self._streams.items()):
+            if state.updated < cutoff:
+                del self._streams[stream_id]
+                if state.flush_task:
+                    state.flush_task.cancel()
+
+    async def _delayed_flush(self, state: _StreamState, delay: float) -> None:
+        await asyncio.sleep(delay)
+        state.flush_task = None
+        await self._flush_stream(state)
+
+    async def _flush_stream(self, state: _StreamState) -> None:
+        text = state.msg.content
+        if not state.message_id or text == state.shown or len(text) > self.stream_max_chars:
+            return
+        try:
+            await self._edit_stream_message(state.msg, state.message_id, text)
+            state.shown = text
+        except Exception as e:
+            logger.debug("{}: streamed edit failed: {}", self.name, e)
+        state.last_edit = time.monotonic()
+
+    async def _finish_stream(self, stream_id: str, msg: OutboundMessage) -> None:
+        state = self._streams.pop(stream_id, None)
+        if state and state.flush_task:
+            state.flush_task.cancel()
+        if state and state.message_id and not msg.media and 0 < len(msg.content) <= self.stream_max_chars:
+            try:
+                if msg.content != state.shown:
+                    await self._edit_stream_message(msg, state.message_id, msg.content)
+                return
+            except Exception as e:
+                logger.warning("{}: final streamed edit failed, sending a new message: {}", self.name, e)
+        if state and state.message_id:
+            await self._discard_stream(state)
+        await self.send(msg)
+
     def is_allowed(self, sender_id: str) -> bool:
         """Check if *sender_id* is permitted.  Empty list → deny all; ``"*"`` → allow all."""
         allow_list = getattr(self.config, "allow_from", [])
@@ -46,6 +46,8 @@ class DiscordChannel(BaseChannel):
     """Discord channel using Gateway websocket."""
 
     name = "discord"
+    supports_streaming = True
+    stream_max_chars = MAX_MESSAGE_LEN
 
     def __init__(self, config: DiscordConfig, bus: MessageBus):
         super().__init__(config, bus)
@@ -123,6 +125,38 @@ class DiscordChannel(BaseChannel):
         finally:
             await self._stop_typing(msg.chat_id)
 
+    async def _send_stream_message(self, msg: OutboundMessage) -> str | None:
+        if not self._http:
+            return None
+        url = f"{DISCORD_API_BASE}/channels/{msg.chat_id}/messages"
+        payload: dict[str, Any] = {"content": msg.content}
+        if msg.reply_to:
+            payload["message_reference"] = {"message_id": msg.reply_to}
+            payload["allowed_mentions"] = {"replied_user": False}
+        response = await self._http.post(url, headers={"Authorization": f"Bot {self.config.token}"}, json=payload)
+        response.raise_for_status()
+        return str(response.json()["id"])
+
+    async def _edit_stream_message(self, msg: OutboundMessage, message_id: str, text: str) -> None:
+        if not self._http:
+            return
+        url = f"{DISCORD_API_BASE}/channels/{msg.chat_id}/messages/{message_id}"
+        try:
+            response = await self._http.patch(
+                url, headers={"Authorization": f"Bot {self.config.token}"}, json={"content": text},
+            )
+            response.raise_for_status()
+        finally:
+            if not msg.metadata.get("_progress"):
+                await self._stop_typing(msg.chat_id)
+
+    async def _delete_stream_message(self, msg: OutboundMessage, message_id: str) -> None:
+        if not self._http:
+            return
+        url = f"{DISCORD_API_BASE}/channels/{msg.chat_id}/messages/{message_id}"
+        response = await self._http.delete(url, headers={"Authorization": f"Bot {self.config.token}"})
+        response.raise_for_status()
+
     async def _send_payload(
         self, url: str, headers: dict[str, str], payload: dict[str, Any]
     ) -> bool:
@@ -227,16 +227,22 @@ class ChannelManager:
                     timeout=1.0
                 )
 
-                if msg.metadata.get("_progress"):
-                    if msg.metadata.get("_tool_hint") and not self.config.channels.send_tool_hints:
+                channel = self.channels.get(msg.channel)
+                meta = msg.metadata
+                if meta.get("_progress"):
+                    # Streamed snapshots are opted into via streamResponses; only the
+                    # closing snapshot shown on non-editing channels counts as progress.
+                    streaming = meta.get("_stream") and (
+                        not meta.get("_stream_end") or (channel and channel.supports_streaming)
+                    )
+                    if meta.get("_tool_hint") and not self.config.channels.send_tool_hints:
                         continue
-                    if not msg.metadata.get("_tool_hint") and not self.config.channels.send_progress:
+                    if not meta.get("_tool_hint") and not streaming and not self.config.channels.send_progress:
                         continue
 
-                channel = self.channels.get(msg.channel)
                 if channel:
                     try:
-                        await channel.send(msg)
+                        await channel.deliver(msg)
                     except Exception as e:
                         logger.error("Error sending to {}: {}", msg.channel, e)
                 else:
@@ -21,6 +21,8 @@ class SlackChannel(BaseChannel):
     """Slack channel using Socket Mode."""
 
     name = "slack"
+    supports_streaming = True
+    stream_max_chars = 3000
 
     def __init__(self, config: SlackConfig, bus: MessageBus):
         super().__init__(config, bus)
@@ -78,12 +80,7 @@ class SlackChannel(BaseChannel):
             logger.warning("Slack client not running")
             return
         try:
-            slack_meta = msg.metadata.get("slack", {}) if msg.metadata else {}
-            thread_ts = slack_meta.get("thread_ts")
-            channel_type = slack_meta.get("channel_type")
-            # Only reply in thread for channel/group messages; DMs don't use threads
-            use_thread = thread_ts and channel_type != "im"
-            thread_ts_param = thread_ts if use_thread else None
+            thread_ts_param = self._thread_ts(msg)
 
             if msg.content:
                 await self._web_client.chat_postMessage(
@@ -104,6 +101,33 @@ class SlackChannel(BaseChannel):
         except Exception as e:
             logger.error("Error sending Slack message: {}", e)
 
+    def _thread_ts(self, msg: OutboundMessage) -> str | None:
+        slack_meta = msg.metadata.get("slack", {}) if msg.metadata else {}
+        # Only reply in thread for channel/group messages; DMs don't use threads
+        if slack_meta.get("thread_ts") and slack_meta.get("channel_type") != "im":
+            return slack_meta["thread_ts"]
+        return None
+
+    async def _send_stream_message(self, msg: OutboundMessage) -> str | None:
+        if not self._web_client:
+            return None
+        response = await self._web_client.chat_postMessage(
+            channel=msg.chat_id,
+            text=self._to_mrkdwn(msg.content),
+            thread_ts=self._thread_ts(msg),
+        )
+        return response.get("ts")
+
+    async def _edit_stream_message(self, msg: OutboundMessage, message_id: str, text: str) -> None:
+        if not self._web_client:
+            return
+        await self._web_client.chat_update(channel=msg.chat_id, ts=message_id, text=self._to_mrkdwn(text))
+
+    async def _delete_stream_message(self, msg: OutboundMessage, message_id: str) -> None:
+        if not self._web_client:
+            return
+        await self._web_client.chat_delete(channel=msg.chat_id, ts=message_id)
+
     async def _on_socket_request(
         self,
         client: SocketModeClient,
@@ -109,6 +109,8 @@ class TelegramChannel(BaseChannel):
     """
 
     name = "telegram"
+    supports_streaming = True
+    stream_max_chars = 4000
 
     # Commands registered with Telegram's command menu
     BOT_COMMANDS = [
@@ -349,6 +351,46 @@ class TelegramChannel(BaseChannel):
                     except Exception as e2:
                         logger.error("Error sending Telegram message: {}", e2)
 
+    async def _send_stream_message(self, msg: OutboundMessage) -> str | None:
+        """Start a streamed reply as plain text (partial markdown would break HTML parsing)."""
+        if not self._app:
+            return None
+        reply_params = None
+        if self.config.reply_to_message and msg.metadata.get("message_id"):
+            reply_params = ReplyParameters(
+                message_id=msg.metadata["message_id"],
+                allow_sending_without_reply=True
+            )
+        sent = await self._app.bot.send_message(
+            chat_id=int(msg.chat_id),
+            text=msg.content,
+            reply_parameters=reply_params
+        )
+        return str(sent.message_id)
+
+    async def _edit_stream_message(self, msg: OutboundMessage, message_id: str, text: str) -> None:
+        if not self._app:
+            return
+        chat_id, mid = int(msg.chat_id), int(message_id)
+        if msg.metadata.get("_progress"):
+            await self._app.bot.edit_message_text(chat_id=chat_id, message_id=mid, text=text)
+            return
+        # Final text: render markdown now that it is complete.
+        self._stop_typing(msg.chat_id)
+        try:
+            await self._app.bot.edit_message_text(
+                chat_id=chat_id, message_id=mid,
+                text=_markdown_to_telegram_html(text), parse_mode="HTML",
+            )
+        except Exception as e:
+            logger.warning("HTML parse failed, falling back to plain text: {}", e)
+            await self._app.bot.edit_message_text(chat_id=chat_id, message_id=mid, text=text)
+
+    async def _delete_stream_message(self, msg: OutboundMessage, message_id: str) -> None:
+        if not self._app:
+            return
+        await self._app.bot.delete_message(chat_id=int(msg.chat_id), message_id=int(message_id))
+
     async def _on_start(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle /start command."""
         if not update.message or not update.effective_user:
@@ -165,6 +165,41 @@ def _cron_store_path(config: "Config") -> Path:
     return config.workspace_path / "cron" / "jobs.json"
 
 
+def _telemetry_log_path(config: "Config") -> Path:
+    return config.workspace_path / "telemetry" / "events.jsonl"
+
+
+def _make_telemetry(config: "Config"):
+    """Telemetry recorder for the agent, or None when disabled."""
+    from nanobot.telemetry import Telemetry
+
+    cfg = config.telemetry
+    if not cfg.enabled:
+        return None
+    return Telemetry(
+        _telemetry_log_path(config), max_bytes=cfg.log_max_mb * 1024 * 1024, backups=cfg.log_backups,
+    )
+
+
+def _make_session_manager(config: "Config"):
+    """SessionManager backed by the configured store and cache limits."""
+    from nanobot.session.manager import SessionManager
+    from nanobot.session.store import create_session_store
+
+    return SessionManager(
+        config.workspace_path,
+        max_entries=config.sessions.cache_max_entries,
+        max_bytes=config.sessions.cache_max_bytes,
+        idle_ttl=config.sessions.cache_idle_seconds,
+        tail_window=config.agents.defaults.memory_window if config.sessions.lazy_load else 0,
+        store=create_session_store(
+            config.workspace_path / "sessions",
+            config.sessions.backend,
+            legacy_dir=Path.home() / ".nanobot" / "sessions",
+        ),
+    )
+
+
 # ============================================================================
 # Onboard / Setup
 # ============================================================================
@@ -273,7 +308,7 @@ def gateway(
     from nanobot.cron.service import CronService
     from nanobot.cron.types import CronJob
     from nanobot.heartbeat.service import HeartbeatService
-    from nanobot.session.manager import SessionManager
+    from nanobot.utils.http import close_http_pool
 
     if verbose:
         import logging
@@ -290,7 +325,7 @@ def gateway(
         config.channels.whatsapp.users_file = str(users_whatsapp.resolve())
     bus = MessageBus()
     provider = _make_provider(config)
-    session_manager = SessionManager(config.workspace_path)
+    session_manager = _make_session_manager(config)
 
     # Create cron service first (callback set after agent creation)
     cron_store_path = _cron_store_path(config)
@@ -309,6 +344,8 @@ def gateway(
         reasoning_effort=config.agents.defaults.reasoning_effort,
         brave_api_key=config.tools.web.search.api_key or None,
         web_proxy=config.tools.web.proxy or None,
+        web_search_config=config.tools.web.search,
+        web_fetch_config=config.tools.web.fetch,
         exec_config=config.tools.exec,
         cron_service=cron,
         restrict_to_workspace=config.tools.restrict_to_workspace,
@@ -316,6 +353,12 @@ def gateway(
         session_manager=session_manager,
         mcp_servers=config.tools.mcp_servers,
         channels_config=config.channels,
+        max_concurrent_sessions=config.agents.defaults.max_concurrent_sessions,
+        max_parallel_tools=config.agents.defaults.max_parallel_tools,
+        memory_retrieval=config.agents.defaults.memory_retrieval,
+        context_window_tokens=config.agents.defaults.context_window_tokens,
+        telemetry=_make_telemetry(config),
+        tool_selection=config.tools.selection,
     )
 
     # Set cron callback (needs agent)
@@ -414,10 +457,20 @@ def gateway(
 
     console.print(f"[green]✓[/green] Heartbeat: every {hb_cfg.interval_s}s")
 
+    metrics = None
+    if agent.telemetry and config.telemetry.metrics_port:
+        from nanobot.telemetry import MetricsServer
+        metrics = MetricsServer(agent.telemetry, config.telemetry.metrics_host, config.telemetry.metrics_port)
+        console.print(
+            f"[green]✓[/green] Metrics: http://{config.telemetry.metrics_host}:{config.telemetry.metrics_port}/metrics"
+        )
+
     async def run():
         try:
             await cron.start()
             await heartbeat.start()
+            if metrics:
+                await metrics.start()
             await asyncio.gather(
                 agent.run(),
                 channels.start_all(),
@@ -430,6 +483,10 @@ def gateway(
             cron.stop()
             agent.stop()
             await channels.stop_all()
+            if metrics:
+                await metrics.stop()
+            session_manager.close()
+            await close_http_pool()
 
     asyncio.run(run())
 
@@ -454,6 +511,7 @@ def agent(
     from nanobot.agent.loop import AgentLoop
     from nanobot.bus.queue import MessageBus
     from nanobot.cron.service import CronService
+    from nanobot.utils.http import close_http_pool
 
     config = _load()
     sync_workspace_templates(config.workspace_path)
@@ -482,11 +540,20 @@ def agent(
         reasoning_effort=config.agents.defaults.reasoning_effort,
         brave_api_key=config.tools.web.search.api_key or None,
         web_proxy=config.tools.web.proxy or None,
+        web_search_config=config.tools.web.search,
+        web_fetch_config=config.tools.web.fetch,
         exec_config=config.tools.exec,
         cron_service=cron,
         restrict_to_workspace=config.tools.restrict_to_workspace,
         mcp_servers=config.tools.mcp_servers,
         channels_config=config.channels,
+        max_concurrent_sessions=config.agents.defaults.max_concurrent_sessions,
+        max_parallel_tools=config.agents.defaults.max_parallel_tools,
+        memory_retrieval=config.agents.defaults.memory_retrieval,
+        context_window_tokens=config.agents.defaults.context_window_tokens,
+        telemetry=_make_telemetry(config),
+        tool_selection=config.tools.selection,
+        session_manager=_make_session_manager(config),
     )
 
     # Show spinner when logs are off (no output to miss); skip when logs are on
@@ -512,6 +579,8 @@ def agent(
                 response = await agent_loop.process_direct(message, session_id, on_progress=_cli_progress)
             _print_agent_response(response, render_markdown=markdown)
             await agent_loop.close_mcp()
+            agent_loop.sessions.close()
+            await close_http_pool()
 
         asyncio.run(run_once())
     else:
@@ -607,6 +676,8 @@ def agent(
                 outbound_task.cancel()
                 await asyncio.gather(bus_task, outbound_task, return_exceptions=True)
                 await agent_loop.close_mcp()
+                agent_loop.sessions.close()
+                await close_http_pool()
 
         asyncio.run(run_interactive())
 
@@ -987,10 +1058,19 @@ def cron_run(
         reasoning_effort=config.agents.defaults.reasoning_effort,
         brave_api_key=config.tools.web.search.api_key or None,
         web_proxy=config.tools.web.proxy or None,
+        web_search_config=config.tools.web.search,
+        web_fetch_config=config.tools.web.fetch,
         exec_config=config.tools.exec,
         restrict_to_workspace=config.tools.restrict_to_workspace,
         mcp_servers=config.tools.mcp_servers,
         channels_config=config.channels,
+        max_concurrent_sessions=config.agents.defaults.max_concurrent_sessions,
+        max_parallel_tools=config.agents.defaults.max_parallel_tools,
+        memory_retrieval=config.agents.defaults.memory_retrieval,
+        context_window_tokens=config.agents.defaults.context_window_tokens,
+        telemetry=_make_telemetry(config),
+        tool_selection=config.tools.selection,
+        session_manager=_make_session_manager(config),
     )
 
     store_path = _cron_store_path(config)
@@ -1011,7 +1091,10 @@ def cron_run(
     service.on_job = on_job
 
     async def run():
-        return await service.run_job(job_id, force=force)
+        try:
+            return await service.run_job(job_id, force=force)
+        finally:
+            agent_loop.sessions.close()
 
     if asyncio.run(run()):
         console.print("[green]✓[/green] Job executed")
@@ -1062,6 +1145,86 @@ def status():
                 has_key = bool(p.api_key)
                 console.print(f"{spec.label}: {'[green]✓[/green]' if has_key else '[dim]not set[/dim]'}")
 
+    from nanobot.session.manager import SessionManager
+
+    if cache := SessionManager.read_cache_stats(workspace):
+        lookups = cache.get("hits", 0) + cache.get("misses", 0)
+        hit_rate = f"{cache.get('hits', 0) / lookups:.0%}" if lookups else "n/a"
+        console.print(
+            f"Session cache: {cache.get('entries', 0)} cached, "
+            f"{cache.get('hits', 0)} hits / {cache.get('misses', 0)} misses ({hit_rate}), "
+            f"{cache.get('evictions', 0)} evictions [dim](as of {cache.get('updated_at', '?')[:19]})[/dim]"
+        )
+
+
+@app.command()
+def stats(
+    days: float = typer.Option(7, "--days", "-d", help="Only include the last N days (0 = all)"),
+    top: int = typer.Option(10, "--top", help="Rows per breakdown table"),
+):
+    """Summarize token usage, latency and cost from the telemetry log."""
+    import time
+
+    from nanobot.telemetry.stats import iter_events, summarize
+
+    config = _load()
+    log_path = _telemetry_log_path(config)
+    summary = summarize(iter_events(log_path, since=time.time() - days * 86400 if days > 0 else None))
+    if not summary["llm_calls"] and not summary["tools"]:
+        console.print(f"No telemetry recorded yet ({log_path}).")
+        if not config.telemetry.enabled:
+            console.print("Telemetry is off; set telemetry.enabled to true in the config to record usage.")
+        return
+
+    tokens = summary["tokens"]
+    prompt = tokens.get("prompt_tokens", 0)
+    cached = tokens.get("cache_read_tokens", 0)
+    console.print(f"{__logo__} nanobot usage" + (f" (last {days:g} days)" if days > 0 else "") + "\n")
+    console.print(
+        f"Turns: {summary['turns']} ({summary['avg_iterations']:.1f} LLM calls avg), "
+        f"LLM calls: {summary['llm_calls']} ({summary['llm_errors']} errors)"
+    )
+    console.print(
+        f"Tokens: {prompt:,} prompt ({cached:,} cache read, {cached / prompt if prompt else 0:.0%}; "
+        f"{tokens.get('cache_write_tokens', 0):,} cache write), {tokens.get('completion_tokens', 0):,} completion"
+    )
+    console.print(f"Cost: ${summary['cost_usd']:.4f}")
+    if (ex := summary["exec"])["commands"]:
+        kills = ", ".join(f"{n} {limit}" for limit, n in ex["limit_kills"].items())
+        console.print(
+            f"Sandboxed commands: {ex['commands']} ({ex['cpu_s']:.1f}s CPU, "
+            f"p95 max RSS {ex['p95_max_rss_mb']:.1f} MB" + (f"; killed by limit: {kills}" if kills else "") + ")"
+        )
+
+    table = Table(title="LLM latency (ms)")
+    for col in ("Model", "Calls", "p50", "p95", "p99"):
+        table.add_column(col)
+    for model, lat in summary["latency_ms"].items():
+        table.add_row(model, str(lat["calls"]), f"{lat['p50']:.0f}", f"{lat['p95']:.0f}", f"{lat['p99']:.0f}")
+    console.print(table)
+
+    for title, rows in (("By channel", summary["by_channel"]), ("By session", summary["by_session"])):
+        if not rows:
+            continue
+        table = Table(title=title)
+        for col in ("Name", "Turns", "Tokens", "Cost"):
+            table.add_column(col)
+        for name, row in sorted(rows.items(), key=lambda kv: -kv[1].get("tokens", 0))[:top]:
+            table.add_row(
+                name, str(int(row.get("turns", 0))), f"{int(row.get('tokens', 0)):,}", f"${row.get('cost_usd', 0):.4f}",
+            )
+        console.print(table)
+
+    if summary["tools"]:
+        table = Table(title="Tools")
+        for col in ("Tool", "Calls", "Errors", "Total s", "p95 ms"):
+            table.add_column(col)
+        for name, row in list(summary["tools"].items())[:top]:
+            table.add_row(
+                name, str(row["calls"]), str(row["errors"]), f"{row['total_ms'] / 1000:.1f}", f"{row['p95_ms']:.0f}",
+            )
+        console.print(table)
+
 
 # ============================================================================
 # OAuth Login
@@ -233,6 +233,8 @@ class ChannelsConfig(Base):
     send_progress: bool = True    # stream agent's text progress to the channel
     send_tool_hints: bool = False  # stream tool-call hints (e.g. read_file("…"))
     send_tool_results: bool = False  # stream tool results to the channel
+    stream_responses: bool = False  # stream LLM tokens, editing one message in place where supported
+    stream_interval: float = 0.5  # seconds between streamed snapshots; deltas in between are coalesced
     whatsapp: WhatsAppConfig = Field(default_factory=WhatsAppConfig)
     telegram: TelegramConfig = Field(default_factory=TelegramConfig)
     discord: DiscordConfig = Field(default_factory=DiscordConfig)
@@ -246,6 +248,15 @@ class ChannelsConfig(Base):
     navivox: NaviVoxConfig = Field(default_factory=NaviVoxConfig)
 
 
+class MemoryRetrievalConfig(Base):
+    """Inject only the MEMORY.md sections relevant to each message instead of the whole file."""
+
+    enabled: bool = False
+    top_k: int = 3  # Max retrieved sections per message
+    token_budget: int = 1500  # Estimated tokens for pinned + retrieved sections
+    pinned_sections: list[str] = Field(default_factory=lambda: ["User Information", "Preferences"])
+
+
 class AgentDefaults(Base):
     """Default agent configuration."""
 
@@ -256,7 +267,21 @@ class AgentDefaults(Base):
     temperature: float = 0.1
     max_tool_iterations: int = 40
     memory_window: int = 100
+    context_window_tokens: int = 0  # Model context size; history is trimmed to fit (0 = message count only)
     reasoning_effort: str | None = None  # low / medium / high — enables LLM thinking mode
+    max_concurrent_sessions: int = 4  # Sessions processed in parallel (same session is always serial)
+    max_parallel_tools: int = 4  # Tool calls from one LLM response run concurrently (1 = sequential)
+    memory_retrieval: MemoryRetrievalConfig = Field(default_factory=MemoryRetrievalConfig)
+
+
+class SessionsConfig(Base):
+    """Session storage and in-memory cache configuration."""
+
+    cache_max_entries: int = 256  # Sessions kept in memory (least recently used evicted first)
+    cache_max_bytes: int = 64 * 1024 * 1024  # Approximate message payload kept in memory
+    cache_idle_seconds: int = 3600  # Evict sessions untouched for this long
+    lazy_load: bool = True  # Load only the unconsolidated tail (up to memoryWindow) from disk
+    backend: Literal["jsonl", "sqlite"] = "jsonl"  # sqlite imports existing JSONL files on first start
 
 
 class AgentsConfig(Base):
@@ -322,6 +347,17 @@ class WebSearchConfig(Base):
 
     api_key: str = ""  # Brave Search API key
     max_results: int = 5
+    cache_ttl: int = 3600  # Seconds to reuse results for a repeated query (0 disables the cache)
+    rate_limit: float = 1.0  # Max Brave API requests per second (0 disables limiting)
+
+
+class WebFetchConfig(Base):
+    """Web fetch tool configuration."""
+
+    cache: bool = True  # Cache extracted pages under <workspace>/.cache/web_fetch
+    cache_max_mb: int = 50
+    max_download_mb: int = 5  # Stop reading a response body past this size
+    extract_timeout: float = 20.0  # Seconds allowed for HTML → text extraction
 
 
 class WebToolsConfig(Base):
@@ -329,6 +365,25 @@ class WebToolsConfig(Base):
 
     proxy: str | None = None  # HTTP/SOCKS5 proxy URL, e.g. "http://127.0.0.1:7890" or "socks5://127.0.0.1:1080"
     search: WebSearchConfig = Field(default_factory=WebSearchConfig)
+    fetch: WebFetchConfig = Field(default_factory=WebFetchConfig)
+
+
+class SandboxConfig(Base):
+    """
+    Resource limits for exec commands (0 = unlimited).
+
+    Commands report their CPU time and max RSS.  In a persistent shell only
+    CPU time is reported per command; memory is bounded but not measured.
+    """
+
+    enabled: bool = False
+    cpu_seconds: int = 0  # CPU time per process (RLIMIT_CPU)
+    memory_mb: int = 0  # Address space per process (RLIMIT_AS); memory.max of the cgroup
+    file_size_mb: int = 0  # Largest file a command may write (RLIMIT_FSIZE)
+    max_processes: int = 0  # Processes of the user (RLIMIT_NPROC); pids.max of the cgroup
+    open_files: int = 0  # Open file descriptors per process (RLIMIT_NOFILE)
+    cpu_quota: float = 0  # CPUs a command may use, e.g. 0.5 (cgroup cpu.max only)
+    cgroup_parent: str = ""  # Writable cgroup v2 directory; each command/shell gets a child cgroup in it
 
 
 class ExecToolConfig(Base):
@@ -336,6 +391,13 @@ class ExecToolConfig(Base):
 
     timeout: int = 60
     path_append: str = ""
+    persistent_shell: bool = False  # One long-lived bash per conversation (keeps cd/exports/venvs)
+    shell_idle_timeout: int = 600  # Seconds before an idle persistent shell is closed
+    max_shells: int = 8  # Persistent shells kept at once (least recently used closed first)
+    max_output_mb: int = 50  # Kill a command once it has printed this much (0 = no cap)
+    progress_interval: float = 0  # Seconds between partial-output progress updates (0 = off)
+    sandbox: SandboxConfig = Field(default_factory=SandboxConfig)
+    subagent_sandbox: SandboxConfig = Field(default_factory=SandboxConfig)  # Tightens `sandbox` for subagents
 
 
 class MCPServerConfig(Base):
@@ -349,6 +411,18 @@ class MCPServerConfig(Base):
     tool_timeout: int = 30  # Seconds before a tool call is cancelled
 
 
+class ToolSelectionConfig(Base):
+    """Relevance-based tool subsetting (for agents with many MCP tools)."""
+
+    enabled: bool = False
+    top_k: int = 8  # Best-matching non-core tools offered per turn
+    token_budget: int = 4000  # Max estimated tokens of those tools' schemas
+    core_tools: list[str] = Field(default_factory=lambda: [
+        "read_file", "write_file", "edit_file", "list_dir", "exec", "web_search", "web_fetch",
+        "search_history", "message", "spawn", "cron",
+    ])  # Always offered
+
+
 class ToolsConfig(Base):
     """Tools configuration."""
 
@@ -357,6 +431,20 @@ class ToolsConfig(Base):
     restrict_to_workspace: bool = False  # If true, restrict all tool access to workspace directory
     allowed_dir: str = ""  # Override: restrict tool access to this directory instead of workspace (e.g. parent repo)
     mcp_servers: dict[str, MCPServerConfig] = Field(default_factory=dict)
+    selection: ToolSelectionConfig = Field(default_factory=ToolSelectionConfig)
+
+
+class TelemetryConfig(Base):
+    """Token, latency and cost telemetry configuration."""
+
+    # Opt-in: appends one JSON line per LLM call, tool call and turn to
+    # <workspace>/telemetry/events.jsonl.  Disk use is bounded by
+    # log_max_mb * (1 + log_backups), i.e. 40 MB with the defaults.
+    enabled: bool = False
+    log_max_mb: int = 10  # Rotate the event log past this size
+    log_backups: int = 3  # Rotated logs kept (events.jsonl.1, .2, ...)
+    metrics_host: str = "127.0.0.1"
+    metrics_port: int = 0  # Prometheus /metrics endpoint on the gateway (0 = off)
 
 
 class Config(BaseSettings):
@@ -366,8 +454,10 @@ class Config(BaseSettings):
     channels: ChannelsConfig = Field(default_factory=ChannelsConfig)
     providers: ProvidersConfig = Field(default_factory=ProvidersConfig)
     gateway: GatewayConfig = Field(default_factory=GatewayConfig)
+    sessions: SessionsConfig = Field(default_factory=SessionsConfig)
     heartbeat: HeartbeatConfig = Field(default_factory=HeartbeatConfig)
     tools: ToolsConfig = Field(default_factory=ToolsConfig)
+    telemetry: TelemetryConfig = Field(default_factory=TelemetryConfig)
 
     @property
     def workspace_path(self) -> Path:
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Awaitable, Callable
 
 import json_repair
 from openai import AsyncOpenAI
@@ -20,6 +20,26 @@ class CustomProvider(LLMProvider):
     async def chat(self, messages: list[dict[str, Any]], tools: list[dict[str, Any]] | None = None,
                    model: str | None = None, max_tokens: int = 4096, temperature: float = 0.7,
                    reasoning_effort: str | None = None) -> LLMResponse:
+        kwargs = self._build_kwargs(messages, tools, model, max_tokens, temperature, reasoning_effort)
+        try:
+            return self._parse(await self._client.chat.completions.create(**kwargs))
+        except Exception as e:
+            return LLMResponse(content=f"Error: {e}", finish_reason="error")
+
+    async def chat_stream(self, messages: list[dict[str, Any]], tools: list[dict[str, Any]] | None = None,
+                          model: str | None = None, max_tokens: int = 4096, temperature: float = 0.7,
+                          reasoning_effort: str | None = None,
+                          on_delta: Callable[[str], Awaitable[None]] | None = None) -> LLMResponse:
+        kwargs = self._build_kwargs(messages, tools, model, max_tokens, temperature, reasoning_effort)
+        kwargs.update(stream=True, stream_options={"include_usage": True})
+        try:
+            return await self._consume_stream(await self._client.chat.completions.create(**kwargs), on_delta)
+        except Exception as e:
+            return LLMResponse(content=f"Error: {e}", finish_reason="error")
+
+    def _build_kwargs(self, messages: list[dict[str, Any]], tools: list[dict[str, Any]] | None,
+                      model: str | None, max_tokens: int, temperature: float,
+                      reasoning_effort: str | None) -> dict[str, Any]:
         kwargs: dict[str, Any] = {
             "model": model or self.default_model,
             "messages": self._sanitize_empty_content(messages),
@@ -30,10 +50,7 @@ class CustomProvider(LLMProvider):
             kwargs["reasoning_effort"] = reasoning_effort
         if tools:
             kwargs.update(tools=tools, tool_choice="auto")
-        try:
-            return self._parse(await self._client.chat.completions.create(**kwargs))
-        except Exception as e:
-            return LLMResponse(content=f"Error: {e}", finish_reason="error")
+        return kwargs
 
     def _parse(self, response: Any) -> LLMResponse:
         choice = response.choices[0]
@@ -50,6 +67,44 @@ class CustomProvider(LLMProvider):
             reasoning_content=getattr(msg, "reasoning_content", None) or None,
         )
 
+    async def _consume_stream(self, stream: Any, on_delta: Callable[[str], Awaitable[None]] | None) -> LLMResponse:
+        """Accumulate streamed chunks (text, reasoning, tool-call fragments by index) into one response."""
+        content: list[str] = []
+        reasoning: list[str] = []
+        calls: dict[int, dict[str, str]] = {}
+        finish_reason, usage = "stop", {}
+        async for chunk in stream:
+            if u := getattr(chunk, "usage", None):
+                usage = {"prompt_tokens": u.prompt_tokens, "completion_tokens": u.completion_tokens, "total_tokens": u.total_tokens}
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            delta = choice.delta
+            if delta.content:
+                content.append(delta.content)
+                if on_delta:
+                    await on_delta(delta.content)
+            if r := getattr(delta, "reasoning_content", None):
+                reasoning.append(r)
+            for tc in delta.tool_calls or []:
+                buf = calls.setdefault(tc.index, {"id": "", "name": "", "arguments": ""})
+                if tc.id:
+                    buf["id"] = tc.id
+                if tc.function and tc.function.name:
+                    buf["name"] = tc.function.name
+                if tc.function and tc.function.arguments:
+                    buf["arguments"] += tc.function.arguments
+            if choice.finish_reason:
+                finish_reason = choice.finish_reason
+        tool_calls = [
+            ToolCallRequest(id=buf["id"], name=buf["name"], arguments=json_repair.loads(buf["arguments"] or "{}"))
+            for _, buf in sorted(calls.items())
+        ]
+        return LLMResponse(
+            content="".join(content) or None, tool_calls=tool_calls, finish_reason=finish_reason,
+            usage=usage, reasoning_content="".join(reasoning) or None,
+        )
+
     def get_default_model(self) -> str:
         return self.default_model
 
@@ -3,7 +3,7 @@
 import os
 import secrets
 import string
-from typing import Any
+from typing import Any, Awaitable, Callable
 
 import json_repair
 import litellm
@@ -121,29 +121,64 @@ class LiteLLMProvider(LLMProvider):
         spec = find_by_model(model)
         return spec is not None and spec.supports_prompt_caching
 
+    def _max_cache_breakpoints(self, model: str) -> int:
+        """Number of cache_control markers the provider accepts per request."""
+        spec = self._gateway or find_by_model(model)
+        return spec.max_cache_breakpoints if spec else 4
+
+    @staticmethod
+    def _mark_ephemeral(msg: dict[str, Any]) -> dict[str, Any] | None:
+        """Copy of *msg* with cache_control on its last content block, or None if it has no text to mark."""
+        content = msg.get("content")
+        if isinstance(content, str):
+            if not content:
+                return None
+            return {**msg, "content": [{"type": "text", "text": content, "cache_control": {"type": "ephemeral"}}]}
+        if isinstance(content, list) and content and isinstance(content[-1], dict):
+            new_content = list(content)
+            new_content[-1] = {**new_content[-1], "cache_control": {"type": "ephemeral"}}
+            return {**msg, "content": new_content}
+        return None
+
     def _apply_cache_control(
         self,
         messages: list[dict[str, Any]],
         tools: list[dict[str, Any]] | None,
+        max_breakpoints: int = 4,
     ) -> tuple[list[dict[str, Any]], list[dict[str, Any]] | None]:
-        """Return copies of messages and tools with cache_control injected."""
-        new_messages = []
-        for msg in messages:
-            if msg.get("role") == "system":
-                content = msg["content"]
-                if isinstance(content, str):
-                    new_content = [{"type": "text", "text": content, "cache_control": {"type": "ephemeral"}}]
-                else:
-                    new_content = list(content)
-                    new_content[-1] = {**new_content[-1], "cache_control": {"type": "ephemeral"}}
-                new_messages.append({**msg, "content": new_content})
-            else:
-                new_messages.append(msg)
+        """Return copies of messages and tools with cache_control injected.
+
+        The system prompt and tool definitions get one marker each.  Remaining
+        markers roll along the history: the newest message, so the next call in
+        the same turn reads everything before it, and the current turn's user
+        message, a prefix that stays fixed for the whole turn.
+        """
+        budget = max_breakpoints
+        new_messages = list(messages)
+        for i, msg in enumerate(new_messages):
+            if msg.get("role") == "system" and budget > 0:
+                if marked := self._mark_ephemeral(msg):
+                    new_messages[i] = marked
+                    budget -= 1
 
         new_tools = tools
-        if tools:
+        if tools and budget > 0:
             new_tools = list(tools)
             new_tools[-1] = {**new_tools[-1], "cache_control": {"type": "ephemeral"}}
+            budget -= 1
+
+        candidates: list[int] = []
+        for i in range(len(new_messages) - 1, -1, -1):
+            if new_messages[i].get("role") != "system" and self._mark_ephemeral(new_messages[i]):
+                candidates.append(i)  # Newest markable message
+                break
+        user_idx = next(
+            (i for i in range(len(new_messages) - 1, -1, -1) if new_messages[i].get("role") == "user"), None,
+        )
+        if user_idx is not None and user_idx not in candidates:
+            candidates.append(user_idx)
+        for i in candidates[:budget]:
+            new_messages[i] = self._mark_ephemeral(new_messages[i]) or new_messages[i]
 
         return new_messages, new_tools
 
@@ -200,12 +235,35 @@ class LiteLLMProvider(LLMProvider):
         Returns:
             LLMResponse with content and/or tool calls.
         """
+        kwargs = self._build_kwargs(messages, tools, model, max_tokens, temperature, reasoning_effort)
+        try:
+            response = await acompletion(**kwargs)
+            return self._parse_response(response)
+        except Exception as e:
+            # Return error as content for graceful handling
+            return LLMResponse(
+                content=f"Error calling LLM: {str(e)}",
+                finish_reason="error",
+            )
+
+    def _build_kwargs(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None,
+        model: str | None,
+        max_tokens: int,
+        temperature: float,
+        reasoning_effort: str | None,
+    ) -> dict[str, Any]:
+        """Build acompletion() arguments shared by chat() and chat_stream()."""
         original_model = model or self.default_model
         model = self._resolve_model(original_model)
         extra_msg_keys = self._extra_msg_keys(original_model, model)
 
         if self._supports_cache_control(original_model):
-            messages, tools = self._apply_cache_control(messages, tools)
+            messages, tools = self._apply_cache_control(
+                messages, tools, self._max_cache_breakpoints(original_model),
+            )
 
         # Clamp max_tokens to at least 1 — negative or zero values cause
         # LiteLLM to reject the request with "max_tokens must be at least 1".
@@ -241,11 +299,33 @@ class LiteLLMProvider(LLMProvider):
             kwargs["tools"] = tools
             kwargs["tool_choice"] = "auto"
 
+        return kwargs
+
+    async def chat_stream(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+        reasoning_effort: str | None = None,
+        on_delta: Callable[[str], Awaitable[None]] | None = None,
+    ) -> LLMResponse:
+        """Stream a chat completion via LiteLLM, then rebuild the full response from its chunks."""
+        kwargs = self._build_kwargs(messages, tools, model, max_tokens, temperature, reasoning_effort)
+        kwargs["stream"] = True
+        kwargs["stream_options"] = {"include_usage": True}
+
         try:
-            response = await acompletion(**kwargs)
+            chunks = []
+            async for chunk in await acompletion(**kwargs):
+                chunks.append(chunk)
+                delta = chunk.choices[0].delta if chunk.choices else None
+                if on_delta and delta and delta.content:
+                    await on_delta(delta.content)
+            response = litellm.stream_chunk_builder(chunks, messages=kwargs["messages"])
             return self._parse_response(response)
         except Exception as e:
-            # Return error as content for graceful handling
             return LLMResponse(
                 content=f"Error calling LLM: {str(e)}",
                 finish_reason="error",
@@ -277,6 +357,9 @@ class LiteLLMProvider(LLMProvider):
                 "completion_tokens": response.usage.completion_tokens,
                 "total_tokens": response.usage.total_tokens,
             }
+            usage.update(self._cache_usage(response.usage))
+            if (cost := self._response_cost(response)) is not None:
+                usage["cost_usd"] = cost
 
         reasoning_content = getattr(message, "reasoning_content", None) or None
         thinking_blocks = getattr(message, "thinking_blocks", None) or None
@@ -290,6 +373,31 @@ class LiteLLMProvider(LLMProvider):
             thinking_blocks=thinking_blocks,
         )
 
+    @staticmethod
+    def _cache_usage(usage: Any) -> dict[str, int]:
+        """Prompt-cache token counts from a LiteLLM usage object (Anthropic or OpenAI style)."""
+        read = getattr(usage, "cache_read_input_tokens", None)
+        if not isinstance(read, int):
+            read = getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", None)
+        write = getattr(usage, "cache_creation_input_tokens", None)
+        out = {}
+        if isinstance(read, int):
+            out["cache_read_tokens"] = read
+        if isinstance(write, int):
+            out["cache_write_tokens"] = write
+        return out
+
+    @staticmethod
+    def _response_cost(response: Any) -> float | None:
+        """USD cost LiteLLM priced for this response, if the model is in its price map."""
+        cost = (getattr(response, "_hidden_params", None) or {}).get("response_cost")
+        if cost is None:
+            try:
+                cost = litellm.completion_cost(completion_response=response)
+            except Exception:
+                return None
+        return float(cost) if isinstance(cost, (int, float)) else None
+
     def get_default_model(self) -> str:
         """Get the default model."""
         return self.default_model
@@ -59,6 +59,8 @@ class ProviderSpec:
 
     # Provider supports cache_control on content blocks (e.g. Anthropic prompt caching)
     supports_prompt_caching: bool = False
+    # Max cache_control markers per request (Anthropic allows 4)
+    max_cache_breakpoints: int = 4
 
     @property
     def label(self) -> str:
@@ -3,9 +3,10 @@
 import os
 from pathlib import Path
 
-import httpx
 from loguru import logger
 
+from nanobot.utils.http import HttpClientPool, get_http_pool
+
 
 class GroqTranscriptionProvider:
     """
@@ -14,9 +15,10 @@ class GroqTranscriptionProvider:
     Groq offers extremely fast transcription with a generous free tier.
     """
 
-    def __init__(self, api_key: str | None = None):
+    def __init__(self, api_key: str | None = None, http_pool: HttpClientPool | None = None):
         self.api_key = api_key or os.environ.get("GROQ_API_KEY")
         self.api_url = "https://api.groq.com/openai/v1/audio/transcriptions"
+        self.http_pool = http_pool or get_http_pool()
 
     async def transcribe(self, file_path: str | Path) -> str:
         """
@@ -38,26 +40,26 @@ class GroqTranscriptionProvider:
             return ""
 
         try:
-            async with httpx.AsyncClient() as client:
-                with open(path, "rb") as f:
-                    files = {
-                        "file": (path.name, f),
-                        "model": (None, "whisper-large-v3"),
-                    }
-                    headers = {
-                        "Authorization": f"Bearer {self.api_key}",
-                    }
+            client = self.http_pool.get()
+            with open(path, "rb") as f:
+                files = {
+                    "file": (path.name, f),
+                    "model": (None, "whisper-large-v3"),
+                }
+                headers = {
+                    "Authorization": f"Bearer {self.api_key}",
+                }
 
-                    response = await client.post(
-                        self.api_url,
-                        headers=headers,
-                        files=files,
-                        timeout=60.0
-                    )
+                response = await client.post(
+                    self.api_url,
+                    headers=headers,
+                    files=files,
+                    timeout=60.0
+                )
 
-                    response.raise_for_status()
-                    data = response.json()
-                    return data.get("text", "")
+                response.raise_for_status()
+                data = response.json()
+                return data.get("text", "")
 
         except Exception as e:
             logger.error("Groq transcription error: {}", e)
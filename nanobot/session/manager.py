@@ -1,150 +1,71 @@
 """Session management for conversation history."""
 
 import json
-import shutil
-from dataclasses import dataclass, field
+import time
+import weakref
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
 from loguru import logger
 
-from nanobot.utils.helpers import ensure_dir, safe_filename
+from nanobot.session.models import MessageLog, Session
+from nanobot.session.store import JsonlSessionStore, SessionStore
+from nanobot.utils.helpers import ensure_dir
 
-
-@dataclass
-class Session:
-    """
-    A conversation session.
-
-    Stores messages in JSONL format for easy reading and persistence.
-
-    Important: Messages are append-only for LLM cache efficiency.
-    The consolidation process writes summaries to MEMORY.md/HISTORY.md
-    but does NOT modify the messages list or get_history() output.
-    """
-
-    key: str  # channel:chat_id
-    messages: list[dict[str, Any]] = field(default_factory=list)
-    created_at: datetime = field(default_factory=datetime.now)
-    updated_at: datetime = field(default_factory=datetime.now)
-    metadata: dict[str, Any] = field(default_factory=dict)
-    last_consolidated: int = 0  # Number of messages already consolidated to files
-
-    def add_message(self, role: str, content: str, **kwargs: Any) -> None:
-        """Add a message to the session."""
-        msg = {
-            "role": role,
-            "content": content,
-            "timestamp": datetime.now().isoformat(),
-            **kwargs
-        }
-        self.messages.append(msg)
-        self.updated_at = datetime.now()
-
-    def get_history(self, max_messages: int = 500) -> list[dict[str, Any]]:
-        """Return unconsolidated messages for LLM input, preserving tool metadata.
-
-        Starts from last_consolidated to skip already-summarised history.
-        The tail-slice may cut an assistant message with tool_calls while
-        keeping its orphaned tool-result messages.  We trim those from the
-        front so every tool result has a preceding assistant tool_call and
-        every assistant tool_call has its following tool results.
-        """
-        unconsolidated = self.messages[self.last_consolidated:]
-        sliced = unconsolidated[-max_messages:]
-
-        # Drop leading non-user messages to avoid orphaned tool_result blocks
-        for i, m in enumerate(sliced):
-            if m.get("role") == "user":
-                sliced = sliced[i:]
-                break
-
-        out: list[dict[str, Any]] = []
-        for m in sliced:
-            entry: dict[str, Any] = {"role": m["role"], "content": m.get("content", "")}
-            for k in ("tool_calls", "tool_call_id", "name"):
-                if k in m:
-                    entry[k] = m[k]
-            out.append(entry)
-
-        # Drop orphaned messages from the front of the window.
-        while out:
-            first = out[0]
-            if first["role"] == "tool":
-                # Tool result whose assistant+tool_calls was sliced off.
-                out.pop(0)
-            elif first["role"] == "assistant" and first.get("tool_calls"):
-                # Assistant with tool_calls — check all results are present.
-                expected_ids = {
-                    tc.get("id") for tc in first["tool_calls"] if tc.get("id")
-                }
-                found_ids = {
-                    m.get("tool_call_id") for m in out[1:]
-                    if m["role"] == "tool" and m.get("tool_call_id")
-                }
-                if not expected_ids.issubset(found_ids):
-                    out.pop(0)
-                else:
-                    break
-            else:
-                break
-
-        # Drop orphaned assistant tool_calls from the END of the window.
-        # These occur when the bot crashed after calling a tool but before
-        # receiving the result — the assistant message has tool_calls but no
-        # following tool-result messages exist for them.
-        while out:
-            last = out[-1]
-            if last["role"] == "assistant" and last.get("tool_calls"):
-                expected_ids = {
-                    tc.get("id") for tc in last["tool_calls"] if tc.get("id")
-                }
-                # Collect tool_call_ids that appear AFTER this message — but
-                # since this is the last message there are none, so just check
-                # the preceding messages (there shouldn't be any following ones).
-                following_ids = {
-                    m.get("tool_call_id") for m in out[out.index(last) + 1:]
-                    if m["role"] == "tool" and m.get("tool_call_id")
-                }
-                if not expected_ids.issubset(following_ids):
-                    out.pop()
-                else:
-                    break
-            else:
-                break
-
-        return out
-
-    def clear(self) -> None:
-        """Clear all messages and reset session to initial state."""
-        self.messages = []
-        self.last_consolidated = 0
-        self.updated_at = datetime.now()
+__all__ = ["MessageLog", "Session", "SessionManager"]
 
 
 class SessionManager:
     """
     Manages conversation sessions.
 
-    Sessions are stored as JSONL files in the sessions directory.
+    Persistence is delegated to a ``SessionStore``: append-only JSONL files
+    in the sessions directory by default, or a single SQLite database (see
+    ``nanobot.session.store``).  Each save writes only the messages added
+    since the previous save.
+
+    Loaded sessions live in a bounded LRU cache.  Entries are evicted when
+    the cache exceeds ``max_entries`` or ``max_bytes`` (approximate message
+    payload), or when idle for longer than ``idle_ttl`` seconds.  Evicted
+    sessions are flushed first and reloaded lazily on next access.
+
+    With ``tail_window`` > 0, loading reads the file backwards and keeps
+    only the unconsolidated tail (at most ``tail_window`` messages) in
+    memory; older messages are read from disk on demand.
     """
 
-    def __init__(self, workspace: Path):
+    _STATS_FILE = ".cache_stats.json"
+    _STATS_INTERVAL_S = 30.0
+    _MSG_OVERHEAD_BYTES = 200  # Rough per-message cost of the dict and its keys
+
+    def __init__(
+        self,
+        workspace: Path,
+        max_entries: int = 256,
+        max_bytes: int = 64 * 1024 * 1024,
+        idle_ttl: float = 3600.0,
+        tail_window: int = 0,
+        store: SessionStore | None = None,
+    ):
         self.workspace = workspace
         self.sessions_dir = ensure_dir(self.workspace / "sessions")
         self.legacy_sessions_dir = Path.home() / ".nanobot" / "sessions"
-        self._cache: dict[str, Session] = {}
-
-    def _get_session_path(self, key: str) -> Path:
-        """Get the file path for a session."""
-        safe_key = safe_filename(key.replace(":", "_"))
-        return self.sessions_dir / f"{safe_key}.jsonl"
-
-    def _get_legacy_session_path(self, key: str) -> Path:
-        """Legacy global session path (~/.nanobot/sessions/)."""
-        safe_key = safe_filename(key.replace(":", "_"))
-        return self.legacy_sessions_dir / f"{safe_key}.jsonl"
+        self.store = store or JsonlSessionStore(self.sessions_dir, legacy_dir=self.legacy_sessions_dir)
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self.tail_window = tail_window
+        self._cache: OrderedDict[str, Session] = OrderedDict()
+        self._last_access: dict[str, float] = {}
+        self._sizes: dict[str, tuple[int, int]] = {}  # key -> (messages counted, approx bytes)
+        self._cached_bytes = 0
+        # Evicted sessions still referenced elsewhere (e.g. an in-flight turn)
+        # are reused instead of reloaded, so there is only ever one live copy.
+        self._detached: weakref.WeakValueDictionary[str, Session] = weakref.WeakValueDictionary()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._stats_written_at = 0.0
 
     def get_or_create(self, key: str) -> Session:
         """
@@ -157,84 +78,145 @@ class SessionManager:
             The session.
         """
         if key in self._cache:
-            return self._cache[key]
-
-        session = self._load(key)
-        if session is None:
-            session = Session(key=key)
+            self._stats["hits"] += 1
+            session = self._cache[key]
+        else:
+            self._stats["misses"] += 1
+            session = self._detached.pop(key, None) or self._load(key) or Session(key=key)
+        self._touch(session)
+        return session
 
-        self._cache[key] = session
+    # ---- cache bookkeeping ----
+
+    def _touch(self, session: Session) -> None:
+        """Mark a session as most recently used, then enforce cache limits."""
+        key = session.key
+        if self._cache.get(key) is not session:
+            self._forget(key)
+            self._cache[key] = session
+        self._cache.move_to_end(key)
+        self._last_access[key] = time.monotonic()
+        self._update_size(session)
+        self._enforce_limits(keep=key)
+
+    def _update_size(self, session: Session) -> None:
+        counted, size = self._sizes.get(session.key, (0, 0))
+        if counted > len(session.messages):
+            counted, size = 0, 0
+        counted = max(counted, getattr(session.messages, "offset", 0))
+        added = sum(
+            len(str(m.get("content") or "")) + self._MSG_OVERHEAD_BYTES
+            for m in session.messages[counted:]
+        )
+        old = self._sizes.get(session.key, (0, 0))[1]
+        self._sizes[session.key] = (len(session.messages), size + added)
+        self._cached_bytes += size + added - old
+
+    def _forget(self, key: str) -> Session | None:
+        """Drop a key from the cache without flushing."""
+        session = self._cache.pop(key, None)
+        self._last_access.pop(key, None)
+        _, size = self._sizes.pop(key, (0, 0))
+        self._cached_bytes -= size
         return session
 
-    def _load(self, key: str) -> Session | None:
-        """Load a session from disk."""
-        path = self._get_session_path(key)
-        if not path.exists():
-            legacy_path = self._get_legacy_session_path(key)
-            if legacy_path.exists():
-                try:
-                    shutil.move(str(legacy_path), str(path))
-                    logger.info("Migrated session {} from legacy path", key)
-                except Exception:
-                    logger.exception("Failed to migrate session {}", key)
-
-        if not path.exists():
-            return None
+    def _enforce_limits(self, keep: str | None = None) -> None:
+        now = time.monotonic()
+        while self._cache:
+            key = next(iter(self._cache))
+            if key == keep:
+                break
+            idle = now - self._last_access.get(key, now) > self.idle_ttl
+            over = len(self._cache) > self.max_entries or self._cached_bytes > self.max_bytes
+            if not (idle or over):
+                break
+            self._evict(key)
+        self._maybe_write_stats()
 
+    def _evict(self, key: str) -> None:
+        session = self._forget(key)
+        if session is None:
+            return
+        if self._is_dirty(session):
+            try:
+                self._persist(session)
+            except Exception:
+                logger.exception("Failed to flush evicted session {}", key)
+        self._detached[key] = session
+        self._stats["evictions"] += 1
+
+    @staticmethod
+    def _is_dirty(session: Session) -> bool:
+        return (
+            session._persisted != len(session.messages)
+            or session._persisted_consolidated != session.last_consolidated
+        )
+
+    def get_cache_stats(self) -> dict[str, int]:
+        """Return hit/miss/eviction counters and current cache occupancy."""
+        return {**self._stats, "entries": len(self._cache), "bytes": self._cached_bytes}
+
+    def _maybe_write_stats(self, force: bool = False) -> None:
+        """Publish cache counters to disk (throttled) so `nanobot status` can show them."""
+        now = time.monotonic()
+        if not force and now - self._stats_written_at < self._STATS_INTERVAL_S:
+            return
+        self._stats_written_at = now
+        try:
+            data = {**self.get_cache_stats(), "updated_at": datetime.now().isoformat()}
+            (self.sessions_dir / self._STATS_FILE).write_text(json.dumps(data), encoding="utf-8")
+        except OSError:
+            pass
+
+    @classmethod
+    def read_cache_stats(cls, workspace: Path) -> dict[str, Any] | None:
+        """Read the last cache counters published by a running gateway."""
+        path = workspace / "sessions" / cls._STATS_FILE
         try:
-            messages = []
-            metadata = {}
-            created_at = None
-            last_consolidated = 0
-
-            with open(path, encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-
-                    data = json.loads(line)
-
-                    if data.get("_type") == "metadata":
-                        metadata = data.get("metadata", {})
-                        created_at = datetime.fromisoformat(data["created_at"]) if data.get("created_at") else None
-                        last_consolidated = data.get("last_consolidated", 0)
-                    else:
-                        messages.append(data)
-
-            return Session(
-                key=key,
-                messages=messages,
-                created_at=created_at or datetime.now(),
-                metadata=metadata,
-                last_consolidated=last_consolidated
-            )
-        except Exception as e:
-            logger.warning("Failed to load session {}: {}", key, e)
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
             return None
 
+    def _load(self, key: str) -> Session | None:
+        """Load a session from the store."""
+        return self.store.load(key, self.tail_window)
+
     def save(self, session: Session) -> None:
-        """Save a session to disk."""
-        path = self._get_session_path(session.key)
-
-        with open(path, "w", encoding="utf-8") as f:
-            metadata_line = {
-                "_type": "metadata",
-                "key": session.key,
-                "created_at": session.created_at.isoformat(),
-                "updated_at": session.updated_at.isoformat(),
-                "metadata": session.metadata,
-                "last_consolidated": session.last_consolidated
-            }
-            f.write(json.dumps(metadata_line, ensure_ascii=False) + "\n")
-            for msg in session.messages:
-                f.write(json.dumps(msg, ensure_ascii=False) + "\n")
-
-        self._cache[session.key] = session
+        """Save a session to disk, appending only messages added since the last save."""
+        self._persist(session)
+        self._touch(session)
+
+    def _persist(self, session: Session) -> None:
+        persisted = session._persisted
+        if persisted is None or persisted > len(session.messages) or not self.store.exists(session.key):
+            self.store.rewrite(session)
+        else:
+            self.store.append(session, persisted)
+        session._persisted = len(session.messages)
+        session._persisted_consolidated = session.last_consolidated
+
+    def compact(self, session: Session) -> None:
+        """Drop stale metadata records for a session (JSONL) or no-op (SQLite)."""
+        self.store.compact(session)
+        session._persisted = len(session.messages)
+        session._persisted_consolidated = session.last_consolidated
 
     def invalidate(self, key: str) -> None:
-        """Remove a session from the in-memory cache."""
-        self._cache.pop(key, None)
+        """Remove a session from the in-memory cache (without flushing)."""
+        self._forget(key)
+        self._detached.pop(key, None)
+
+    def flush(self) -> None:
+        """Write every dirty cached session to disk."""
+        for session in list(self._cache.values()):
+            if self._is_dirty(session):
+                self._persist(session)
+        self._maybe_write_stats(force=True)
+
+    def close(self) -> None:
+        """Flush dirty sessions and release the store."""
+        self.flush()
+        self.store.close()
 
     def list_sessions(self) -> list[dict[str, Any]]:
         """
@@ -243,24 +225,4 @@ class SessionManager:
         Returns:
             List of session info dicts.
         """
-        sessions = []
-
-        for path in self.sessions_dir.glob("*.jsonl"):
-            try:
-                # Read just the metadata line
-                with open(path, encoding="utf-8") as f:
-                    first_line = f.readline().strip()
-                    if first_line:
-                        data = json.loads(first_line)
-                        if data.get("_type") == "metadata":
-                            key = data.get("key") or path.stem.replace("_", ":", 1)
-                            sessions.append({
-                                "key": key,
-                                "created_at": data.get("created_at"),
-                                "updated_at": data.get("updated_at"),
-                                "path": str(path)
-                            })
-            except Exception:
-                continue
-
-        return sorted(sessions, key=lambda x: x.get("updated_at", ""), reverse=True)
+        return self.store.list_sessions()
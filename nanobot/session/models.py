@@ -0,0 +1,255 @@
+"""Session and message-log types shared by the manager and the stores."""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Iterator
+
+from nanobot.utils.helpers import estimate_message_tokens
+
+
+class MessageLog:
+    """
+    List-like message store whose oldest entries stay on disk until accessed.
+
+    Indices are absolute: ``len()`` counts every message in the session,
+    but only ``messages[offset:]`` is held in memory.  Reading an older
+    index pulls the missing range in through ``loader(start, stop)``;
+    ``iter_older()`` streams it without keeping it.
+    """
+
+    def __init__(
+        self,
+        tail: list[dict[str, Any]],
+        offset: int,
+        loader: Callable[[int, int], Iterator[dict[str, Any]]],
+    ):
+        self._tail = tail
+        self._offset = offset
+        self._loader = loader
+
+    @property
+    def offset(self) -> int:
+        """Number of leading messages not yet materialized."""
+        return self._offset
+
+    def _materialize(self, start: int) -> None:
+        if start < self._offset:
+            self._tail[:0] = list(self._loader(start, self._offset))
+            self._offset = start
+
+    def iter_older(self, start: int = 0) -> Iterator[dict[str, Any]]:
+        """Stream messages from ``start`` up to the in-memory tail without caching them."""
+        if start < self._offset:
+            yield from self._loader(start, self._offset)
+
+    def __len__(self) -> int:
+        return self._offset + len(self._tail)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return list(self)[index]
+            if start >= stop:
+                return []
+            self._materialize(start)
+            return self._tail[start - self._offset:stop - self._offset]
+        i = index + len(self) if index < 0 else index
+        if not 0 <= i < len(self):
+            raise IndexError("message index out of range")
+        self._materialize(i)
+        return self._tail[i - self._offset]
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        yield from self.iter_older()
+        yield from self._tail
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, MessageLog)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"MessageLog(len={len(self)}, offset={self._offset})"
+
+    def append(self, msg: dict[str, Any]) -> None:
+        self._tail.append(msg)
+
+    def extend(self, msgs: list[dict[str, Any]]) -> None:
+        self._tail.extend(msgs)
+
+    def copy(self) -> list[dict[str, Any]]:
+        return list(self)
+
+
+@dataclass
+class Session:
+    """
+    A conversation session.
+
+    Stores messages in JSONL format for easy reading and persistence.
+
+    Important: Messages are append-only for LLM cache efficiency.
+    The consolidation process writes summaries to MEMORY.md/HISTORY.md
+    but does NOT modify the messages list or get_history() output.
+    """
+
+    key: str  # channel:chat_id
+    messages: list[dict[str, Any]] = field(default_factory=list)
+    created_at: datetime = field(default_factory=datetime.now)
+    updated_at: datetime = field(default_factory=datetime.now)
+    metadata: dict[str, Any] = field(default_factory=dict)
+    last_consolidated: int = 0  # Number of messages already consolidated to files
+    # Messages already written to disk; None means the file must be rewritten.
+    _persisted: int | None = field(default=None, repr=False, compare=False)
+    _persisted_consolidated: int = field(default=0, repr=False, compare=False)
+    # Estimated token size per absolute message index (messages are append-only).
+    _token_sizes: dict[int, int] = field(default_factory=dict, repr=False, compare=False)
+    _token_ratio: float = field(default=0.0, repr=False, compare=False)
+    # (key, start, window) from the last get_history call; see get_history.
+    _history_cache: tuple[tuple, int, list[dict[str, Any]]] | None = field(default=None, repr=False, compare=False)
+
+    def add_message(self, role: str, content: str, **kwargs: Any) -> None:
+        """Add a message to the session."""
+        msg = {
+            "role": role,
+            "content": content,
+            "timestamp": datetime.now().isoformat(),
+            **kwargs
+        }
+        self.messages.append(msg)
+        self.updated_at = datetime.now()
+
+    def get_history(
+        self,
+        max_messages: int = 500,
+        max_tokens: int | None = None,
+        chars_per_token: float = 4.0,
+    ) -> list[dict[str, Any]]:
+        """Return unconsolidated messages for LLM input, preserving tool metadata.
+
+        Starts from last_consolidated to skip already-summarised history.
+        The tail-slice may cut an assistant message with tool_calls while
+        keeping its orphaned tool-result messages.  We trim those from the
+        front so every tool result has a preceding assistant tool_call and
+        every assistant tool_call has its following tool results.
+
+        The sanitized window is cached until a message is appended or the
+        consolidation offset moves; returned entries are shared with that
+        cache and must not be mutated.
+
+        ``max_messages=0`` means no cap (the whole unconsolidated tail).  With
+        ``max_tokens``, whole turns (a user message and everything up to the
+        next one) are then dropped oldest-first until the estimated size
+        fits, so tool_call/tool_result pairs are never split.
+        """
+        if max_messages < 0:
+            raise ValueError(f"max_messages must be >= 0, got {max_messages}")
+        key = (id(self.messages), len(self.messages), self.last_consolidated, max_messages)
+        if self._history_cache is None or self._history_cache[0] != key:
+            self._history_cache = (key, *self._sanitize_window(max_messages))
+        _, start, window = self._history_cache
+
+        out = list(window)
+        if max_tokens is not None and out:
+            # out is the contiguous run self.messages[start:start + len(out)].
+            out = self._fit_tokens(out, start, max_tokens, chars_per_token)
+        return out
+
+    def _sanitize_window(self, max_messages: int) -> tuple[int, list[dict[str, Any]]]:
+        """Single pass over the history tail; returns (absolute start index, messages)."""
+        # Slice from the absolute start index so lazily loaded sessions only
+        # touch their in-memory tail.
+        start = self.last_consolidated
+        if max_messages:
+            start = max(start, len(self.messages) - max_messages)
+        sliced = self.messages[start:]
+
+        # Drop leading non-user messages to avoid orphaned tool_result blocks
+        for i, m in enumerate(sliced):
+            if m.get("role") == "user":
+                sliced = sliced[i:]
+                start += i
+                break
+
+        out: list[dict[str, Any]] = []
+        # How many results for each tool_call_id remain in out[head:].
+        results: dict[str, int] = {}
+        for m in sliced:
+            entry: dict[str, Any] = {"role": m["role"], "content": m.get("content", "")}
+            for k in ("tool_calls", "tool_call_id", "name"):
+                if k in m:
+                    entry[k] = m[k]
+            out.append(entry)
+            if entry["role"] == "tool" and entry.get("tool_call_id"):
+                results[entry["tool_call_id"]] = results.get(entry["tool_call_id"], 0) + 1
+
+        # Drop orphaned messages from the front of the window: tool results whose
+        # assistant+tool_calls was sliced off, and assistant tool_calls missing any
+        # of their results.
+        head = 0
+        while head < len(out):
+            first = out[head]
+            if first["role"] == "tool":
+                if first.get("tool_call_id"):
+                    results[first["tool_call_id"]] -= 1
+            elif first["role"] == "assistant" and first.get("tool_calls"):
+                if all(results.get(tc["id"], 0) > 0 for tc in first["tool_calls"] if tc.get("id")):
+                    break
+            else:
+                break
+            head += 1
+
+        # Drop orphaned assistant tool_calls from the END of the window.
+        # These occur when the bot crashed after calling a tool but before
+        # receiving the result — nothing follows the last message, so any
+        # tool_call id it carries is unanswered.
+        tail = len(out)
+        while tail > head:
+            last = out[tail - 1]
+            if last["role"] == "assistant" and any(tc.get("id") for tc in last.get("tool_calls") or ()):
+                tail -= 1
+            else:
+                break
+
+        return start + head, out[head:tail]
+
+    def _fit_tokens(
+        self,
+        out: list[dict[str, Any]],
+        first_index: int,
+        max_tokens: int,
+        ratio: float,
+    ) -> list[dict[str, Any]]:
+        """Drop the oldest whole turns of *out* until its estimated size fits *max_tokens*."""
+        if ratio != self._token_ratio:
+            self._token_sizes, self._token_ratio = {}, ratio
+        elif len(self._token_sizes) > 2 * len(out) + 64:
+            # Forget messages that have left the window.
+            self._token_sizes = {i: n for i, n in self._token_sizes.items() if i >= first_index}
+        sizes = []
+        for i, m in enumerate(out):
+            idx = first_index + i
+            if (size := self._token_sizes.get(idx)) is None:
+                size = self._token_sizes[idx] = estimate_message_tokens(m, ratio)
+            sizes.append(size)
+        total = sum(sizes)
+        start = 0
+        while total > max_tokens and start < len(out):
+            # Skip to the next user message: the dropped span is one whole turn.
+            nxt = next((j for j in range(start + 1, len(out)) if out[j]["role"] == "user"), len(out))
+            total -= sum(sizes[start:nxt])
+            start = nxt
+        return out[start:]
+
+    def clear(self) -> None:
+        """Clear all messages and reset session to initial state."""
+        self.messages = []
+        self.last_consolidated = 0
+        self.updated_at = datetime.now()
+        self._persisted = None
+        self._token_sizes = {}
+        self._history_cache = None
@@ -0,0 +1,512 @@
+"""Storage backends for conversation sessions."""
+
+import json
+import os
+import shutil
+import sqlite3
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterator, Literal
+
+from loguru import logger
+
+from nanobot.session.models import MessageLog, Session
+from nanobot.utils.helpers import ensure_dir, safe_filename
+
+_METADATA_PREFIX = b'{"_type": "metadata"'
+
+
+def _metadata_record(session: Session) -> dict[str, Any]:
+    return {
+        "_type": "metadata",
+        "key": session.key,
+        "created_at": session.created_at.isoformat(),
+        "updated_at": session.updated_at.isoformat(),
+        "metadata": session.metadata,
+        "last_consolidated": session.last_consolidated,
+        "message_count": len(session.messages),
+    }
+
+
+class SessionStore(ABC):
+    """
+    Persistence backend used by SessionManager.
+
+    Stores only deal with bytes on disk; caching and dirty tracking stay in
+    the manager.  ``append`` and ``rewrite`` do not touch the session's
+    ``_persisted`` markers — the manager updates them after a successful write.
+    """
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """Return True if the session has been persisted."""
+
+    @abstractmethod
+    def load(self, key: str, tail_window: int = 0) -> Session | None:
+        """Load a session, keeping at most ``tail_window`` unconsolidated messages in memory (0 = all)."""
+
+    @abstractmethod
+    def append(self, session: Session, start: int) -> None:
+        """Persist ``session.messages[start:]`` and the current session metadata."""
+
+    @abstractmethod
+    def rewrite(self, session: Session) -> None:
+        """Replace the stored session with its full current contents."""
+
+    @abstractmethod
+    def list_sessions(self) -> list[dict[str, Any]]:
+        """Return session info dicts, newest first."""
+
+    def compact(self, session: Session) -> None:
+        """Drop redundant records for a session. Defaults to a full rewrite."""
+        self.rewrite(session)
+
+    def close(self) -> None:
+        """Release any open handles."""
+
+
+class JsonlSessionStore(SessionStore):
+    """
+    One append-only JSONL file per session.
+
+    Each save writes only the messages added since the previous save,
+    followed by a metadata record.  The last metadata record in a file wins.
+    ``compact()`` rewrites a file down to a leading and a trailing metadata
+    line around its messages.
+    """
+
+    def __init__(self, sessions_dir: Path, legacy_dir: Path | None = None):
+        self.sessions_dir = ensure_dir(sessions_dir)
+        self.legacy_dir = legacy_dir
+
+    def _get_session_path(self, key: str) -> Path:
+        """Get the file path for a session."""
+        safe_key = safe_filename(key.replace(":", "_"))
+        return self.sessions_dir / f"{safe_key}.jsonl"
+
+    def _get_legacy_session_path(self, key: str) -> Path | None:
+        """Legacy global session path (~/.nanobot/sessions/)."""
+        if self.legacy_dir is None:
+            return None
+        safe_key = safe_filename(key.replace(":", "_"))
+        return self.legacy_dir / f"{safe_key}.jsonl"
+
+    def exists(self, key: str) -> bool:
+        return self._get_session_path(key).exists()
+
+    def load(self, key: str, tail_window: int = 0) -> Session | None:
+        path = self._get_session_path(key)
+        if not path.exists():
+            legacy_path = self._get_legacy_session_path(key)
+            if legacy_path and legacy_path.exists():
+                try:
+                    shutil.move(str(legacy_path), str(path))
+                    logger.info("Migrated session {} from legacy path", key)
+                except Exception:
+                    logger.exception("Failed to migrate session {}", key)
+
+        if not path.exists():
+            return None
+
+        if tail_window > 0:
+            try:
+                if session := self._load_tail(key, path, tail_window):
+                    return session
+            except Exception as e:
+                logger.debug("Tail load of session {} failed, reading whole file: {}", key, e)
+
+        try:
+            return self._load_full(key, path)
+        except Exception as e:
+            logger.warning("Failed to load session {}: {}", key, e)
+            return None
+
+    def _load_full(self, key: str, path: Path) -> Session:
+        messages = []
+        metadata = {}
+        created_at = None
+        updated_at = None
+        last_consolidated = 0
+
+        with open(path, "rb") as f:
+            raw_lines = f.read().split(b"\n")
+
+        good_bytes = 0  # Length of the prefix made of complete, parseable lines
+        for i, raw in enumerate(raw_lines):
+            is_last = i == len(raw_lines) - 1
+            line = raw.strip()
+            if not line:
+                if not is_last:
+                    good_bytes += len(raw) + 1
+                continue
+
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError:
+                if any(r.strip() for r in raw_lines[i + 1:]):
+                    raise
+                # Truncated trailing record from a crash mid-append: drop it.
+                logger.warning("Session {}: discarding truncated trailing record", key)
+                break
+            if is_last:
+                # Valid JSON but no newline yet — keep it and terminate it below.
+                good_bytes += len(raw)
+            else:
+                good_bytes += len(raw) + 1
+
+            if data.get("_type") == "metadata":
+                metadata = data.get("metadata", {})
+                created_at = datetime.fromisoformat(data["created_at"]) if data.get("created_at") else None
+                updated_at = datetime.fromisoformat(data["updated_at"]) if data.get("updated_at") else None
+                last_consolidated = data.get("last_consolidated", 0)
+            else:
+                messages.append(data)
+
+        self._repair_tail(path, good_bytes)
+
+        return Session(
+            key=key,
+            messages=messages,
+            created_at=created_at or datetime.now(),
+            updated_at=updated_at or datetime.now(),
+            metadata=metadata,
+            last_consolidated=last_consolidated,
+            _persisted=len(messages),
+            _persisted_consolidated=last_consolidated,
+        )
+
+    def _load_tail(self, key: str, path: Path, tail_window: int, block_size: int = 65536) -> Session | None:
+        """Load only the unconsolidated tail by reading the file backwards.
+
+        Returns None when the file does not end with a metadata record that
+        carries ``message_count`` (legacy layout or an interrupted append),
+        in which case the caller falls back to a full load and repair.
+        """
+        meta: dict[str, Any] | None = None
+        tail: list[dict[str, Any]] = []
+        need = 0
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            if pos == 0:
+                return None
+            f.seek(pos - 1)
+            if f.read(1) != b"\n":
+                return None
+            carry = b""
+            while pos > 0 and (meta is None or len(tail) < need):
+                step = min(block_size, pos)
+                pos -= step
+                f.seek(pos)
+                chunk = f.read(step) + carry
+                lines = chunk.split(b"\n")
+                carry = lines.pop(0) if pos > 0 else b""
+                for raw in reversed(lines):
+                    if meta is not None and len(tail) >= need:
+                        break
+                    if not raw.strip():
+                        continue
+                    if raw.startswith(_METADATA_PREFIX):
+                        if meta is None:
+                            meta = json.loads(raw)
+                            if "message_count" not in meta:
+                                return None
+                            total = meta["message_count"]
+                            start = max(meta.get("last_consolidated", 0), total - tail_window)
+                            need = max(0, total - start)
+                        continue
+                    if meta is None:
+                        return None  # Messages after the last metadata record
+                    tail.append(json.loads(raw))
+        if meta is None or len(tail) < need:
+            return None
+
+        tail.reverse()
+        total = meta["message_count"]
+        return Session(
+            key=key,
+            messages=MessageLog(tail, total - len(tail), lambda a, b: self._read_messages(path, a, b)),
+            created_at=datetime.fromisoformat(meta["created_at"]) if meta.get("created_at") else datetime.now(),
+            updated_at=datetime.fromisoformat(meta["updated_at"]) if meta.get("updated_at") else datetime.now(),
+            metadata=meta.get("metadata", {}),
+            last_consolidated=meta.get("last_consolidated", 0),
+            _persisted=total,
+            _persisted_consolidated=meta.get("last_consolidated", 0),
+        )
+
+    @staticmethod
+    def _read_messages(path: Path, start: int, stop: int) -> Iterator[dict[str, Any]]:
+        """Yield messages with absolute index in [start, stop), parsing only those lines."""
+        index = 0
+        with open(path, "rb") as f:
+            for raw in f:
+                if index >= stop:
+                    break
+                if not raw.strip() or raw.startswith(_METADATA_PREFIX):
+                    continue
+                if index >= start:
+                    yield json.loads(raw)
+                index += 1
+
+    @staticmethod
+    def _repair_tail(path: Path, good_bytes: int) -> None:
+        """Cut a partial trailing record and make sure the file ends with a newline."""
+        size = path.stat().st_size
+        if good_bytes < size:
+            with open(path, "r+b") as f:
+                f.truncate(good_bytes)
+            size = good_bytes
+        if size:
+            with open(path, "r+b") as f:
+                f.seek(size - 1)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+
+    def append(self, session: Session, start: int) -> None:
+        lines = [json.dumps(m, ensure_ascii=False) for m in session.messages[start:]]
+        lines.append(json.dumps(_metadata_record(session), ensure_ascii=False))
+        with open(self._get_session_path(session.key), "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def rewrite(self, session: Session) -> None:
+        """Atomically replace the session file with its full current contents."""
+        path = self._get_session_path(session.key)
+        tmp = path.with_suffix(".jsonl.tmp")
+        metadata_line = json.dumps(_metadata_record(session), ensure_ascii=False) + "\n"
+        with open(tmp, "w", encoding="utf-8") as f:
+            # Leading record for readers that only look at the first line,
+            # trailing one so tail loads find it without a full scan.
+            f.write(metadata_line)
+            for msg in session.messages:
+                f.write(json.dumps(msg, ensure_ascii=False) + "\n")
+            if session.messages:
+                f.write(metadata_line)
+        os.replace(tmp, path)
+
+    def list_sessions(self) -> list[dict[str, Any]]:
+        sessions = []
+
+        for path in self.sessions_dir.glob("*.jsonl"):
+            try:
+                data = self._read_last_metadata(path)
+                if data:
+                    key = data.get("key") or path.stem.replace("_", ":", 1)
+                    sessions.append({
+                        "key": key,
+                        "created_at": data.get("created_at"),
+                        "updated_at": data.get("updated_at"),
+                        "path": str(path)
+                    })
+            except Exception:
+                continue
+
+        return sorted(sessions, key=lambda x: x.get("updated_at", ""), reverse=True)
+
+    @staticmethod
+    def _read_last_metadata(path: Path, block_size: int = 8192) -> dict[str, Any] | None:
+        """Return the newest metadata record without reading the whole file.
+
+        Appended saves always end with a metadata record; compacted files
+        carry theirs on the first line.
+        """
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            tail = b""
+            while pos > 0 and tail.count(b"\n") < 2:
+                step = min(block_size, pos)
+                pos -= step
+                f.seek(pos)
+                tail = f.read(step) + tail
+            lines = [ln for ln in tail.split(b"\n") if ln.strip()]
+            if lines:
+                try:
+                    data = json.loads(lines[-1])
+                    if data.get("_type") == "metadata":
+                        return data
+                except json.JSONDecodeError:
+                    pass
+            f.seek(0)
+            first_line = f.readline().strip()
+        if first_line:
+            data = json.loads(first_line)
+            if data.get("_type") == "metadata":
+                return data
+        return None
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    key TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    metadata TEXT NOT NULL DEFAULT '{}',
+    last_consolidated INTEGER NOT NULL DEFAULT 0,
+    message_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_updated_at ON sessions (updated_at);
+CREATE TABLE IF NOT EXISTS messages (
+    session_key TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (session_key, seq)
+) WITHOUT ROWID;
+"""
+
+
+class SqliteSessionStore(SessionStore):
+    """
+    All sessions in one SQLite database (WAL mode).
+
+    Messages are rows keyed by ``(session_key, seq)``, so appends are batched
+    inserts, tail loads are an index range scan, and listing sessions reads
+    the ``updated_at`` index instead of opening every session file.
+    """
+
+    def __init__(self, db_path: Path):
+        ensure_dir(db_path.parent)
+        self.db_path = db_path
+        self._conn = sqlite3.connect(str(db_path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SQLITE_SCHEMA)
+
+    def exists(self, key: str) -> bool:
+        row = self._conn.execute("SELECT 1 FROM sessions WHERE key = ?", (key,)).fetchone()
+        return row is not None
+
+    def load(self, key: str, tail_window: int = 0) -> Session | None:
+        row = self._conn.execute(
+            "SELECT created_at, updated_at, metadata, last_consolidated, message_count"
+            " FROM sessions WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        created_at, updated_at, metadata, last_consolidated, total = row
+
+        start = max(last_consolidated, total - tail_window) if tail_window > 0 else 0
+        start = min(start, total)
+        tail = list(self._read_messages(key, start, total))
+        messages: list[dict[str, Any]] | MessageLog = tail
+        if start > 0:
+            messages = MessageLog(tail, start, lambda a, b: self._read_messages(key, a, b))
+
+        return Session(
+            key=key,
+            messages=messages,
+            created_at=datetime.fromisoformat(created_at),
+            updated_at=datetime.fromisoformat(updated_at),
+            metadata=json.loads(metadata),
+            last_consolidated=last_consolidated,
+            _persisted=total,
+            _persisted_consolidated=last_consolidated,
+        )
+
+    def _read_messages(self, key: str, start: int, stop: int) -> Iterator[dict[str, Any]]:
+        """Yield messages with seq in [start, stop)."""
+        rows = self._conn.execute(
+            "SELECT data FROM messages WHERE session_key = ? AND seq >= ? AND seq < ? ORDER BY seq",
+            (key, start, stop),
+        ).fetchall()
+        for (data,) in rows:
+            yield json.loads(data)
+
+    def _upsert_session(self, session: Session) -> None:
+        self._conn.execute(
+            "INSERT INTO sessions (key, created_at, updated_at, metadata, last_consolidated, message_count)"
+            " VALUES (?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT(key) DO UPDATE SET"
+            " updated_at = excluded.updated_at, metadata = excluded.metadata,"
+            " last_consolidated = excluded.last_consolidated, message_count = excluded.message_count",
+            (
+                session.key,
+                session.created_at.isoformat(),
+                session.updated_at.isoformat(),
+                json.dumps(session.metadata, ensure_ascii=False),
+                session.last_consolidated,
+                len(session.messages),
+            ),
+        )
+
+    def append(self, session: Session, start: int) -> None:
+        rows = [
+            (session.key, start + i, json.dumps(m, ensure_ascii=False))
+            for i, m in enumerate(session.messages[start:])
+        ]
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO messages (session_key, seq, data) VALUES (?, ?, ?)", rows
+            )
+            self._upsert_session(session)
+
+    def rewrite(self, session: Session) -> None:
+        # Serialize first: lazily loaded sessions read older rows from this table.
+        rows = [
+            (session.key, i, json.dumps(m, ensure_ascii=False))
+            for i, m in enumerate(session.messages)
+        ]
+        with self._conn:
+            self._conn.execute("DELETE FROM messages WHERE session_key = ?", (session.key,))
+            self._conn.executemany(
+                "INSERT INTO messages (session_key, seq, data) VALUES (?, ?, ?)", rows
+            )
+            self._upsert_session(session)
+
+    def compact(self, session: Session) -> None:
+        """Rows are never duplicated, so there is nothing to compact."""
+
+    def list_sessions(self) -> list[dict[str, Any]]:
+        rows = self._conn.execute(
+            "SELECT key, created_at, updated_at FROM sessions ORDER BY updated_at DESC"
+        ).fetchall()
+        return [
+            {"key": key, "created_at": created_at, "updated_at": updated_at, "path": str(self.db_path)}
+            for key, created_at, updated_at in rows
+        ]
+
+    def import_jsonl(self, source: JsonlSessionStore) -> int:
+        """
+        One-shot import of JSONL session files.
+
+        Each imported file is renamed to ``*.jsonl.migrated`` so it is not
+        imported twice.  Sessions already in the database are left alone.
+
+        Returns:
+            Number of sessions imported.
+        """
+        imported = 0
+        for path in sorted(source.sessions_dir.glob("*.jsonl")):
+            try:
+                data = source._read_last_metadata(path) or {}
+                key = data.get("key") or path.stem.replace("_", ":", 1)
+                if not self.exists(key):
+                    session = source._load_full(key, path)
+                    self.rewrite(session)
+                    imported += 1
+                path.rename(path.with_name(path.name + ".migrated"))
+            except Exception:
+                logger.exception("Failed to import session file {}", path)
+        if imported:
+            logger.info("Imported {} JSONL sessions into {}", imported, self.db_path)
+        return imported
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def create_session_store(
+    sessions_dir: Path,
+    backend: Literal["jsonl", "sqlite"] = "jsonl",
+    legacy_dir: Path | None = None,
+) -> SessionStore:
+    """Build the configured session store, importing JSONL files when switching to SQLite."""
+    jsonl = JsonlSessionStore(sessions_dir, legacy_dir=legacy_dir)
+    if backend == "jsonl":
+        return jsonl
+    if backend == "sqlite":
+        store = SqliteSessionStore(sessions_dir / "sessions.db")
+        store.import_jsonl(jsonl)
+        return store
+    raise ValueError(f"Unknown session backend: {backend}")
@@ -0,0 +1,6 @@
+"""Usage telemetry: token, latency and cost metrics."""
+
+from nanobot.telemetry.recorder import Telemetry
+from nanobot.telemetry.server import MetricsServer
+
+__all__ = ["MetricsServer", "Telemetry"]
@@ -0,0 +1,182 @@
+"""Usage telemetry: in-memory Prometheus metrics plus a rolling JSONL event log."""
+
+from __future__ import annotations
+
+import json
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+# Seconds; shared by LLM call latency and tool duration histograms.
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+# Bytes; peak memory of exec commands.
+MEMORY_BUCKETS = tuple(mb * 1024 * 1024 for mb in (16, 64, 256, 1024, 4096))
+
+_TOKEN_KINDS = ("prompt_tokens", "completion_tokens", "cache_read_tokens", "cache_write_tokens")
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class _Histogram:
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.bounds = bounds
+        self.buckets = [0] * len(bounds)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.buckets[i] += 1
+
+
+def _labels(**labels: str | None) -> Labels:
+    return tuple(sorted((k, v) for k, v in labels.items() if v))
+
+
+def _fmt_labels(labels: Labels, extra: tuple[str, str] | None = None) -> str:
+    pairs = [*labels, extra] if extra else list(labels)
+    if not pairs:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for k, v in pairs
+    )
+    return "{" + body + "}"
+
+
+class Telemetry:
+    """
+    Records LLM calls, tool executions and agent turns.
+
+    Aggregates are kept in memory for the Prometheus endpoint; each event is
+    also appended to ``log_path`` as one JSON line, rotating to ``.1``, ``.2``…
+    once the file passes ``max_bytes``.
+    """
+
+    def __init__(self, log_path: Path | None = None, max_bytes: int = 10 * 1024 * 1024, backups: int = 3):
+        self.log_path = log_path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._counters: dict[tuple[str, Labels], float] = defaultdict(float)
+        self._histograms: dict[tuple[str, Labels], _Histogram] = {}
+
+    # -- recording ---------------------------------------------------------
+
+    def record_llm_call(
+        self,
+        model: str,
+        latency_s: float,
+        usage: dict[str, Any],
+        session: str | None = None,
+        iteration: int = 0,
+        error: bool = False,
+    ) -> None:
+        """One provider round trip (``usage`` as returned in LLMResponse.usage)."""
+        channel = session.split(":", 1)[0] if session else None
+        self._inc("nanobot_llm_calls_total", 1, model=model, channel=channel, status="error" if error else "ok")
+        self._observe("nanobot_llm_latency_seconds", latency_s, model=model)
+        for kind in _TOKEN_KINDS:
+            if tokens := usage.get(kind):
+                self._inc("nanobot_llm_tokens_total", tokens, model=model, channel=channel, kind=kind.rsplit("_", 1)[0])
+        if cost := usage.get("cost_usd"):
+            self._inc("nanobot_llm_cost_usd_total", cost, model=model, channel=channel)
+        self._write({
+            "type": "llm", "session": session, "channel": channel, "model": model, "iteration": iteration,
+            "latency_ms": round(latency_s * 1000, 1), "error": error,
+            **{k: usage[k] for k in (*_TOKEN_KINDS, "cost_usd") if usage.get(k)},
+        })
+
+    def record_tool(self, name: str, duration_s: float, ok: bool = True) -> None:
+        """One tool execution."""
+        self._inc("nanobot_tool_calls_total", 1, tool=name, status="ok" if ok else "error")
+        self._observe("nanobot_tool_duration_seconds", duration_s, tool=name)
+        self._write({"type": "tool", "tool": name, "duration_ms": round(duration_s * 1000, 1), "ok": ok})
+
+    def record_exec_usage(self, cpu_s: float, max_rss_bytes: int | None, limit: str | None = None) -> None:
+        """
+        Resources used by one sandboxed shell command (``limit`` names the limit that killed it).
+
+        ``max_rss_bytes`` is None for persistent-shell commands, whose memory is not measured.
+        """
+        self._inc("nanobot_exec_cpu_seconds_total", cpu_s)
+        if max_rss_bytes is not None:
+            self._observe("nanobot_exec_max_rss_bytes", max_rss_bytes, bounds=MEMORY_BUCKETS)
+        if limit:
+            self._inc("nanobot_exec_limit_kills_total", 1, limit=limit)
+        self._write({
+            "type": "exec", "cpu_ms": round(cpu_s * 1000, 1),
+            **({"max_rss_kb": max_rss_bytes // 1024} if max_rss_bytes is not None else {}),
+            **({"limit": limit} if limit else {}),
+        })
+
+    def record_turn(self, session: str | None, iterations: int, duration_s: float, usage: dict[str, Any]) -> None:
+        """One agent turn: the LLM/tool iterations spent answering a message."""
+        channel = session.split(":", 1)[0] if session else None
+        self._inc("nanobot_turns_total", 1, channel=channel)
+        self._inc("nanobot_turn_iterations_total", iterations, channel=channel)
+        self._write({
+            "type": "turn", "session": session, "channel": channel, "iterations": iterations,
+            "duration_ms": round(duration_s * 1000, 1),
+            **{k: usage[k] for k in (*_TOKEN_KINDS, "cost_usd") if usage.get(k)},
+        })
+
+    def _inc(self, name: str, value: float, **labels: str | None) -> None:
+        self._counters[(name, _labels(**labels))] += value
+
+    def _observe(
+        self, name: str, value: float, bounds: tuple[float, ...] = LATENCY_BUCKETS, **labels: str | None
+    ) -> None:
+        key = (name, _labels(**labels))
+        if (hist := self._histograms.get(key)) is None:
+            hist = self._histograms[key] = _Histogram(bounds)
+        hist.observe(value)
+
+    def _write(self, event: dict[str, Any]) -> None:
+        if not self.log_path:
+            return
+        line = json.dumps({"ts": round(time.time(), 3), **event}, ensure_ascii=False) + "\n"
+        try:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            if self.log_path.exists() and self.log_path.stat().st_size + len(line) > self.max_bytes:
+                self._rotate()
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(line)
+        except OSError as e:
+            logger.warning("Telemetry log write failed: {}", e)
+
+    def _rotate(self) -> None:
+        if self.backups <= 0:
+            self.log_path.unlink(missing_ok=True)
+            return
+        for i in range(self.backups - 1, 0, -1):
+            older = self.log_path.with_name(f"{self.log_path.name}.{i}")
+            if older.exists():
+                older.replace(self.log_path.with_name(f"{self.log_path.name}.{i + 1}"))
+        self.log_path.replace(self.log_path.with_name(f"{self.log_path.name}.1"))
+
+    # -- export ------------------------------------------------------------
+
+    def render_prometheus(self) -> str:
+        """Current aggregates in the Prometheus text exposition format."""
+        lines: list[str] = []
+        for name in sorted({n for n, _ in self._counters}):
+            lines.append(f"# TYPE {name} counter")
+            for (n, labels), value in sorted(self._counters.items()):
+                if n == name:
+                    lines.append(f"{name}{_fmt_labels(labels)} {value:g}")
+        for name in sorted({n for n, _ in self._histograms}):
+            lines.append(f"# TYPE {name} histogram")
+            for (n, labels), hist in sorted(self._histograms.items(), key=lambda kv: kv[0]):
+                if n != name:
+                    continue
+                for bound, count in zip(hist.bounds, hist.buckets):
+                    lines.append(f"{name}_bucket{_fmt_labels(labels, ('le', f'{bound:.15g}'))} {count}")
+                lines.append(f"{name}_bucket{_fmt_labels(labels, ('le', '+Inf'))} {hist.count}")
+                lines.append(f"{name}_sum{_fmt_labels(labels)} {hist.sum:g}")
+                lines.append(f"{name}_count{_fmt_labels(labels)} {hist.count}")
+        return "\n".join(lines) + "\n"
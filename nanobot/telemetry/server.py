@@ -0,0 +1,52 @@
+"""Minimal HTTP endpoint serving telemetry in Prometheus format."""
+
+from __future__ import annotations
+
+import asyncio
+
+from loguru import logger
+
+from nanobot.telemetry.recorder import Telemetry
+
+
+class MetricsServer:
+    """Serves ``GET /metrics`` from a Telemetry instance on the running event loop."""
+
+    def __init__(self, telemetry: Telemetry, host: str = "127.0.0.1", port: int = 9464):
+        self.telemetry = telemetry
+        self.host = host
+        self.port = port
+        self._server: asyncio.Server | None = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("Metrics endpoint on http://{}:{}/metrics", self.host, self.port)
+
+    async def stop(self) -> None:
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = await asyncio.wait_for(reader.readline(), timeout=5)
+            # Drain headers; the request body (if any) is ignored.
+            while await asyncio.wait_for(reader.readline(), timeout=5) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?", 1)[0] == "/metrics":
+                status, body = "200 OK", self.telemetry.render_prometheus().encode()
+                ctype = "text/plain; version=0.0.4; charset=utf-8"
+            else:
+                status, body, ctype = "404 Not Found", b"not found\n", "text/plain"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {ctype}\r\nContent-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,108 @@
+"""Summaries over the telemetry JSONL log (used by ``nanobot stats``)."""
+
+from __future__ import annotations
+
+import json
+import math
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Iterator
+
+
+def iter_events(log_path: Path, since: float | None = None) -> Iterator[dict[str, Any]]:
+    """Events from the log and its rotated backups, oldest first."""
+    backups = sorted(
+        (p for p in log_path.parent.glob(f"{log_path.name}.*") if p.suffix[1:].isdigit()),
+        key=lambda p: int(p.suffix[1:]), reverse=True,
+    )
+    for path in [*backups, log_path]:
+        if not path.exists():
+            continue
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if since is None or event.get("ts", 0) >= since:
+                    yield event
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of *values* (0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def summarize(events: Iterator[dict[str, Any]]) -> dict[str, Any]:
+    """Totals, latency percentiles and per-channel/session/tool breakdowns."""
+    tokens = defaultdict(int)
+    cost = 0.0
+    llm_latency: dict[str, list[float]] = defaultdict(list)
+    llm_errors = 0
+    turns = iterations = 0
+    by_channel: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    by_session: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    tools: dict[str, list[float]] = defaultdict(list)
+    tool_errors: dict[str, int] = defaultdict(int)
+    exec_cpu_ms: list[float] = []
+    exec_rss_kb: list[float] = []
+    exec_kills: dict[str, int] = defaultdict(int)
+
+    for e in events:
+        kind = e.get("type")
+        if kind == "llm":
+            llm_latency[e.get("model") or "?"].append(e.get("latency_ms", 0.0))
+            llm_errors += bool(e.get("error"))
+            for k in ("prompt_tokens", "completion_tokens", "cache_read_tokens", "cache_write_tokens"):
+                tokens[k] += e.get(k, 0)
+            cost += e.get("cost_usd", 0.0)
+            total = e.get("prompt_tokens", 0) + e.get("completion_tokens", 0)
+            for bucket, key in ((by_channel, e.get("channel")), (by_session, e.get("session"))):
+                if key:
+                    bucket[key]["tokens"] += total
+                    bucket[key]["cost_usd"] += e.get("cost_usd", 0.0)
+        elif kind == "turn":
+            turns += 1
+            iterations += e.get("iterations", 0)
+            for bucket, key in ((by_channel, e.get("channel")), (by_session, e.get("session"))):
+                if key:
+                    bucket[key]["turns"] += 1
+        elif kind == "tool":
+            tools[e.get("tool") or "?"].append(e.get("duration_ms", 0.0))
+            tool_errors[e.get("tool") or "?"] += not e.get("ok", True)
+        elif kind == "exec":
+            exec_cpu_ms.append(e.get("cpu_ms", 0.0))
+            if "max_rss_kb" in e:  # Absent for persistent-shell commands
+                exec_rss_kb.append(e["max_rss_kb"])
+            if limit := e.get("limit"):
+                exec_kills[limit] += 1
+
+    all_latency = [v for values in llm_latency.values() for v in values]
+    return {
+        "llm_calls": len(all_latency),
+        "llm_errors": llm_errors,
+        "turns": turns,
+        "avg_iterations": iterations / turns if turns else 0.0,
+        "tokens": dict(tokens),
+        "cost_usd": cost,
+        "latency_ms": {
+            model: {"p50": percentile(v, 50), "p95": percentile(v, 95), "p99": percentile(v, 99), "calls": len(v)}
+            for model, v in sorted(llm_latency.items())
+        } | ({"all": {"p50": percentile(all_latency, 50), "p95": percentile(all_latency, 95),
+                      "p99": percentile(all_latency, 99), "calls": len(all_latency)}} if all_latency else {}),
+        "by_channel": {k: dict(v) for k, v in by_channel.items()},
+        "by_session": {k: dict(v) for k, v in by_session.items()},
+        "tools": {
+            name: {"calls": len(v), "errors": tool_errors[name], "total_ms": sum(v), "p95_ms": percentile(v, 95)}
+            for name, v in sorted(tools.items(), key=lambda kv: -sum(kv[1]))
+        },
+        "exec": {
+            "commands": len(exec_cpu_ms),
+            "cpu_s": sum(exec_cpu_ms) / 1000,
+            "p95_max_rss_mb": percentile(exec_rss_kb, 95) / 1024,
+            "limit_kills": dict(exec_kills),
+        },
+    }
@@ -1,8 +1,11 @@
 """Utility functions for nanobot."""
 
+import json
+import math
 import re
 from datetime import datetime
 from pathlib import Path
+from typing import Any
 
 
 def ensure_dir(path: Path) -> Path:
@@ -27,6 +30,53 @@ def timestamp() -> str:
     return datetime.now().isoformat()
 
 
+def estimate_tokens(text: str, chars_per_token: float = 4.0) -> int:
+    """Cheap token estimate: ~chars_per_token ASCII characters per token, one token per other character."""
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return math.ceil(ascii_chars / chars_per_token) + (len(text) - ascii_chars)
+
+
+# Average English characters per token by model family (tokenizers differ by provider).
+_CHARS_PER_TOKEN = (
+    ("claude", 3.5),
+    ("anthropic", 3.5),
+    ("gemini", 4.0),
+    ("gpt", 4.0),
+    ("openai", 4.0),
+    ("deepseek", 3.6),
+    ("qwen", 3.6),
+    ("glm", 3.6),
+    ("kimi", 3.6),
+    ("moonshot", 3.6),
+    ("minimax", 3.6),
+    ("llama", 3.8),
+    ("mistral", 3.5),
+)
+
+
+def chars_per_token(model: str) -> float:
+    """Characters-per-token ratio for *model*'s tokenizer family (4.0 if unknown)."""
+    model = model.lower()
+    return next((ratio for name, ratio in _CHARS_PER_TOKEN if name in model), 4.0)
+
+
+def estimate_message_tokens(msg: dict[str, Any], chars_per_token: float = 4.0) -> int:
+    """Estimate the prompt tokens one chat message costs, including role/tool-call overhead."""
+    tokens = 4
+    content = msg.get("content")
+    if isinstance(content, str):
+        tokens += estimate_tokens(content, chars_per_token)
+    elif isinstance(content, list):
+        for part in content:
+            if isinstance(part, dict) and part.get("type") == "text":
+                tokens += estimate_tokens(part.get("text", ""), chars_per_token)
+            else:
+                tokens += 800  # Images and other media: rough flat cost
+    if msg.get("tool_calls"):
+        tokens += estimate_tokens(json.dumps(msg["tool_calls"], ensure_ascii=False), chars_per_token)
+    return tokens
+
+
 _UNSAFE_CHARS = re.compile(r'[<>:"/\\|?*]')
 
 def safe_filename(name: str) -> str:
@@ -0,0 +1,147 @@
+"""Shared, pooled HTTP clients and request rate limiting."""
+
+import asyncio
+import importlib.util
+import time
+import weakref
+from collections import defaultdict
+from typing import Any
+
+import httpx
+from loguru import logger
+
+DEFAULT_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0)
+DEFAULT_MAX_REDIRECTS = 5  # Followed only when a request opts into follow_redirects
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class _TracingTransport(httpx.AsyncHTTPTransport):
+    """Transport that records whether each request opened a new connection."""
+
+    def __init__(self, stats: dict[str, dict[str, int]], **kwargs: Any):
+        super().__init__(**kwargs)
+        self._stats = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        opened = False
+        outer = request.extensions.get("trace")
+
+        async def trace(name: str, info: dict[str, Any]) -> None:
+            nonlocal opened
+            if name.endswith("connect_tcp.started") or name.endswith("connect_unix_socket.started"):
+                opened = True
+            if outer:
+                await outer(name, info)
+
+        request.extensions = {**request.extensions, "trace": trace}
+        response = await super().handle_async_request(request)
+        host = self._stats[request.url.host]
+        host["requests"] += 1
+        host["new_connections" if opened else "reused"] += 1
+        if response.extensions.get("http_version") == b"HTTP/2":
+            host["http2"] += 1
+        return response
+
+
+class HttpClientPool:
+    """
+    Process-wide pool of ``httpx.AsyncClient`` instances.
+
+    One client is kept per (event loop, proxy, verify) combination, so every
+    caller with the same network settings shares keep-alive connections
+    instead of paying a TCP+TLS handshake per request.  HTTP/2 is used when
+    the ``h2`` package is installed.  Per-request options (timeouts, headers,
+    redirects) are passed on each call.
+    """
+
+    def __init__(self, limits: httpx.Limits = DEFAULT_LIMITS, http2: bool = HTTP2_AVAILABLE):
+        self.limits = limits
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self._clients: dict[tuple[int, str | None, bool], tuple[weakref.ref, httpx.AsyncClient]] = {}
+        self._stats: dict[str, dict[str, int]] = defaultdict(
+            lambda: {"requests": 0, "new_connections": 0, "reused": 0, "http2": 0}
+        )
+
+    def get(self, proxy: str | None = None, verify: bool = True) -> httpx.AsyncClient:
+        """Return the shared client for these settings on the running event loop."""
+        loop = asyncio.get_running_loop()
+        self._prune()
+        key = (id(loop), proxy, verify)
+        entry = self._clients.get(key)
+        if entry and entry[0]() is loop and not entry[1].is_closed:
+            return entry[1]
+        transport = _TracingTransport(
+            self._stats, proxy=proxy, verify=verify, http2=self.http2, limits=self.limits,
+        )
+        client = httpx.AsyncClient(transport=transport, max_redirects=DEFAULT_MAX_REDIRECTS)
+        self._clients[key] = (weakref.ref(loop), client)
+        return client
+
+    def _prune(self) -> None:
+        """Forget clients whose event loop is gone (their sockets died with it)."""
+        for key, (loop_ref, client) in list(self._clients.items()):
+            loop = loop_ref()
+            if loop is None or loop.is_closed() or client.is_closed:
+                del self._clients[key]
+
+    def get_stats(self) -> dict[str, dict[str, int]]:
+        """Per-host request counts and how many reused a pooled connection."""
+        return {host: dict(s) for host, s in self._stats.items()}
+
+    async def aclose(self) -> None:
+        """Close every client owned by the running event loop."""
+        loop = asyncio.get_running_loop()
+        for key, (loop_ref, client) in list(self._clients.items()):
+            if loop_ref() is loop:
+                del self._clients[key]
+                try:
+                    await client.aclose()
+                except Exception as e:
+                    logger.debug("Error closing HTTP client: {}", e)
+        self._prune()
+
+
+_pool = HttpClientPool()
+
+
+def get_http_pool() -> HttpClientPool:
+    """Return the process-wide HTTP client pool."""
+    return _pool
+
+
+async def close_http_pool() -> None:
+    """Close pooled clients on shutdown, logging connection reuse per host."""
+    stats = _pool.get_stats()
+    if stats:
+        summary = ", ".join(f"{h}: {s['reused']}/{s['requests']} reused" for h, s in sorted(stats.items()))
+        logger.info("HTTP pool: {}", summary)
+    await _pool.aclose()
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter for calls to a metered API.
+
+    ``rate`` tokens are added per second up to ``burst``; acquire() waits
+    until a token is available.  A rate of 0 disables limiting.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+from nanobot.providers.litellm_provider import LiteLLMProvider
+
+
+def _marked(messages, tools=None) -> list[int]:
+    out = [i for i, m in enumerate(messages)
+           if isinstance(m.get("content"), list) and "cache_control" in m["content"][-1]]
+    if tools and "cache_control" in tools[-1]:
+        out.append(-1)
+    return out
+
+
+def _conversation() -> list[dict]:
+    return [
+        {"role": "system", "content": "You are nanobot."},
+        {"role": "user", "content": "earlier question"},
+        {"role": "assistant", "content": "earlier answer"},
+        {"role": "user", "content": "run ls"},
+        {"role": "assistant", "content": None, "tool_calls": [{"id": "c1", "type": "function",
+                                                                "function": {"name": "exec", "arguments": "{}"}}]},
+        {"role": "tool", "tool_call_id": "c1", "name": "exec", "content": "a.txt"},
+    ]
+
+
+def test_rolling_breakpoints_on_history() -> None:
+    provider = LiteLLMProvider(default_model="anthropic/claude-opus-4-5")
+    tools = [{"type": "function", "function": {"name": "exec"}}]
+    messages, new_tools = provider._apply_cache_control(_conversation(), tools)
+
+    # System, tools, the current turn's user message and the newest message.
+    assert _marked(messages, new_tools) == [0, 3, 5, -1]
+    assert messages[5]["content"][0]["text"] == "a.txt"
+    # Inputs are not mutated.
+    assert _conversation()[5]["content"] == "a.txt" and "cache_control" not in tools[-1]
+
+
+def test_breakpoint_limit_and_unmarkable_messages() -> None:
+    provider = LiteLLMProvider(default_model="anthropic/claude-opus-4-5")
+    conversation = _conversation()[:5]  # Ends with an assistant tool_call without text
+    tools = [{"type": "function", "function": {"name": "exec"}}]
+
+    messages, new_tools = provider._apply_cache_control(conversation, tools)
+    assert _marked(messages, new_tools) == [0, 3, -1]
+
+    messages, new_tools = provider._apply_cache_control(_conversation(), tools, max_breakpoints=3)
+    assert _marked(messages, new_tools) == [0, 5, -1]
+
+
+def test_cache_usage_is_reported() -> None:
+    message = SimpleNamespace(content="ok", tool_calls=None)
+    usage = SimpleNamespace(prompt_tokens=1200, completion_tokens=10, total_tokens=1210,
+                            cache_read_input_tokens=1000, cache_creation_input_tokens=150)
+    response = SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")], usage=usage)
+
+    parsed = LiteLLMProvider(default_model="anthropic/claude-opus-4-5")._parse_response(response)
+    assert parsed.usage["cache_read_tokens"] == 1000 and parsed.usage["cache_write_tokens"] == 150
+
+    usage = SimpleNamespace(prompt_tokens=50, completion_tokens=5, total_tokens=55,
+                            prompt_tokens_details=SimpleNamespace(cached_tokens=32))
+    response.usage = usage
+    parsed = LiteLLMProvider(default_model="gpt-4o")._parse_response(response)
+    assert parsed.usage["cache_read_tokens"] == 32 and "cache_write_tokens" not in parsed.usage
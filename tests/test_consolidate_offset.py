@@ -724,6 +724,41 @@ class TestConsolidationDeduplicationGuard:
             "Session must remain intact when /new archival fails"
         )
 
+    @pytest.mark.asyncio
+    async def test_new_retry_skips_chunks_archived_before_failure(self, tmp_path: Path) -> None:
+        """A failed /new keeps the archived prefix so the retry does not repeat it."""
+        from nanobot.agent.loop import AgentLoop
+        from nanobot.bus.events import InboundMessage
+        from nanobot.bus.queue import MessageBus
+
+        bus = MessageBus()
+        provider = MagicMock()
+        provider.get_default_model.return_value = "test-model"
+        loop = AgentLoop(
+            bus=bus, provider=provider, workspace=tmp_path, model="test-model", memory_window=10
+        )
+
+        session = loop.sessions.get_or_create("cli:test")
+        for i in range(5):
+            session.add_message("user", f"msg{i}")
+            session.add_message("assistant", f"resp{i}")
+        loop.sessions.save(session)
+        archived: list[list[str]] = []
+
+        async def _partial_consolidate(sess, archive_all: bool = False) -> bool:
+            archived.append([m["content"] for m in sess.messages])
+            sess.last_consolidated = 4
+            return len(archived) > 1
+
+        loop._consolidate_memory = _partial_consolidate  # type: ignore[method-assign]
+
+        new_msg = InboundMessage(channel="cli", sender_id="user", chat_id="test", content="/new")
+        assert "failed" in (await loop._process_message(new_msg)).content.lower()
+        assert loop.sessions.get_or_create("cli:test").last_consolidated == 4
+
+        assert "new session started" in (await loop._process_message(new_msg)).content.lower()
+        assert archived[1] == archived[0][4:]
+
     @pytest.mark.asyncio
     async def test_new_archives_only_unconsolidated_messages_after_inflight_task(
         self, tmp_path: Path
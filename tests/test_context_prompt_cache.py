@@ -64,3 +64,41 @@ def test_runtime_context_is_separate_untrusted_user_message(tmp_path) -> None:
 
     assert messages[-1]["role"] == "user"
     assert messages[-1]["content"] == "Return exactly: OK"
+
+
+def test_system_prompt_is_cached_until_inputs_change(tmp_path, monkeypatch) -> None:
+    """Unchanged inputs reuse the cached prompt; edits to any input rebuild it."""
+    workspace = _make_workspace(tmp_path)
+    builder = ContextBuilder(workspace)
+    renders = 0
+    original = builder._render_system_prompt
+
+    def counting_render() -> str:
+        nonlocal renders
+        renders += 1
+        return original()
+
+    monkeypatch.setattr(builder, "_render_system_prompt", counting_render)
+
+    first = builder.build_system_prompt()
+    assert builder.build_system_prompt() is first
+    assert renders == 1
+
+    (workspace / "SOUL.md").write_text("Be kind.", encoding="utf-8")
+    assert "Be kind." in builder.build_system_prompt()
+    assert renders == 2
+
+    builder.memory.write_long_term("User likes tea.")
+    assert "User likes tea." in builder.build_system_prompt()
+    assert renders == 3
+
+    skill_dir = workspace / "skills" / "brew"
+    skill_dir.mkdir(parents=True)
+    (skill_dir / "SKILL.md").write_text("---\ndescription: Brew tea\n---\nSteep.", encoding="utf-8")
+    assert "Brew tea" in builder.build_system_prompt()
+    assert renders == 4
+
+    (skill_dir / "SKILL.md").write_text("---\ndescription: Brew coffee\n---\nSteep.", encoding="utf-8")
+    assert "Brew coffee" in builder.build_system_prompt()
+    assert builder.build_system_prompt()
+    assert renders == 5
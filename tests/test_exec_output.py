@@ -0,0 +1,102 @@
+import asyncio
+import time
+from pathlib import Path
+
+import pytest
+
+from nanobot.agent.tools.shell import ExecTool
+from nanobot.agent.tools.shell_output import OutputCapture, read_until
+from nanobot.agent.tools.shell_session import ShellSessionPool
+
+
+def _running(pid: int) -> bool:
+    try:
+        state = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()[0]
+    except FileNotFoundError:
+        return False
+    return state != "Z"  # A killed orphan may linger as a zombie until reaped
+
+
+def test_capture_keeps_head_and_tail() -> None:
+    capture = OutputCapture(head_bytes=4, tail_bytes=3)
+    for chunk in (b"ab", b"cdef", b"ghijk"):
+        capture.feed(chunk)
+
+    assert capture.total == 11 and capture.dropped == 4
+    assert capture.getvalue() == b"abcd\n... (4 bytes omitted) ...\nijk"
+    assert capture.last_text(5) == "cdijk"  # Dropped bytes are gone for good
+    assert len(capture.head) + len(capture.tail) == 7
+
+
+@pytest.mark.asyncio
+async def test_read_until_splits_marker_across_chunks() -> None:
+    stream = asyncio.StreamReader()
+    for chunk in (b"out", b"put\n__EN", b"D__:0:/tmp", b"\nleftover"):
+        stream.feed_data(chunk)
+    capture = OutputCapture(head_bytes=2, tail_bytes=2)
+
+    assert await read_until(stream, b"\n__END__:", capture) == b"0:/tmp"
+    assert capture.getvalue() == b"ou\n... (2 bytes omitted) ...\nut"
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not Path("/proc/self/stat").exists(), reason="needs procfs")
+async def test_runaway_output_is_capped_and_killed(tmp_path) -> None:
+    tool = ExecTool(working_dir=str(tmp_path), timeout=30, max_output_bytes=1_000_000)
+    pidfile = tmp_path / "child.pid"
+
+    started = time.monotonic()
+    out = await tool.execute(f"(sleep 60 & echo $! > {pidfile}; yes)")
+    assert time.monotonic() - started < 10
+    assert out.startswith("y\ny\n") and "bytes omitted" in out
+    assert "output exceeded 1000000 bytes; command killed" in out
+    assert len(out) < 10_000
+
+    # The background child shared the command's process group, so it died too.
+    await asyncio.sleep(0.1)
+    assert not _running(int(pidfile.read_text()))
+
+
+@pytest.mark.asyncio
+async def test_timeout_keeps_partial_output(tmp_path) -> None:
+    tool = ExecTool(working_dir=str(tmp_path), timeout=0.5)
+
+    out = await tool.execute("echo started; sleep 10")
+    assert out.startswith("Error: Command timed out after 0.5 seconds")
+    assert out.endswith("Partial output:\nstarted\n")
+    assert await tool.execute("sleep 10") == "Error: Command timed out after 0.5 seconds"
+
+
+@pytest.mark.asyncio
+async def test_progress_streams_partial_output(tmp_path) -> None:
+    tool = ExecTool(working_dir=str(tmp_path), progress_interval=0.05)
+    updates: list[str] = []
+
+    async def progress(text: str) -> None:
+        updates.append(text)
+
+    tool.set_progress(progress)
+    out = await tool.execute("for i in 1 2 3 4; do echo step $i; sleep 0.1; done")
+
+    assert out.split("\n")[-2] == "step 4"
+    assert 0 < len(updates) < 5
+    assert all(u.startswith("step 1\n") for u in updates)
+
+    tool.set_progress(None)
+    updates.clear()
+    await tool.execute("echo a; sleep 0.1; echo b")
+    assert updates == []
+
+
+@pytest.mark.asyncio
+async def test_persistent_shell_is_capped_and_restarted(tmp_path) -> None:
+    tool = ExecTool(
+        working_dir=str(tmp_path), timeout=30, max_output_bytes=200_000, shell_pool=ShellSessionPool(),
+    )
+    try:
+        await tool.execute("export KEEP=1")
+        out = await tool.execute("yes")
+        assert "command killed and shell restarted" in out and "bytes omitted" in out
+        assert (await tool.execute("echo ${KEEP:-gone}")).strip() == "gone"
+    finally:
+        await tool.shell_pool.close_all()
@@ -0,0 +1,127 @@
+import asyncio
+import time
+
+import pytest
+
+from nanobot.agent.tools.shell import ExecTool
+from nanobot.agent.tools.shell_session import ShellSessionPool
+
+
+def _tool(tmp_path, **kwargs) -> ExecTool:
+    return ExecTool(working_dir=str(tmp_path), shell_pool=ShellSessionPool(**kwargs), **{"timeout": 5})
+
+
+@pytest.mark.asyncio
+async def test_state_persists_between_commands(tmp_path) -> None:
+    (tmp_path / "sub").mkdir()
+    tool = _tool(tmp_path)
+    try:
+        assert await tool.execute("cd sub && export GREETING=hi") == "(no output)"
+        assert (await tool.execute("pwd; echo $GREETING")).split() == [str(tmp_path / "sub"), "hi"]
+
+        out = await tool.execute("printf partial; echo oops >&2; false")
+        assert out.startswith("partial\nSTDERR:\noops") and "Exit code: 1" in out
+        # Commands read from /dev/null, so they cannot swallow the framing.
+        assert await tool.execute("cat") == "(no output)"
+        assert "Exit code: 2" in await tool.execute("if then")
+    finally:
+        await tool.shell_pool.close_all()
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_isolated_per_conversation(tmp_path) -> None:
+    tool = _tool(tmp_path)
+    try:
+        tool.set_context("telegram", "1")
+        await tool.execute("export WHO=one")
+
+        async def other() -> str:
+            tool.set_context("telegram", "2")
+            return await tool.execute("echo ${WHO:-unset}")
+
+        assert (await asyncio.create_task(other())).strip() == "unset"
+        assert (await tool.execute("echo $WHO")).strip() == "one"
+        assert len(tool.shell_pool) == 2
+    finally:
+        await tool.shell_pool.close_all()
+
+
+@pytest.mark.asyncio
+async def test_timeout_and_exit_restart_the_shell(tmp_path) -> None:
+    tool = _tool(tmp_path)
+    tool.timeout = 0.5
+    try:
+        await tool.execute("export KEEP=1; cd /tmp")
+        out = await tool.execute("sleep 10")
+        assert out.startswith("Error: Command timed out")
+        assert (await tool.execute("echo ${KEEP:-gone}; pwd")).split() == ["gone", "/tmp"]
+
+        assert "shell exited" in await tool.execute("exit 3")
+        assert (await tool.execute("echo back")).strip() == "back"
+    finally:
+        await tool.shell_pool.close_all()
+
+
+@pytest.mark.asyncio
+async def test_guard_is_anchored_to_the_workspace(tmp_path) -> None:
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "notes.txt").write_text("kept")
+    tool = _tool(tmp_path)
+    tool.restrict_to_workspace = True
+    try:
+        await tool.execute("cd sub")
+        # Still inside the workspace: its files stay reachable, outside paths do not.
+        assert (await tool.execute(f"cat {tmp_path}/notes.txt")).startswith("kept")
+        assert "blocked" in await tool.execute("cat /etc/hostname")
+        assert "blocked" in await tool.execute("rm -rf .")
+        assert "blocked" in await tool.execute("pwd", working_dir="/tmp")
+
+        # A bare `cd` leaves the workspace; the next command is pulled back to its root.
+        await tool.execute("cd")
+        out = await tool.execute("pwd")
+        assert out.startswith(f"{tmp_path}\n") and "shell had left the workspace" in out
+    finally:
+        await tool.shell_pool.close_all()
+
+
+@pytest.mark.asyncio
+async def test_idle_and_excess_shells_are_reaped(tmp_path) -> None:
+    pool = ShellSessionPool(max_sessions=2, idle_timeout=60)
+    try:
+        for key in ("a", "b", "c"):
+            async with pool.session(key, str(tmp_path), {}) as session:
+                await session.run("true", timeout=5)
+        assert len(pool) == 2 and "a" not in pool._sessions
+
+        pool._sessions["b"].last_used = time.monotonic() - 120
+        await pool.reap()
+        assert list(pool._sessions) == ["c"]
+    finally:
+        await pool.close_all()
+
+
+@pytest.mark.asyncio
+async def test_sessions_in_use_are_not_evicted(tmp_path) -> None:
+    pool = ShellSessionPool(max_sessions=1, idle_timeout=0)
+    try:
+        async with pool.session("a", str(tmp_path), {}) as first:
+            await first.run("true", timeout=5)
+            # Waiting for "a" while it is busy also marks it as in use.
+            waiter = asyncio.create_task(_run_in(pool, "a", tmp_path))
+            await asyncio.sleep(0.05)
+            async with pool.session("b", str(tmp_path), {}) as second:
+                await second.run("true", timeout=5)
+            assert first.alive and "a" in pool._sessions
+        assert (await waiter).strip() == "a"
+        assert len(pool) == 2  # Over the cap only while every session was busy
+
+        async with pool.session("c", str(tmp_path), {}):
+            pass
+        assert list(pool._sessions) == ["c"]
+    finally:
+        await pool.close_all()
+
+
+async def _run_in(pool: ShellSessionPool, key: str, tmp_path) -> str:
+    async with pool.session(key, str(tmp_path), {}) as session:
+        return (await session.run(f"echo {key}", timeout=5)).stdout.decode()
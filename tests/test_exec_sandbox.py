@@ -0,0 +1,126 @@
+import sys
+import tempfile
+from unittest.mock import MagicMock
+
+import pytest
+
+from nanobot.agent.subagent import SubagentManager
+from nanobot.agent.tools.sandbox import CgroupSlice, SandboxProfile
+from nanobot.agent.tools.shell import ExecTool
+from nanobot.agent.tools.shell_session import ShellSessionPool
+from nanobot.bus.queue import MessageBus
+from nanobot.config.schema import ExecToolConfig, SandboxConfig
+from nanobot.telemetry import Telemetry
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="rlimits are POSIX-only")
+
+
+def test_tighten_takes_the_stricter_limit() -> None:
+    base = SandboxProfile(cpu_seconds=60, memory_mb=1024, cgroup_parent="/sys/fs/cgroup/nanobot")
+    strict = base.tighten(SandboxProfile(cpu_seconds=10, memory_mb=4096, max_processes=32))
+
+    assert (strict.cpu_seconds, strict.memory_mb, strict.max_processes) == (10, 1024, 32)
+    assert strict.cgroup_parent == "/sys/fs/cgroup/nanobot"
+    assert base.tighten(None) is base
+    assert strict.rlimits() == {"RLIMIT_CPU": 10, "RLIMIT_AS": 1024 * 1024 * 1024, "RLIMIT_NPROC": 32}
+
+
+@pytest.mark.asyncio
+async def test_usage_is_reported_and_recorded(tmp_path, monkeypatch) -> None:
+    usage_dir = tmp_path / "tmp"
+    usage_dir.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(usage_dir))
+    telemetry = Telemetry()
+    tool = ExecTool(working_dir=str(tmp_path), sandbox=SandboxProfile(file_size_mb=4), telemetry=telemetry)
+
+    out = await tool.execute(f"{sys.executable} -c 'x = bytearray(64 * 1024 * 1024); print(len(x))'")
+    assert out.startswith("67108864\n")
+    rss_mb = float(out.split("max RSS ")[1].split(" MB")[0])
+    assert rss_mb >= 64
+
+    out = await tool.execute("head -c 8000000 /dev/zero > big")
+    assert out.endswith("(killed: file size limit exceeded)")
+    assert (tmp_path / "big").stat().st_size == 4 * 1024 * 1024
+
+    metrics = telemetry.render_prometheus()
+    assert 'nanobot_exec_limit_kills_total{limit="file size"} 1' in metrics
+    assert "nanobot_exec_max_rss_bytes_count 2" in metrics
+    assert 'nanobot_exec_max_rss_bytes_bucket{le="67108864"} 1' in metrics
+    assert not list(usage_dir.iterdir())  # Usage reports are cleaned up
+
+
+@pytest.mark.asyncio
+async def test_cpu_limit_kills_the_command(tmp_path) -> None:
+    tool = ExecTool(working_dir=str(tmp_path), timeout=20, sandbox=SandboxProfile(cpu_seconds=1))
+
+    out = await tool.execute("while :; do :; done")
+    assert "Exit code: 152" in out and out.endswith("(killed: CPU time limit exceeded)")
+
+
+@pytest.mark.asyncio
+async def test_persistent_shell_runs_under_the_profile(tmp_path) -> None:
+    pool = ShellSessionPool(sandbox=SandboxProfile(cpu_seconds=30, open_files=64))
+    tool = ExecTool(working_dir=str(tmp_path), shell_pool=pool)
+    try:
+        out = await tool.execute("export X=1; ulimit -St; ulimit -n")
+        assert out.split("\n")[:2] == ["30", "64"]
+        assert "max RSS is not tracked in persistent shells" in out
+        assert (await tool.execute("echo $X")).startswith("1\n")
+    finally:
+        await pool.close_all()
+
+
+@pytest.mark.asyncio
+async def test_persistent_shell_reports_cpu_per_command(tmp_path) -> None:
+    telemetry = Telemetry()
+    pool = ShellSessionPool(sandbox=SandboxProfile(cpu_seconds=1))
+    tool = ExecTool(working_dir=str(tmp_path), timeout=20, shell_pool=pool, telemetry=telemetry)
+    try:
+        busy = await tool.execute(f"{sys.executable} -c 'import time\nwhile time.process_time() < 0.5: pass'")
+        assert float(busy.split("cpu ")[1].split("s")[0]) >= 0.4
+        idle = await tool.execute("true")
+        assert float(idle.split("cpu ")[1].split("s")[0]) < 0.1  # Only this command, not the shell's total
+
+        out = await tool.execute("sh -c 'while :; do :; done'")
+        assert "Exit code: 152" in out and out.endswith("(killed: CPU time limit exceeded)")
+    finally:
+        await pool.close_all()
+
+    metrics = telemetry.render_prometheus()
+    assert 'nanobot_exec_limit_kills_total{limit="CPU time"} 1' in metrics
+    assert "nanobot_exec_max_rss_bytes" not in metrics
+
+
+def test_cgroup_slice_writes_limits_and_reads_usage(tmp_path) -> None:
+    profile = SandboxProfile(memory_mb=256, max_processes=64, cpu_quota=0.5, cgroup_parent=str(tmp_path))
+    cgroup = CgroupSlice.create(profile)
+
+    assert cgroup is not None and cgroup.path.parent == tmp_path
+    assert (cgroup.path / "memory.max").read_text() == str(256 * 1024 * 1024)
+    assert (cgroup.path / "pids.max").read_text() == "64"
+    assert (cgroup.path / "cpu.max").read_text() == "50000 100000"
+
+    (cgroup.path / "cpu.stat").write_text("usage_usec 1500000\nuser_usec 1000000\n")
+    (cgroup.path / "memory.peak").write_text("123456\n")
+    (cgroup.path / "memory.events").write_text("low 0\noom 1\noom_kill 1\n")
+    assert cgroup.usage() == {"cpu_s": 1.5, "max_rss_bytes": 123456, "oom_kills": 1}
+
+    assert CgroupSlice.create(SandboxProfile(cgroup_parent=str(tmp_path / "missing"))) is None
+    assert CgroupSlice.create(SandboxProfile()) is None
+
+
+def test_subagents_get_the_stricter_profile(tmp_path) -> None:
+    provider = MagicMock()
+    provider.get_default_model.return_value = "test-model"
+    config = ExecToolConfig(
+        sandbox=SandboxConfig(enabled=True, cpu_seconds=120, memory_mb=2048),
+        subagent_sandbox=SandboxConfig(enabled=True, cpu_seconds=30, max_processes=16),
+    )
+
+    mgr = SubagentManager(provider=provider, workspace=tmp_path, bus=MessageBus(), exec_config=config)
+    assert mgr.sandbox == SandboxProfile(cpu_seconds=30, memory_mb=2048, max_processes=16)
+
+    only_sub = ExecToolConfig(subagent_sandbox=SandboxConfig(enabled=True, cpu_seconds=30))
+    mgr = SubagentManager(provider=provider, workspace=tmp_path, bus=MessageBus(), exec_config=only_sub)
+    assert mgr.sandbox == SandboxProfile(cpu_seconds=30)
+    assert SubagentManager(provider=provider, workspace=tmp_path, bus=MessageBus()).sandbox is None
@@ -0,0 +1,51 @@
+from nanobot.session.manager import Session
+from nanobot.utils.helpers import chars_per_token, estimate_message_tokens, estimate_tokens
+
+
+def _session() -> Session:
+    session = Session(key="cli:test")
+    for i in range(5):
+        session.add_message("user", f"question {i} " + "x" * 400)
+        session.add_message(
+            "assistant", "", tool_calls=[{"id": f"c{i}", "type": "function",
+                                         "function": {"name": "exec", "arguments": "{}"}}],
+        )
+        session.add_message("tool", "y" * 400, tool_call_id=f"c{i}", name="exec")
+        session.add_message("assistant", f"answer {i}")
+    return session
+
+
+def test_estimates_follow_tokenizer_family() -> None:
+    assert estimate_tokens("hello world!") == 3
+    assert estimate_tokens("x" * 35, chars_per_token("anthropic/claude-opus-4-5")) == 10
+    assert chars_per_token("some/unknown-model") == 4.0
+    assert estimate_message_tokens({"role": "user", "content": [{"type": "image_url"}]}) > 100
+
+
+def test_budget_drops_oldest_whole_turns() -> None:
+    session = _session()
+    full = session.get_history()
+    turn = sum(estimate_message_tokens(m) for m in full[:4])
+
+    history = session.get_history(max_tokens=turn * 2 + 10)
+    assert len(history) == 8
+    assert history[0]["content"].startswith("question 3")
+    # Every tool result still follows its assistant tool_call.
+    ids = [tc["id"] for m in history if m.get("tool_calls") for tc in m["tool_calls"]]
+    assert [m["tool_call_id"] for m in history if m["role"] == "tool"] == ids
+
+    assert session.get_history(max_tokens=10) == []
+    assert session.get_history(max_tokens=10**6) == full
+
+
+def test_sizes_are_cached_per_message() -> None:
+    session = _session()
+    session.get_history(max_tokens=10**6)
+    assert len(session._token_sizes) == 20
+
+    session.add_message("user", "one more")
+    session.get_history(max_tokens=10**6)
+    assert len(session._token_sizes) == 21
+
+    session.get_history(max_tokens=10**6, chars_per_token=3.5)
+    assert session._token_ratio == 3.5 and len(session._token_sizes) == 21
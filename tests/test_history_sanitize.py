@@ -0,0 +1,116 @@
+import random
+import time
+
+import pytest
+
+from nanobot.session.manager import Session
+
+
+def _reference_history(session: Session, max_messages: int) -> list[dict]:
+    """The original quadratic get_history, kept verbatim as the behavioural reference."""
+    unconsolidated = session.messages[session.last_consolidated:]
+    sliced = unconsolidated[-max_messages:]
+    for i, m in enumerate(sliced):
+        if m.get("role") == "user":
+            sliced = sliced[i:]
+            break
+    out = []
+    for m in sliced:
+        entry = {"role": m["role"], "content": m.get("content", "")}
+        for k in ("tool_calls", "tool_call_id", "name"):
+            if k in m:
+                entry[k] = m[k]
+        out.append(entry)
+    while out:
+        first = out[0]
+        if first["role"] == "tool":
+            out.pop(0)
+        elif first["role"] == "assistant" and first.get("tool_calls"):
+            expected = {tc.get("id") for tc in first["tool_calls"] if tc.get("id")}
+            found = {m.get("tool_call_id") for m in out[1:] if m["role"] == "tool" and m.get("tool_call_id")}
+            if not expected.issubset(found):
+                out.pop(0)
+            else:
+                break
+        else:
+            break
+    while out:
+        last = out[-1]
+        if last["role"] == "assistant" and last.get("tool_calls"):
+            expected = {tc.get("id") for tc in last["tool_calls"] if tc.get("id")}
+            following = {m.get("tool_call_id") for m in out[out.index(last) + 1:]
+                         if m["role"] == "tool" and m.get("tool_call_id")}
+            if not expected.issubset(following):
+                out.pop()
+            else:
+                break
+        else:
+            break
+    return out
+
+
+def _random_session(rng: random.Random) -> Session:
+    session = Session(key="prop:test")
+    next_id = 0
+    for n in range(rng.randint(0, 40)):
+        role = rng.choice(["user", "assistant", "assistant", "tool", "tool"])
+        if role == "assistant" and rng.random() < 0.6:
+            calls = []
+            for _ in range(rng.randint(1, 3)):
+                # Ids may be missing, fresh, or reuse an earlier one.
+                call_id = rng.choice([None, f"c{next_id}", f"c{rng.randint(0, next_id)}"])
+                next_id += 1
+                calls.append({"id": call_id, "type": "function", "function": {"name": "exec", "arguments": "{}"}})
+            session.add_message(role, f"m{n}", tool_calls=calls)
+        elif role == "tool":
+            call_id = rng.choice([None, f"c{rng.randint(0, next_id)}"])
+            session.add_message(role, f"m{n}", tool_call_id=call_id, name="exec")
+        else:
+            session.add_message(role, f"m{n}")
+    session.last_consolidated = rng.randint(0, len(session.messages))
+    return session
+
+
+@pytest.mark.parametrize("seed", range(400))
+def test_matches_reference_semantics(seed: int) -> None:
+    rng = random.Random(seed)
+    session = _random_session(rng)
+    for max_messages in (0, 1, 3, 10, 500):
+        assert session.get_history(max_messages=max_messages) == _reference_history(session, max_messages)
+
+
+def test_zero_window_means_no_cap_and_negative_is_rejected() -> None:
+    session = Session(key="cli:test")
+    for i in range(5):
+        session.add_message("user", f"u{i}")
+    assert len(session.get_history(max_messages=0)) == 5
+    with pytest.raises(ValueError):
+        session.get_history(max_messages=-1)
+
+
+def test_cache_invalidated_on_append_and_consolidation() -> None:
+    session = Session(key="cli:test")
+    session.add_message("user", "hi")
+    session.add_message("assistant", "hello")
+    first = session.get_history()
+    assert session.get_history() == first and session.get_history() is not first
+
+    session.messages.append({"role": "user", "content": "again"})
+    assert [m["content"] for m in session.get_history()] == ["hi", "hello", "again"]
+
+    session.last_consolidated = 2
+    assert [m["content"] for m in session.get_history()] == ["again"]
+
+    session.clear()
+    assert session.get_history() == []
+
+
+def test_linear_on_long_tool_chains() -> None:
+    session = Session(key="cli:long")
+    # No user message: every leading assistant tool_call must be checked.
+    for i in range(20_000):
+        session.add_message("assistant", "", tool_calls=[{"id": f"c{i}", "type": "function",
+                                                          "function": {"name": "exec", "arguments": "{}"}}])
+    t0 = time.perf_counter()
+    assert session.get_history(max_messages=20_000) == []
+    assert time.perf_counter() - t0 < 1.0
@@ -0,0 +1,62 @@
+import pytest
+
+from nanobot.agent.memory import MemoryStore
+from nanobot.agent.tools.history import HistorySearchTool
+
+
+def _store(tmp_path) -> MemoryStore:
+    store = MemoryStore(tmp_path)
+    store.append_history("[2025-12-30 09:00] Planned the database migration to Postgres with Alice.")
+    store.append_history("[2026-01-05 14:30] Discussed the quarterly budget and the Postgres hosting costs.")
+    store.append_history("[2026-01-20 18:00] User booked flights to Lisbon for the conference.")
+    return store
+
+
+def test_append_history_indexes_incrementally(tmp_path) -> None:
+    store = _store(tmp_path)
+    index = store.history_index
+
+    assert index.sync() == 0  # already indexed by append_history
+    hits = index.search("postgres")
+    assert [h["timestamp"] for h in hits] and len(hits) == 2
+
+    # Entries written by other means are picked up on the next sync.
+    with open(store.history_file, "a", encoding="utf-8") as f:
+        f.write("[2026-02-01 10:00] Postgres upgrade finished.\n\n")
+    assert index.sync() == 1
+    assert len(index.search("postgres")) == 3
+
+
+def test_search_ranking_fallback_and_dates(tmp_path) -> None:
+    index = _store(tmp_path).history_index
+
+    assert index.search("postgres alice")[0]["timestamp"] == "2025-12-30 09:00"
+    # No entry has both words, so any-word matches are returned.
+    assert {h["timestamp"] for h in index.search("lisbon alice")} == {"2025-12-30 09:00", "2026-01-20 18:00"}
+    assert [h["timestamp"] for h in index.search("postgres", since="2026-01-01")] == ["2026-01-05 14:30"]
+    assert [h["timestamp"] for h in index.search("postgres", until="2025-12-30")] == ["2025-12-30 09:00"]
+    assert index.search("!!!") == []
+
+
+def test_rebuilds_when_history_rewritten(tmp_path) -> None:
+    store = _store(tmp_path)
+    store.history_file.write_text("[2026-03-01 08:00] Fresh start.\n\n", encoding="utf-8")
+
+    assert store.history_index.search("postgres") == []
+    assert len(store.history_index.search("fresh")) == 1
+
+    # A same-length (or longer) rewrite is caught by the content fingerprint, not the size.
+    text = store.history_file.read_text(encoding="utf-8")
+    store.history_file.write_text(text.replace("Fresh start", "Clean slate") + "[2026-03-02] More.\n\n")
+    assert store.history_index.search("fresh") == []
+    assert len(store.history_index.search("clean slate")) == 1
+
+
+@pytest.mark.asyncio
+async def test_search_history_tool(tmp_path) -> None:
+    tool = HistorySearchTool(_store(tmp_path).history_index)
+
+    out = await tool.execute(query="flights", since="2026-01-01")
+    assert out.startswith("1 matching entries") and "Lisbon" in out
+    assert "No history entries" in await tool.execute(query="flights", until="2025-01-01")
+    assert (await tool.execute(query="x", since="yesterday")).startswith("Error")
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from nanobot.utils.http import HttpClientPool
+
+
+async def _serve_keepalive():
+    """Minimal HTTP/1.1 server that keeps connections open between requests."""
+    connections = 0
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        nonlocal connections
+        connections += 1
+        try:
+            while await reader.readuntil(b"\r\n\r\n"):
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nContent-Type: text/plain\r\n\r\nok")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, port, lambda: connections
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_client_per_settings() -> None:
+    pool = HttpClientPool()
+    try:
+        assert pool.get() is pool.get()
+        assert pool.get(proxy="http://127.0.0.1:9") is not pool.get()
+        assert pool.get(verify=False) is not pool.get()
+    finally:
+        await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_pool_keeps_connections_alive_and_counts_reuse() -> None:
+    server, port, connections = await _serve_keepalive()
+    pool = HttpClientPool()
+    try:
+        for _ in range(3):
+            r = await pool.get().get(f"http://127.0.0.1:{port}/", timeout=5.0)
+            assert r.text == "ok"
+        assert connections() == 1
+        assert pool.get_stats()["127.0.0.1"] == {
+            "requests": 3, "new_connections": 1, "reused": 2, "http2": 0,
+        }
+    finally:
+        await pool.aclose()
+        server.close()
+        await server.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_pool_aclose_replaces_closed_client() -> None:
+    pool = HttpClientPool()
+    client = pool.get()
+    await pool.aclose()
+    assert client.is_closed
+    fresh = pool.get()
+    assert fresh is not client and not fresh.is_closed
+    await pool.aclose()
@@ -0,0 +1,185 @@
+import asyncio
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from loguru import logger
+
+from nanobot.agent.memory import MemoryDocument, MemoryStore
+from nanobot.providers.base import LLMResponse, ToolCallRequest
+
+TEMPLATE = """# Long-term Memory
+
+Intro text.
+
+## User Information
+
+(Important facts about the user)
+
+## Preferences
+
+- Likes tea
+
+---
+
+*Footer.*
+"""
+
+
+def _response(changes, entry="[2026-01-01 00:00] Talked.", usage=None):
+    return LLMResponse(
+        content=None,
+        tool_calls=[ToolCallRequest(id="c", name="save_memory",
+                                    arguments={"history_entry": entry, "memory_changes": changes})],
+        usage=usage or {"prompt_tokens": 100, "completion_tokens": 10},
+    )
+
+
+def test_document_round_trip_and_apply() -> None:
+    doc = MemoryDocument.parse(TEMPLATE)
+    assert doc.render() == TEMPLATE
+
+    applied = doc.apply([
+        {"op": "add", "section": "User Information", "fact": "Name is Sam"},
+        {"op": "add", "section": "user information", "fact": "Name is Sam"},  # duplicate
+        {"op": "update", "section": "Preferences", "old": "Likes tea", "fact": "Likes coffee"},
+        {"op": "add", "section": "Projects", "fact": "Builds nanobot"},
+        {"op": "delete", "section": "Wrong Section", "old": "Builds nanobot"},
+        {"op": "delete", "section": "Preferences", "old": "not present"},
+    ])
+    text = doc.render()
+
+    assert applied == 4
+    assert "(Important facts about the user)" not in text
+    assert "- Name is Sam" in text and text.count("Name is Sam") == 1
+    assert "- Likes coffee" in text and "tea" not in text
+    assert "## Projects" in text and "Builds nanobot" not in text
+    assert text.index("## Projects") < text.index("---") and text.endswith("*Footer.*\n")
+    assert "Intro text." in text
+
+
+@pytest.mark.asyncio
+async def test_consolidation_chunks_and_reports_tokens(tmp_path: Path) -> None:
+    store = MemoryStore(tmp_path)
+    store.write_long_term(TEMPLATE)
+    provider = AsyncMock()
+    provider.chat = AsyncMock(side_effect=[
+        _response([{"op": "add", "section": "User Information", "fact": "Uses Linux"}], "[e1]"),
+        _response([{"op": "update", "section": "Preferences", "old": "Likes tea", "fact": "Likes mate"}], "[e2]"),
+    ])
+    session = MagicMock()
+    session.messages = [
+        {"role": "user", "content": "x" * 400, "timestamp": "2026-01-01 00:00"} for _ in range(10)
+    ]
+    session.last_consolidated = 0
+
+    messages: list[str] = []
+    sink = logger.add(messages.append, level="INFO", format="{message}")
+    try:
+        assert await store.consolidate(session, provider, "m", archive_all=True, chunk_tokens=600)
+    finally:
+        logger.remove(sink)
+
+    assert provider.chat.await_count == 2
+    memory = store.read_long_term()
+    assert "- Uses Linux" in memory and "- Likes mate" in memory
+    history = store.history_file.read_text()
+    assert history.index("[e1]") < history.index("[e2]")
+    assert "2 chunk(s), tokens in/out 200/20" in "".join(messages)
+    # Second chunk saw the memory already updated by the first.
+    second_prompt = provider.chat.await_args_list[1].kwargs["messages"][1]["content"]
+    assert "Uses Linux" in second_prompt and "part 2 of 2" in second_prompt
+
+
+@pytest.mark.asyncio
+async def test_failed_chunk_keeps_progress(tmp_path: Path) -> None:
+    store = MemoryStore(tmp_path)
+    provider = AsyncMock()
+    provider.chat = AsyncMock(side_effect=[_response([]), LLMResponse(content="no tool", tool_calls=[])])
+    session = MagicMock()
+    session.messages = [
+        {"role": "user", "content": "y" * 400, "timestamp": "2026-01-01 00:00"} for _ in range(30)
+    ]
+    session.last_consolidated = 0
+
+    assert not await store.consolidate(session, provider, "m", memory_window=20, chunk_tokens=600)
+    assert 0 < session.last_consolidated < 20
+
+
+@pytest.mark.asyncio
+async def test_consolidation_sends_only_related_sections(tmp_path: Path) -> None:
+    store = MemoryStore(tmp_path)
+    store.write_long_term(
+        "# Long-term Memory\n\n## Pets\n- Has a cat named Miso\n\n## Work\n- Writes Rust at Acme\n- On call Fridays\n"
+    )
+    provider = AsyncMock()
+    provider.chat = AsyncMock(return_value=LLMResponse(
+        content=None,
+        tool_calls=[ToolCallRequest(id="c", name="save_memory",
+                                    arguments={"history_entry": "[e1]", "memory_update": "# Only pets\n"})],
+    ))
+    session = MagicMock()
+    session.messages = [{"role": "user", "content": "Miso the cat knocked a glass over", "timestamp": "2026-01-01"}]
+    session.last_consolidated = 0
+
+    assert await store.consolidate(session, provider, "m", archive_all=True)
+
+    prompt = provider.chat.await_args.kwargs["messages"][1]["content"]
+    assert "- Has a cat named Miso" in prompt
+    assert "Rust" not in prompt and "## Work\n(2 unrelated facts not shown)" in prompt
+    # A full rewrite made from the partial view would drop the hidden section.
+    assert "- Writes Rust at Acme" in store.read_long_term()
+
+
+@pytest.mark.asyncio
+async def test_archive_retry_does_not_repeat_history(tmp_path: Path) -> None:
+    store = MemoryStore(tmp_path)
+    provider = AsyncMock()
+    provider.chat = AsyncMock(side_effect=[
+        _response([], "[e1]"), LLMResponse(content="no tool", tool_calls=[]), _response([], "[e2]"),
+    ])
+    session = MagicMock()
+    session.messages = [
+        {"role": "user", "content": "z" * 400, "timestamp": "2026-01-01 00:00"} for _ in range(10)
+    ]
+    session.last_consolidated = 0
+
+    assert not await store.consolidate(session, provider, "m", archive_all=True, chunk_tokens=600)
+    assert 0 < session.last_consolidated < 10
+    assert await store.consolidate(session, provider, "m", archive_all=True, chunk_tokens=600)
+
+    assert session.last_consolidated == 10
+    history = store.history_file.read_text()
+    assert history.count("[e1]") == 1 and "[e2]" in history
+
+
+@pytest.mark.asyncio
+async def test_concurrent_consolidations_keep_each_others_facts(tmp_path: Path) -> None:
+    store = MemoryStore(tmp_path)
+    store.write_long_term(TEMPLATE)
+    b_done = asyncio.Event()
+
+    async def chat(messages, **kwargs):
+        if "from session A" in messages[1]["content"]:
+            await b_done.wait()  # A read MEMORY.md before B wrote to it
+            return _response([{"op": "add", "section": "User Information", "fact": "Fact from A"}], "[a]")
+        b_done.set()
+        return _response([{"op": "update", "section": "Preferences", "old": "Likes tea", "fact": "Likes mate"}], "[b]")
+
+    provider = AsyncMock()
+    provider.chat = chat
+
+    def session(text: str) -> MagicMock:
+        s = MagicMock()
+        s.messages = [{"role": "user", "content": text, "timestamp": "2026-01-01 00:00"}]
+        s.last_consolidated = 0
+        return s
+
+    results = await asyncio.gather(
+        store.consolidate(session("hello from session A"), provider, "m", archive_all=True),
+        store.consolidate(session("hello from session B"), provider, "m", archive_all=True),
+    )
+
+    assert results == [True, True]
+    memory = store.read_long_term()
+    assert "- Fact from A" in memory and "- Likes mate" in memory and "Likes tea" not in memory
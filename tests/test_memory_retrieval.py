@@ -0,0 +1,85 @@
+from nanobot.agent.context import ContextBuilder
+from nanobot.agent.memory_index import MemorySectionIndex
+from nanobot.config.schema import MemoryRetrievalConfig
+
+MEMORY = """# Long-term Memory
+
+## User Information
+
+- Name is Sam, lives in Porto
+
+## Preferences
+
+(User preferences learned over time)
+
+## Garden
+
+- Tomatoes are planted in the south bed
+- Watering schedule is every second morning
+
+## Car
+
+- Car is a 2015 Golf, next service due in May
+
+## Work
+
+- Works on the billing service migration
+"""
+
+
+def _write(tmp_path):
+    (tmp_path / "memory").mkdir()
+    path = tmp_path / "memory" / "MEMORY.md"
+    path.write_text(MEMORY, encoding="utf-8")
+    return path
+
+
+def test_bm25_ranks_relevant_sections(tmp_path) -> None:
+    index = MemorySectionIndex(_write(tmp_path))
+
+    assert index.search("when should I water the tomatoes?", top_k=1)[0].startswith("## Garden")
+    car_service = index.search("car service", top_k=3)
+    assert car_service[0].startswith("## Car") and car_service[1].startswith("## Work")
+    assert index.search("completely unrelated words") == []
+    assert index.pinned(["user information", "Preferences"]) == ["## User Information\n- Name is Sam, lives in Porto"]
+
+
+def test_token_budget_and_refresh(tmp_path) -> None:
+    path = _write(tmp_path)
+    index = MemorySectionIndex(path)
+
+    assert index.search("tomatoes car billing", top_k=5, token_budget=5) == []
+    assert len(index.search("tomatoes car billing", top_k=5)) == 3
+
+    path.write_text(MEMORY + "\n## Boat\n\n- Sailboat moored in Leixões\n", encoding="utf-8")
+    assert index.search("sailboat")[0].startswith("## Boat")
+
+
+def test_context_injects_pinned_and_retrieved_sections(tmp_path) -> None:
+    _write(tmp_path)
+    builder = ContextBuilder(tmp_path, memory_retrieval=MemoryRetrievalConfig(enabled=True, top_k=1))
+
+    messages = builder.build_messages(history=[], current_message="Is the Golf due for service?")
+    system, runtime = messages[0]["content"], messages[1]["content"]
+
+    assert "Name is Sam" in system and "Tomatoes" not in system and "2015 Golf" not in system
+    assert "2015 Golf" in runtime and "Tomatoes" not in runtime
+    # The system prompt does not depend on the message, so it stays cacheable.
+    assert builder.build_messages(history=[], current_message="tomatoes?")[0]["content"] == system
+
+
+def test_retrieval_disabled_keeps_full_memory(tmp_path) -> None:
+    _write(tmp_path)
+    messages = ContextBuilder(tmp_path).build_messages(history=[], current_message="hi")
+    assert "Tomatoes" in messages[0]["content"] and "Relevant Memory" not in messages[1]["content"]
+
+
+def test_preamble_is_always_included(tmp_path) -> None:
+    path = _write(tmp_path)
+    path.write_text(MEMORY.replace("# Long-term Memory\n", "# Long-term Memory\n\nAlways answer in Portuguese.\n"))
+    index = MemorySectionIndex(path)
+    assert index.preamble() == "# Long-term Memory\n\nAlways answer in Portuguese."
+
+    builder = ContextBuilder(tmp_path, memory_retrieval=MemoryRetrievalConfig(enabled=True, pinned_sections=[]))
+    system = builder.build_messages(history=[], current_message="hi")[0]["content"]
+    assert "Always answer in Portuguese." in system and "Name is Sam" not in system
@@ -0,0 +1,115 @@
+"""Tests for parallel execution of tool calls within one turn."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.message import MessageTool
+from nanobot.agent.tools.registry import ToolRegistry
+
+
+class _SleepTool(Tool):
+    def __init__(self, name: str, log: list[str], key: str | None = None):
+        self._name = name
+        self._log = log
+        self._key = key
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def description(self) -> str:
+        return "sleep"
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {"type": "object", "properties": {"tag": {"type": "string"}, "delay": {"type": "number"}}}
+
+    def concurrency_key(self, params: dict[str, Any]) -> str | None:
+        return self._key
+
+    async def execute(self, tag: str = "", delay: float = 0.02, **kwargs: Any) -> str:
+        self._log.append(f"start-{tag}")
+        await asyncio.sleep(delay)
+        self._log.append(f"end-{tag}")
+        return tag
+
+
+@pytest.mark.asyncio
+async def test_independent_calls_overlap_and_keep_order() -> None:
+    log: list[str] = []
+    registry = ToolRegistry()
+    registry.register(_SleepTool("fetch", log))
+
+    results = await registry.execute_batch(
+        [("fetch", {"tag": "a", "delay": 0.05}), ("fetch", {"tag": "b", "delay": 0.01})],
+        max_parallel=4,
+    )
+    assert results == ["a", "b"]
+    assert log == ["start-a", "start-b", "end-b", "end-a"]
+
+
+@pytest.mark.asyncio
+async def test_parallelism_limit_one_is_sequential() -> None:
+    log: list[str] = []
+    registry = ToolRegistry()
+    registry.register(_SleepTool("fetch", log))
+
+    await registry.execute_batch([("fetch", {"tag": "a"}), ("fetch", {"tag": "b"})], max_parallel=1)
+    assert log == ["start-a", "end-a", "start-b", "end-b"]
+
+
+@pytest.mark.asyncio
+async def test_same_key_is_serialized() -> None:
+    log: list[str] = []
+    registry = ToolRegistry()
+    registry.register(_SleepTool("edit", log, key="file:/x"))
+    registry.register(_SleepTool("fetch", log))
+
+    await registry.execute_batch(
+        [("edit", {"tag": "e1", "delay": 0.03}), ("fetch", {"tag": "f"}), ("edit", {"tag": "e2"})],
+        max_parallel=4,
+    )
+    assert log.index("end-e1") < log.index("start-e2")
+    assert log.index("start-f") < log.index("end-e1")
+
+
+@pytest.mark.asyncio
+async def test_exclusive_call_runs_alone() -> None:
+    log: list[str] = []
+    registry = ToolRegistry()
+    registry.register(_SleepTool("fetch", log))
+    registry.register(_SleepTool("exec", log, key=Tool.EXCLUSIVE))
+
+    await registry.execute_batch(
+        [("fetch", {"tag": "a"}), ("exec", {"tag": "x"}), ("fetch", {"tag": "b"})],
+        max_parallel=4,
+    )
+    assert log == ["start-a", "end-a", "start-x", "end-x", "start-b", "end-b"]
+
+
+@pytest.mark.asyncio
+async def test_message_sent_flag_survives_parallel_execution() -> None:
+    sent = []
+
+    async def send(msg):
+        sent.append(msg.content)
+
+    registry = ToolRegistry()
+    tool = MessageTool(send_callback=send)
+    registry.register(tool)
+    registry.register(_SleepTool("fetch", []))
+    tool.set_context("telegram", "1")
+    tool.start_turn()
+
+    await registry.execute_batch(
+        [("message", {"content": "one"}), ("fetch", {}), ("message", {"content": "two"})],
+        max_parallel=4,
+    )
+    assert sent == ["one", "two"]
+    assert tool._sent_in_turn
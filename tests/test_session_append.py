@@ -0,0 +1,106 @@
+"""Tests for append-only session persistence."""
+
+import json
+from pathlib import Path
+
+from nanobot.session.manager import Session, SessionManager
+
+
+def _lines(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+def test_save_appends_only_new_messages(tmp_path: Path) -> None:
+    manager = SessionManager(tmp_path)
+    session = Session(key="cli:append")
+    session.add_message("user", "one")
+    manager.save(session)
+    path = manager.store._get_session_path(session.key)
+    size_after_first = path.stat().st_size
+
+    session.add_message("assistant", "two")
+    session.last_consolidated = 1
+    manager.save(session)
+
+    records = _lines(path)
+    assert [r.get("content") for r in records if r.get("_type") != "metadata"] == ["one", "two"]
+    assert records[-1]["_type"] == "metadata"
+    assert records[-1]["last_consolidated"] == 1
+    # Earlier bytes are untouched.
+    assert path.read_bytes()[:size_after_first].count(b"\n") == 3
+
+    manager.invalidate(session.key)
+    reloaded = manager.get_or_create(session.key)
+    assert [m["content"] for m in reloaded.messages] == ["one", "two"]
+    assert reloaded.last_consolidated == 1
+
+
+def test_clear_forces_rewrite(tmp_path: Path) -> None:
+    manager = SessionManager(tmp_path)
+    session = Session(key="cli:clear")
+    for i in range(3):
+        session.add_message("user", f"m{i}")
+    manager.save(session)
+
+    session.clear()
+    for i in range(5):
+        session.add_message("user", f"n{i}")
+    manager.save(session)
+
+    manager.invalidate(session.key)
+    reloaded = manager.get_or_create(session.key)
+    assert [m["content"] for m in reloaded.messages] == [f"n{i}" for i in range(5)]
+
+
+def test_compact_drops_stale_metadata(tmp_path: Path) -> None:
+    manager = SessionManager(tmp_path)
+    session = Session(key="cli:compact")
+    for i in range(4):
+        session.add_message("user", f"m{i}")
+        manager.save(session)
+    path = manager.store._get_session_path(session.key)
+    assert sum(1 for r in _lines(path) if r.get("_type") == "metadata") == 5
+
+    manager.compact(session)
+    records = _lines(path)
+    # One leading record plus one trailing record for tail reads.
+    assert records[0]["_type"] == "metadata"
+    assert records[-1]["_type"] == "metadata"
+    assert sum(1 for r in records if r.get("_type") == "metadata") == 2
+    assert len(records) == 6
+
+
+def test_load_recovers_truncated_trailing_line(tmp_path: Path) -> None:
+    manager = SessionManager(tmp_path)
+    session = Session(key="cli:crash")
+    session.add_message("user", "kept")
+    manager.save(session)
+    path = manager.store._get_session_path(session.key)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"role": "assistant", "content": "half')
+
+    manager.invalidate(session.key)
+    reloaded = manager.get_or_create(session.key)
+    assert [m["content"] for m in reloaded.messages] == ["kept"]
+    assert path.read_bytes().endswith(b"\n")
+
+    # Appending after recovery produces a well-formed file.
+    reloaded.add_message("assistant", "after")
+    manager.save(reloaded)
+    manager.invalidate(session.key)
+    assert [m["content"] for m in manager.get_or_create(session.key).messages] == ["kept", "after"]
+
+
+def test_list_sessions_uses_newest_metadata(tmp_path: Path) -> None:
+    manager = SessionManager(tmp_path)
+    session = Session(key="cli:list")
+    session.add_message("user", "a")
+    manager.save(session)
+    first = manager.list_sessions()[0]["updated_at"]
+
+    session.add_message("user", "b")
+    session.updated_at = session.updated_at.replace(year=session.updated_at.year + 1)
+    manager.save(session)
+    listed = manager.list_sessions()
+    assert listed[0]["key"] == "cli:list"
+    assert listed[0]["updated_at"] > first
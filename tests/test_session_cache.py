@@ -0,0 +1,73 @@
+"""Tests for the bounded SessionManager cache."""
+
+import gc
+from pathlib import Path
+
+from nanobot.session.manager import SessionManager
+
+
+def _fill(manager: SessionManager, key: str, n: int = 1) -> None:
+    session = manager.get_or_create(key)
+    for i in range(n):
+        session.add_message("user", f"{key}-{i}")
+    manager.save(session)
+
+
+def test_lru_evicts_least_recently_used(tmp_path: Path) -> None:
+    manager = SessionManager(tmp_path, max_entries=2)
+    _fill(manager, "cli:a")
+    _fill(manager, "cli:b")
+    manager.get_or_create("cli:a")  # a becomes most recent
+    _fill(manager, "cli:c")
+
+    assert list(manager._cache) == ["cli:a", "cli:c"]
+    assert manager.get_cache_stats()["evictions"] == 1
+
+
+def test_evicted_session_is_flushed_and_reloaded(tmp_path: Path) -> None:
+    manager = SessionManager(tmp_path, max_entries=1)
+    session = manager.get_or_create("cli:a")
+    session.add_message("user", "unsaved")
+    session.last_consolidated = 1
+    del session
+    _fill(manager, "cli:b")  # evicts a, which must be flushed first
+    gc.collect()
+
+    reloaded = manager.get_or_create("cli:a")
+    assert [m["content"] for m in reloaded.messages] == ["unsaved"]
+    assert reloaded.last_consolidated == 1
+
+
+def test_evicted_but_referenced_session_is_reused(tmp_path: Path) -> None:
+    manager = SessionManager(tmp_path, max_entries=1)
+    held = manager.get_or_create("cli:a")
+    _fill(manager, "cli:b")
+    assert "cli:a" not in manager._cache
+    assert manager.get_or_create("cli:a") is held
+
+
+def test_byte_limit_evicts(tmp_path: Path) -> None:
+    manager = SessionManager(tmp_path, max_entries=100, max_bytes=3000)
+    _fill(manager, "cli:a", n=10)
+    _fill(manager, "cli:b", n=10)
+    assert "cli:a" not in manager._cache
+    assert manager.get_cache_stats()["bytes"] <= 3000
+
+
+def test_idle_ttl_evicts(tmp_path: Path) -> None:
+    manager = SessionManager(tmp_path, idle_ttl=0)
+    _fill(manager, "cli:a")
+    _fill(manager, "cli:b")
+    assert list(manager._cache) == ["cli:b"]
+
+
+def test_hit_miss_counters_are_published(tmp_path: Path) -> None:
+    manager = SessionManager(tmp_path)
+    manager.get_or_create("cli:a")
+    manager.get_or_create("cli:a")
+    manager.flush()
+
+    stats = SessionManager.read_cache_stats(tmp_path)
+    assert stats is not None
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["entries"] == 1
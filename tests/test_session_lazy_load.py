@@ -0,0 +1,73 @@
+"""Tests for tail-only session loading."""
+
+import json
+from pathlib import Path
+
+from nanobot.session.manager import MessageLog, Session, SessionManager
+
+
+def _saved_session(tmp_path: Path, count: int, last_consolidated: int) -> str:
+    manager = SessionManager(tmp_path)
+    session = Session(key="cli:lazy")
+    for i in range(count):
+        session.add_message("user" if i % 2 == 0 else "assistant", f"msg{i}")
+    session.last_consolidated = last_consolidated
+    manager.save(session)
+    return session.key
+
+
+def test_only_unconsolidated_tail_is_materialized(tmp_path: Path) -> None:
+    key = _saved_session(tmp_path, 5000, last_consolidated=4950)
+    session = SessionManager(tmp_path, tail_window=100).get_or_create(key)
+
+    assert isinstance(session.messages, MessageLog)
+    assert len(session.messages) == 5000
+    assert session.messages.offset == 4950
+    history = session.get_history(max_messages=100)
+    assert [m["content"] for m in history] == [f"msg{i}" for i in range(4950, 5000)]
+    assert session.messages.offset == 4950
+
+
+def test_tail_is_capped_at_window(tmp_path: Path) -> None:
+    key = _saved_session(tmp_path, 1000, last_consolidated=0)
+    session = SessionManager(tmp_path, tail_window=100).get_or_create(key)
+
+    assert session.messages.offset == 900
+    assert len(session.get_history(max_messages=100)) == 100
+
+
+def test_older_messages_load_on_demand(tmp_path: Path) -> None:
+    key = _saved_session(tmp_path, 300, last_consolidated=250)
+    session = SessionManager(tmp_path, tail_window=50).get_or_create(key)
+
+    assert [m["content"] for m in session.messages.iter_older(10)][:2] == ["msg10", "msg11"]
+    assert session.messages.offset == 250  # streaming does not materialize
+    assert session.messages[5]["content"] == "msg5"
+    assert [m["content"] for m in session.messages[100:103]] == ["msg100", "msg101", "msg102"]
+    assert session.messages.offset == 5
+    assert [m["content"] for m in session.messages] == [f"msg{i}" for i in range(300)]
+
+
+def test_append_after_lazy_load_round_trips(tmp_path: Path) -> None:
+    key = _saved_session(tmp_path, 200, last_consolidated=150)
+    manager = SessionManager(tmp_path, tail_window=50)
+    session = manager.get_or_create(key)
+    session.add_message("user", "new")
+    manager.save(session)
+
+    full = SessionManager(tmp_path).get_or_create(key)
+    assert len(full.messages) == 201
+    assert full.messages[-1]["content"] == "new"
+    assert full.messages[0]["content"] == "msg0"
+
+
+def test_legacy_file_falls_back_to_full_load(tmp_path: Path) -> None:
+    manager = SessionManager(tmp_path, tail_window=10)
+    path = manager.store._get_session_path("cli:legacy")
+    lines = [{"_type": "metadata", "key": "cli:legacy", "last_consolidated": 0}]
+    lines += [{"role": "user", "content": f"m{i}"} for i in range(30)]
+    path.write_text("\n".join(json.dumps(x) for x in lines) + "\n", encoding="utf-8")
+
+    session = manager.get_or_create("cli:legacy")
+    assert isinstance(session.messages, list)
+    assert len(session.messages) == 30
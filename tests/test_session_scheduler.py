@@ -0,0 +1,174 @@
+"""Tests for per-session scheduling in AgentLoop."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from nanobot.agent.loop import AgentLoop
+from nanobot.agent.scheduler import SessionScheduler
+from nanobot.agent.tools.message import MessageTool
+from nanobot.bus.events import InboundMessage
+from nanobot.bus.queue import MessageBus
+
+
+async def _run(scheduler: SessionScheduler, key: str, channel: str, order: list, delay: float = 0.05):
+    async with scheduler.slot(key, channel):
+        order.append(f"start-{key}")
+        await asyncio.sleep(delay)
+        order.append(f"end-{key}")
+
+
+@pytest.mark.asyncio
+async def test_different_sessions_run_concurrently() -> None:
+    scheduler = SessionScheduler(max_concurrent=4)
+    order: list[str] = []
+    await asyncio.gather(
+        _run(scheduler, "telegram:1", "telegram", order),
+        _run(scheduler, "slack:2", "slack", order),
+    )
+    assert order[:2] == ["start-telegram:1", "start-slack:2"]
+
+
+@pytest.mark.asyncio
+async def test_same_session_is_serialized() -> None:
+    scheduler = SessionScheduler(max_concurrent=4)
+    order: list[str] = []
+
+    async def run(tag: str):
+        async with scheduler.slot("telegram:1", "telegram"):
+            order.append(f"start-{tag}")
+            await asyncio.sleep(0.02)
+            order.append(f"end-{tag}")
+
+    await asyncio.gather(run("a"), run("b"))
+    assert order == ["start-a", "end-a", "start-b", "end-b"]
+
+
+@pytest.mark.asyncio
+async def test_global_cap_and_channel_fairness() -> None:
+    scheduler = SessionScheduler(max_concurrent=1)
+    order: list[str] = []
+    tasks = [asyncio.create_task(_run(scheduler, "telegram:0", "telegram", order, 0.01))]
+    await asyncio.sleep(0)
+    # Telegram floods the queue before a single Slack message arrives.
+    for i in range(1, 4):
+        tasks.append(asyncio.create_task(_run(scheduler, f"telegram:{i}", "telegram", order, 0.01)))
+    tasks.append(asyncio.create_task(_run(scheduler, "slack:0", "slack", order, 0.01)))
+    await asyncio.gather(*tasks)
+
+    starts = [e[len("start-"):] for e in order if e.startswith("start-")]
+    assert starts[:3] == ["telegram:0", "telegram:1", "slack:0"]
+    # Never more than one in flight.
+    assert all(order[i].startswith("start") and order[i + 1].startswith("end") for i in range(0, len(order), 2))
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_releases_nothing() -> None:
+    scheduler = SessionScheduler(max_concurrent=1)
+    gate = asyncio.Event()
+
+    async def hold():
+        async with scheduler.slot("a:1", "a"):
+            await gate.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(_run(scheduler, "b:1", "b", []))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    gate.set()
+    await holder
+    assert scheduler.running == 0
+    assert scheduler.get_stats()["b:1"]["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_stats_report_queue_depth_and_wait() -> None:
+    scheduler = SessionScheduler(max_concurrent=2)
+    gate = asyncio.Event()
+    seen: list[int] = []
+
+    async def first():
+        async with scheduler.slot("telegram:1", "telegram"):
+            await gate.wait()
+
+    async def second():
+        async with scheduler.slot("telegram:1", "telegram"):
+            seen.append(scheduler.get_stats()["telegram:1"]["queued"])
+
+    t1 = asyncio.create_task(first())
+    t2 = asyncio.create_task(second())
+    await asyncio.sleep(0.02)
+    assert scheduler.get_stats()["telegram:1"]["queued"] == 1
+    gate.set()
+    await asyncio.gather(t1, t2)
+
+    stats = scheduler.get_stats()["telegram:1"]
+    assert stats["processed"] == 2
+    assert stats["queued"] == 0 and stats["active"] == 0
+    assert stats["max_wait_ms"] >= 10
+    assert seen == [0]
+
+
+@pytest.mark.asyncio
+async def test_idle_stats_are_bounded() -> None:
+    scheduler = SessionScheduler(max_concurrent=2, max_stats=3)
+    gate = asyncio.Event()
+
+    async def hold():
+        async with scheduler.slot("busy", "telegram"):
+            await gate.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    for i in range(5):
+        async with scheduler.slot(f"s{i}", "telegram"):
+            pass
+
+    # The in-flight session is never evicted; idle ones go oldest first.
+    assert list(scheduler.get_stats()) == ["busy", "s3", "s4"]
+    gate.set()
+    await holder
+
+
+@pytest.mark.asyncio
+async def test_system_message_waits_for_origin_session(tmp_path) -> None:
+    provider = MagicMock()
+    provider.get_default_model.return_value = "test-model"
+    loop = AgentLoop(bus=MessageBus(), provider=provider, workspace=tmp_path, model="test-model")
+    order: list[str] = []
+
+    async def process(msg, **kwargs):
+        order.append(f"start-{msg.channel}")
+        await asyncio.sleep(0.05)
+        order.append(f"end-{msg.channel}")
+        return None
+
+    loop._process_message = process
+    user = InboundMessage(channel="telegram", sender_id="u", chat_id="42", content="hi")
+    result = InboundMessage(channel="system", sender_id="subagent", chat_id="telegram:42", content="done")
+    await asyncio.gather(loop._dispatch(user), loop._dispatch(result))
+
+    assert order == ["start-telegram", "end-telegram", "start-system", "end-system"]
+    assert list(loop.scheduler.get_stats()) == ["telegram:42"]
+
+
+@pytest.mark.asyncio
+async def test_message_tool_context_is_per_task() -> None:
+    tool = MessageTool(send_callback=lambda m: asyncio.sleep(0))
+
+    async def turn(chat_id: str) -> tuple[str, bool]:
+        tool.set_context("telegram", chat_id)
+        tool.start_turn()
+        await asyncio.sleep(0.01)
+        result = await tool.execute(content="hi")
+        return result, tool._sent_in_turn
+
+    r1, r2 = await asyncio.gather(turn("1"), turn("2"))
+    assert r1 == ("Message sent to telegram:1", True)
+    assert r2 == ("Message sent to telegram:2", True)
@@ -0,0 +1,129 @@
+"""Tests for the SQLite session store."""
+
+import json
+from pathlib import Path
+
+from nanobot.session.manager import MessageLog, Session, SessionManager
+from nanobot.session.store import JsonlSessionStore, SqliteSessionStore, create_session_store
+
+
+def _manager(tmp_path: Path, **kwargs) -> SessionManager:
+    store = SqliteSessionStore(tmp_path / "sessions" / "sessions.db")
+    return SessionManager(tmp_path, store=store, **kwargs)
+
+
+def test_round_trip_and_incremental_append(tmp_path: Path) -> None:
+    manager = _manager(tmp_path)
+    session = manager.get_or_create("cli:a")
+    session.add_message("user", "one")
+    session.metadata["lang"] = "en"
+    manager.save(session)
+    session.add_message("assistant", "two")
+    session.last_consolidated = 1
+    manager.save(session)
+
+    rows = manager.store._conn.execute("SELECT seq FROM messages WHERE session_key = 'cli:a'").fetchall()
+    assert [r[0] for r in rows] == [0, 1]
+
+    manager.invalidate("cli:a")
+    reloaded = manager.get_or_create("cli:a")
+    assert [m["content"] for m in reloaded.messages] == ["one", "two"]
+    assert reloaded.last_consolidated == 1
+    assert reloaded.metadata == {"lang": "en"}
+
+
+def test_clear_replaces_rows(tmp_path: Path) -> None:
+    manager = _manager(tmp_path)
+    session = manager.get_or_create("cli:a")
+    for i in range(4):
+        session.add_message("user", f"m{i}")
+    manager.save(session)
+    session.clear()
+    session.add_message("user", "fresh")
+    manager.save(session)
+
+    manager.invalidate("cli:a")
+    assert [m["content"] for m in manager.get_or_create("cli:a").messages] == ["fresh"]
+
+
+def test_tail_load_reads_older_rows_on_demand(tmp_path: Path) -> None:
+    manager = _manager(tmp_path, tail_window=3)
+    session = manager.get_or_create("cli:a")
+    for i in range(10):
+        session.add_message("user", f"m{i}")
+    session.last_consolidated = 5
+    manager.save(session)
+
+    manager.invalidate("cli:a")
+    reloaded = manager.get_or_create("cli:a")
+    assert isinstance(reloaded.messages, MessageLog)
+    assert reloaded.messages.offset == 7
+    assert len(reloaded.messages) == 10
+    assert reloaded.messages[2]["content"] == "m2"
+
+    reloaded.add_message("assistant", "m10")
+    manager.save(reloaded)
+    manager.invalidate("cli:a")
+    assert [m["content"] for m in manager.get_or_create("cli:a").messages][-2:] == ["m9", "m10"]
+
+
+def test_list_sessions_newest_first(tmp_path: Path) -> None:
+    manager = _manager(tmp_path)
+    for key in ("cli:old", "cli:new"):
+        session = manager.get_or_create(key)
+        session.add_message("user", key)
+        manager.save(session)
+    old = manager.get_or_create("cli:old")
+    old.updated_at = old.updated_at.replace(year=old.updated_at.year - 1)
+    manager.save(old)
+
+    assert [s["key"] for s in manager.list_sessions()] == ["cli:new", "cli:old"]
+
+
+def test_jsonl_files_are_imported_once(tmp_path: Path) -> None:
+    sessions_dir = tmp_path / "sessions"
+    jsonl = JsonlSessionStore(sessions_dir)
+    session = Session(key="telegram:42", last_consolidated=1)
+    session.add_message("user", "hello")
+    session.add_message("assistant", "hi")
+    jsonl.rewrite(session)
+    path = jsonl._get_session_path(session.key)
+
+    store = create_session_store(sessions_dir, "sqlite")
+    assert not path.exists()
+    assert path.with_name(path.name + ".migrated").exists()
+    loaded = store.load("telegram:42")
+    assert loaded is not None
+    assert [m["content"] for m in loaded.messages] == ["hello", "hi"]
+    assert loaded.last_consolidated == 1
+    store.close()
+
+    # Re-opening does not import anything again.
+    assert create_session_store(sessions_dir, "sqlite").import_jsonl(jsonl) == 0
+
+
+def test_unicode_payload_is_stored_verbatim(tmp_path: Path) -> None:
+    manager = _manager(tmp_path)
+    session = manager.get_or_create("cli:u")
+    session.add_message("user", "héllo 👋", tool_calls=[{"id": "1"}])
+    manager.save(session)
+    (data,) = manager.store._conn.execute("SELECT data FROM messages").fetchone()
+    assert json.loads(data)["content"] == "héllo 👋"
+    manager.close()
+
+
+def test_cli_commands_share_the_configured_store(tmp_path: Path) -> None:
+    from nanobot.cli.commands import _make_session_manager
+    from nanobot.config.schema import Config
+
+    config = Config()
+    config.agents.defaults.workspace = str(tmp_path)
+    config.sessions.backend = "sqlite"
+    config.sessions.cache_max_entries = 7
+
+    manager = _make_session_manager(config)
+    try:
+        assert isinstance(manager.store, SqliteSessionStore)
+        assert manager.max_entries == 7
+    finally:
+        manager.close()
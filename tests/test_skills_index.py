@@ -0,0 +1,71 @@
+"""Tests for the SkillsLoader index."""
+
+from pathlib import Path
+
+import pytest
+
+from nanobot.agent import skills as skills_module
+from nanobot.agent.skills import SkillsLoader
+
+
+def _write_skill(root: Path, name: str, body: str) -> Path:
+    path = root / name / "SKILL.md"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(body, encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def loader(tmp_path: Path) -> SkillsLoader:
+    builtin = tmp_path / "builtin"
+    builtin.mkdir()
+    return SkillsLoader(tmp_path / "ws", builtin_skills_dir=builtin)
+
+
+def test_skill_files_are_read_once(loader: SkillsLoader, monkeypatch) -> None:
+    _write_skill(loader.builtin_skills, "weather", "---\ndescription: Weather\n---\nUse curl.")
+    reads: list[Path] = []
+    original = Path.read_text
+
+    def counting_read(self: Path, *args, **kwargs):
+        reads.append(self)
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "read_text", counting_read)
+    loader.build_skills_summary()
+    loader.get_always_skills()
+    loader.list_skills()
+    assert loader.get_skill_metadata("weather") == {"description": "Weather"}
+    assert len(reads) == 1
+
+
+def test_index_picks_up_changes(loader: SkillsLoader) -> None:
+    path = _write_skill(loader.builtin_skills, "notes", "---\ndescription: Old\n---\n")
+    assert loader.get_skill_metadata("notes")["description"] == "Old"
+
+    path.write_text("---\ndescription: Newer text\n---\n", encoding="utf-8")
+    assert loader.get_skill_metadata("notes")["description"] == "Newer text"
+
+    _write_skill(loader.workspace_skills, "notes", "---\ndescription: Mine\n---\n")
+    assert [s["source"] for s in loader.list_skills()] == ["workspace"]
+    assert loader.get_skill_metadata("notes")["description"] == "Mine"
+
+    (loader.workspace_skills / "notes" / "SKILL.md").unlink()
+    assert loader.get_skill_metadata("notes")["description"] == "Newer text"
+
+
+def test_which_is_memoized(loader: SkillsLoader, monkeypatch) -> None:
+    _write_skill(
+        loader.builtin_skills, "gh",
+        '---\nmetadata: {"nanobot": {"always": true, "requires": {"bins": ["gh"]}}}\n---\n',
+    )
+    calls: list[str] = []
+    monkeypatch.setattr(skills_module.shutil, "which", lambda b: calls.append(b) or "/usr/bin/gh")
+
+    assert loader.get_always_skills() == ["gh"]
+    assert "<skill available=\"true\">" in loader.build_skills_summary()
+    assert calls == ["gh"]
+
+    monkeypatch.setenv("PATH", "/elsewhere")
+    loader.list_skills()
+    assert calls == ["gh", "gh"]
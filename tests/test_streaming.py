@@ -0,0 +1,260 @@
+"""Tests for streamed LLM replies from provider to channel."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from nanobot.agent.loop import AgentLoop
+from nanobot.bus.events import InboundMessage, OutboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.channels.base import BaseChannel
+from nanobot.config.schema import ChannelsConfig
+from nanobot.providers.base import LLMResponse, ToolCallRequest
+from nanobot.providers.custom_provider import CustomProvider
+
+
+class _EditChannel(BaseChannel):
+    name = "fake"
+    supports_streaming = True
+    stream_edit_interval = 0.05
+
+    def __init__(self, streaming: bool = True):
+        super().__init__(SimpleNamespace(allow_from=["*"]), MessageBus())
+        self.supports_streaming = streaming
+        self.sent: list[str] = []
+        self.edits: list[str] = []
+
+    async def start(self) -> None: ...
+
+    async def stop(self) -> None: ...
+
+    async def send(self, msg: OutboundMessage) -> None:
+        self.sent.append(msg.content)
+
+    async def _send_stream_message(self, msg: OutboundMessage) -> str | None:
+        self.sent.append(msg.content)
+        return "m1"
+
+    async def _edit_stream_message(self, msg: OutboundMessage, message_id: str, text: str) -> None:
+        self.edits.append(text)
+
+
+def _snapshot(text: str, end: bool = False) -> OutboundMessage:
+    meta = {"_progress": True, "_stream": True, "_stream_id": "s1", "_stream_end": end}
+    return OutboundMessage(channel="fake", chat_id="c", content=text, metadata=meta)
+
+
+def _final(text: str) -> OutboundMessage:
+    return OutboundMessage(channel="fake", chat_id="c", content=text, metadata={"_stream_id": "s1"})
+
+
+@pytest.mark.asyncio
+async def test_streamed_reply_edits_one_message_with_throttling() -> None:
+    channel = _EditChannel()
+    for text in ("H", "He", "Hel", "Hell"):
+        await channel.deliver(_snapshot(text))
+    assert channel.sent == ["H"]
+    assert channel.edits == []  # Held back by the edit interval
+
+    await asyncio.sleep(0.08)
+    assert channel.edits == ["Hell"]
+
+    await channel.deliver(_final("Hello!"))
+    assert channel.sent == ["H"]
+    assert channel.edits == ["Hell", "Hello!"]
+    assert channel._streams == {}
+
+
+@pytest.mark.asyncio
+async def test_oversized_reply_replaces_the_partial_message() -> None:
+    channel = _EditChannel()
+    channel.stream_max_chars = 10
+    deleted: list[str] = []
+
+    async def delete(msg: OutboundMessage, message_id: str) -> None:
+        deleted.append(message_id)
+
+    channel._delete_stream_message = delete
+    await channel.deliver(_snapshot("Hello"))
+    await channel.deliver(_final("Hello, this is far too long"))
+    assert deleted == ["m1"] and channel.sent == ["Hello", "Hello, this is far too long"]
+
+    # Without delete support the partial message is marked as superseded instead.
+    channel = _EditChannel()
+    channel.stream_max_chars = 10
+    await channel.deliver(_snapshot("Hello"))
+    await channel.deliver(_final("Hello, this is far too long"))
+    assert channel.edits == ["(reply continues below)"]
+    assert channel.sent == ["Hello", "Hello, this is far too long"]
+
+
+@pytest.mark.asyncio
+async def test_withdrawn_and_stale_streams_are_dropped() -> None:
+    channel = _EditChannel()
+    deleted: list[str] = []
+
+    async def delete(msg: OutboundMessage, message_id: str) -> None:
+        deleted.append(message_id)
+
+    channel._delete_stream_message = delete
+    await channel.deliver(_snapshot("Hel"))
+    await channel.deliver(_snapshot("Hello"))  # Schedules a delayed flush
+    await channel.deliver(_snapshot("", end=True))
+    await asyncio.sleep(0.08)
+    assert deleted == ["m1"] and channel.edits == [] and channel._streams == {}
+
+    # A stream whose turn never finished is forgotten once another one starts.
+    channel.stream_ttl = 0
+    await channel.deliver(_snapshot("orphan"))
+    other = _snapshot("next")
+    other.metadata["_stream_id"] = "s2"
+    await channel.deliver(other)
+    assert list(channel._streams) == ["s2"]
+
+    # Channels without edit support never see an empty closing snapshot.
+    plain = _EditChannel(streaming=False)
+    await plain.deliver(_snapshot("", end=True))
+    assert plain.sent == []
+
+
+@pytest.mark.asyncio
+async def test_channel_without_edits_gets_only_final_message() -> None:
+    channel = _EditChannel(streaming=False)
+    await channel.deliver(_snapshot("Hel"))
+    await channel.deliver(_final("Hello"))
+    assert channel.sent == ["Hello"]
+
+
+@pytest.mark.asyncio
+async def test_agent_loop_publishes_stream_snapshots(tmp_path: Path) -> None:
+    bus = MessageBus()
+    provider = MagicMock()
+    provider.get_default_model.return_value = "test-model"
+    loop = AgentLoop(
+        bus=bus, provider=provider, workspace=tmp_path, model="test-model",
+        channels_config=ChannelsConfig(stream_responses=True, stream_interval=0),
+    )
+    loop.tools.get_definitions = MagicMock(return_value=[])
+    responses = iter([
+        LLMResponse(content="Let me check", tool_calls=[ToolCallRequest(id="1", name="list_dir", arguments={"path": "."})]),
+        LLMResponse(content="All good"),
+    ])
+
+    async def chat_stream(on_delta=None, **kwargs):
+        response = next(responses)
+        for word in response.content.split(" "):
+            await on_delta(word + " ")
+        return response
+
+    provider.chat_stream = chat_stream
+
+    msg = InboundMessage(channel="telegram", sender_id="u", chat_id="1", content="hi")
+    final = await loop._process_message(msg)
+
+    published = []
+    while bus.outbound_size:
+        published.append(await bus.consume_outbound())
+    snapshots = [m for m in published if m.metadata.get("_stream")]
+    first_id = snapshots[0].metadata["_stream_id"]
+    assert [m.content for m in snapshots if m.metadata["_stream_id"] == first_id] == [
+        "Let", "Let me", "Let me check", "Let me check",
+    ]
+    assert snapshots[3].metadata["_stream_end"] is True
+    assert snapshots[-1].content == "All good"
+    assert final is not None and final.content == "All good"
+    assert final.metadata["_stream_id"] == snapshots[-1].metadata["_stream_id"] != first_id
+
+
+@pytest.mark.asyncio
+async def test_agent_loop_coalesces_deltas_between_snapshots(tmp_path: Path) -> None:
+    bus = MessageBus()
+    provider = MagicMock()
+    provider.get_default_model.return_value = "test-model"
+    loop = AgentLoop(
+        bus=bus, provider=provider, workspace=tmp_path, model="test-model",
+        channels_config=ChannelsConfig(stream_responses=True, stream_interval=60),
+    )
+    loop.tools.get_definitions = MagicMock(return_value=[])
+
+    async def chat_stream(on_delta=None, **kwargs):
+        for _ in range(500):
+            await on_delta("word ")
+        return LLMResponse(content="word " * 500)
+
+    provider.chat_stream = chat_stream
+
+    final = await loop._process_message(InboundMessage(channel="telegram", sender_id="u", chat_id="1", content="hi"))
+
+    published = []
+    while bus.outbound_size:
+        published.append(await bus.consume_outbound())
+    assert [m.content for m in published] == ["word"]  # Later deltas wait for the interval
+    assert final is not None and final.content.count("word") == 500
+
+
+@pytest.mark.asyncio
+async def test_agent_loop_withdraws_stream_when_message_tool_replied(tmp_path: Path) -> None:
+    bus = MessageBus()
+    provider = MagicMock()
+    provider.get_default_model.return_value = "test-model"
+    loop = AgentLoop(
+        bus=bus, provider=provider, workspace=tmp_path, model="test-model",
+        channels_config=ChannelsConfig(stream_responses=True, stream_interval=0),
+    )
+    loop.tools.get_definitions = MagicMock(return_value=[])
+    responses = iter([
+        LLMResponse(content="Sending", tool_calls=[ToolCallRequest(id="1", name="message", arguments={"content": "Hi!"})]),
+        LLMResponse(content="Sent it"),
+    ])
+
+    async def chat_stream(on_delta=None, **kwargs):
+        response = next(responses)
+        await on_delta(response.content)
+        return response
+
+    provider.chat_stream = chat_stream
+
+    final = await loop._process_message(InboundMessage(channel="telegram", sender_id="u", chat_id="1", content="hi"))
+
+    published = []
+    while bus.outbound_size:
+        published.append(await bus.consume_outbound())
+    assert final is None
+    last_stream = [m for m in published if m.metadata.get("_stream")][-2:]
+    assert [m.content for m in last_stream] == ["Sent it", ""]
+    assert last_stream[1].metadata["_stream_end"] is True
+    assert last_stream[0].metadata["_stream_id"] == last_stream[1].metadata["_stream_id"]
+
+
+@pytest.mark.asyncio
+async def test_custom_provider_assembles_streamed_tool_calls() -> None:
+    def chunk(content=None, tool_calls=None, finish=None):
+        delta = SimpleNamespace(content=content, tool_calls=tool_calls)
+        return SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=delta, finish_reason=finish)])
+
+    def tc(index, id=None, name=None, args=None):
+        return SimpleNamespace(index=index, id=id, function=SimpleNamespace(name=name, arguments=args))
+
+    async def stream():
+        yield chunk(content="Hi")
+        yield chunk(tool_calls=[tc(0, id="call_1", name="read_file", args='{"pa')])
+        yield chunk(tool_calls=[tc(0, args='th": "a.txt"}')])
+        yield chunk(finish="tool_calls")
+
+    deltas: list[str] = []
+
+    async def on_delta(d: str) -> None:
+        deltas.append(d)
+
+    provider = CustomProvider()
+    response = await provider._consume_stream(stream(), on_delta)
+    assert deltas == ["Hi"]
+    assert response.content == "Hi"
+    assert response.finish_reason == "tool_calls"
+    assert response.tool_calls[0].name == "read_file"
+    assert response.tool_calls[0].arguments == {"path": "a.txt"}
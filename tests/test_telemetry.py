@@ -0,0 +1,91 @@
+import asyncio
+import json
+from unittest.mock import patch
+
+import pytest
+from typer.testing import CliRunner
+
+from nanobot.cli.commands import app
+from nanobot.config.schema import Config
+from nanobot.telemetry import MetricsServer, Telemetry
+from nanobot.telemetry.stats import iter_events, percentile, summarize
+
+USAGE = {"prompt_tokens": 1000, "completion_tokens": 50, "cache_read_tokens": 800, "cost_usd": 0.01}
+
+
+def _record(telemetry: Telemetry) -> None:
+    telemetry.record_llm_call("anthropic/claude", 0.8, USAGE, session="telegram:42", iteration=1)
+    telemetry.record_llm_call("anthropic/claude", 2.0, USAGE, session="telegram:42", iteration=2)
+    telemetry.record_tool("exec", 0.3)
+    telemetry.record_tool("exec", 0.1, ok=False)
+    telemetry.record_turn("telegram:42", 2, 3.2, {"prompt_tokens": 2000, "completion_tokens": 100})
+
+
+def test_prometheus_rendering() -> None:
+    telemetry = Telemetry()
+    _record(telemetry)
+    text = telemetry.render_prometheus()
+
+    assert 'nanobot_llm_calls_total{channel="telegram",model="anthropic/claude",status="ok"} 2' in text
+    assert 'nanobot_llm_tokens_total{channel="telegram",kind="cache_read",model="anthropic/claude"} 1600' in text
+    assert 'nanobot_llm_latency_seconds_bucket{model="anthropic/claude",le="1"} 1' in text
+    assert 'nanobot_llm_latency_seconds_bucket{model="anthropic/claude",le="+Inf"} 2' in text
+    assert 'nanobot_tool_calls_total{status="error",tool="exec"} 1' in text
+    assert 'nanobot_turn_iterations_total{channel="telegram"} 2' in text
+
+
+def test_log_rotation_and_summary(tmp_path) -> None:
+    log = tmp_path / "events.jsonl"
+    telemetry = Telemetry(log, max_bytes=600, backups=2)
+    for _ in range(4):
+        _record(telemetry)
+
+    assert (tmp_path / "events.jsonl.1").exists() and not (tmp_path / "events.jsonl.3").exists()
+    events = list(iter_events(log))
+    assert [json.loads(line)["type"] for line in log.read_text().splitlines()][-1] == events[-1]["type"] == "turn"
+
+    summary = summarize(iter({"type": t, **e} for t, e in [
+        ("llm", {"model": "m", "latency_ms": 100.0, "session": "cli:direct", "channel": "cli", **USAGE}),
+        ("llm", {"model": "m", "latency_ms": 300.0, "session": "cli:direct", "channel": "cli", **USAGE}),
+        ("turn", {"session": "cli:direct", "channel": "cli", "iterations": 2}),
+        ("tool", {"tool": "exec", "duration_ms": 50.0, "ok": False}),
+    ]))
+    assert summary["llm_calls"] == 2 and summary["turns"] == 1 and summary["avg_iterations"] == 2
+    assert summary["tokens"]["cache_read_tokens"] == 1600 and summary["cost_usd"] == pytest.approx(0.02)
+    assert summary["latency_ms"]["m"]["p50"] == 100.0 and summary["latency_ms"]["m"]["p95"] == 300.0
+    assert summary["by_channel"]["cli"] == {"tokens": 2100, "cost_usd": pytest.approx(0.02), "turns": 1}
+    assert summary["tools"]["exec"]["errors"] == 1
+    assert percentile([], 50) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint() -> None:
+    telemetry = Telemetry()
+    _record(telemetry)
+    server = MetricsServer(telemetry, port=0)
+    await server.start()
+    try:
+        responses = {}
+        for path in ("/metrics", "/other"):
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: x\r\n\r\n".encode())
+            responses[path] = await reader.read()
+            writer.close()
+        assert responses["/metrics"].startswith(b"HTTP/1.1 200 OK")
+        assert b"nanobot_turns_total" in responses["/metrics"]
+        assert responses["/other"].startswith(b"HTTP/1.1 404")
+    finally:
+        await server.stop()
+
+
+def test_stats_command(tmp_path) -> None:
+    config = Config()
+    config.agents.defaults.workspace = str(tmp_path)
+    _record(Telemetry(tmp_path / "telemetry" / "events.jsonl"))
+
+    with patch("nanobot.config.loader.load_config", return_value=config):
+        result = CliRunner().invoke(app, ["stats", "--days", "0"])
+
+    assert result.exit_code == 0, result.output
+    assert "LLM calls: 2" in result.output and "1,600 cache read" in result.output
+    assert "telegram:42" in result.output and "exec" in result.output
@@ -0,0 +1,122 @@
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+
+from nanobot.agent.loop import AgentLoop
+from nanobot.agent.tool_index import ToolIndex
+from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.registry import ToolRegistry
+from nanobot.agent.tools.request_tools import RequestToolsTool
+from nanobot.bus.events import InboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.config.schema import ToolSelectionConfig
+from nanobot.providers.base import LLMResponse, ToolCallRequest
+
+
+class _McpLike(Tool):
+    def __init__(self, name: str, description: str, params: tuple[str, ...] = ()):
+        self._name, self._description = name, description
+        self._params = {p: {"type": "string"} for p in params}
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def description(self) -> str:
+        return self._description
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {"type": "object", "properties": self._params}
+
+    async def execute(self, **kwargs: Any) -> str:
+        return f"{self._name} done"
+
+
+TOOLS = [
+    _McpLike("mcp_github_createIssue", "Create a new issue in a GitHub repository", ("repo", "title")),
+    _McpLike("mcp_github_listPullRequests", "List open pull requests of a repository", ("repo",)),
+    _McpLike("mcp_calendar_create_event", "Add an event to the user's calendar", ("start", "title")),
+    _McpLike("mcp_weather_forecast", "Weather forecast for a city", ("city",)),
+]
+
+
+def _registry() -> ToolRegistry:
+    registry = ToolRegistry()
+    for tool in TOOLS:
+        registry.register(tool)
+    return registry
+
+
+def test_index_ranks_by_name_and_description() -> None:
+    index = ToolIndex(_registry())
+
+    assert index.rank("open an issue on github")[0][0] == "mcp_github_createIssue"
+    assert index.rank("what's the forecast in Porto?")[0][0] == "mcp_weather_forecast"
+    assert index.rank("zzz") == []
+
+    picked = index.select("github issue", core={"mcp_weather_forecast"}, top_k=1)
+    assert picked == {"mcp_weather_forecast", "mcp_github_createIssue"}
+    assert index.select("github issue", core=set(), token_budget=5) == set()
+
+
+def test_index_follows_registry_changes() -> None:
+    registry = _registry()
+    index = ToolIndex(registry)
+    assert index.rank("stock price") == []
+
+    registry.register(_McpLike("mcp_finance_quote", "Current stock price for a ticker"))
+    assert index.rank("stock price")[0][0] == "mcp_finance_quote"
+    subset = registry.get_definitions({"mcp_finance_quote", "mcp_github_createIssue"})
+    assert [d["function"]["name"] for d in subset] == ["mcp_github_createIssue", "mcp_finance_quote"]
+    assert registry.get_definitions({"mcp_github_createIssue", "mcp_finance_quote"}) is subset
+
+
+@pytest.mark.asyncio
+async def test_request_tools_enables_matches() -> None:
+    registry = _registry()
+    tool = RequestToolsTool(ToolIndex(registry))
+    exposed = {"mcp_weather_forecast"}
+    tool.start_turn(exposed)
+
+    out = await tool.execute(query="calendar event", names=["mcp_weather_forecast", "nope"])
+    assert "mcp_calendar_create_event (enabled)" in out and "(already available)" in out and "nope" in out
+    assert "mcp_calendar_create_event" in exposed
+
+
+@pytest.mark.asyncio
+async def test_agent_loop_offers_subset_and_requested_tools(tmp_path: Path) -> None:
+    provider = MagicMock()
+    provider.get_default_model.return_value = "test-model"
+    loop = AgentLoop(
+        bus=MessageBus(), provider=provider, workspace=tmp_path, model="test-model",
+        tool_selection=ToolSelectionConfig(enabled=True, top_k=1, core_tools=["read_file"]),
+    )
+    for tool in TOOLS:
+        loop.tools.register(tool)
+
+    offered: list[set[str]] = []
+    responses = iter([
+        LLMResponse(content=None, tool_calls=[
+            ToolCallRequest(id="1", name="request_tools", arguments={"query": "calendar"}),
+        ]),
+        LLMResponse(content="Done"),
+    ])
+
+    async def chat(tools=None, **kwargs):
+        offered.append({t["function"]["name"] for t in tools})
+        return next(responses)
+
+    provider.chat = chat
+    msg = InboundMessage(channel="cli", sender_id="u", chat_id="direct", content="file a github issue")
+
+    async def _progress(*args, **kwargs) -> None:
+        pass
+
+    await loop._process_message(msg, on_progress=_progress)
+
+    assert offered[0] == {"read_file", "request_tools", "mcp_github_createIssue"}
+    assert offered[1] == offered[0] | {"mcp_calendar_create_event"}
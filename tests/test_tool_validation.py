@@ -1,3 +1,4 @@
+import json
 from typing import Any
 
 from nanobot.agent.tools.base import Tool
@@ -89,6 +90,35 @@ async def test_registry_returns_validation_error() -> None:
     assert "Invalid parameters" in result
 
 
+def test_registry_caches_definitions_until_tools_change() -> None:
+    reg = ToolRegistry()
+    reg.register(SampleTool())
+    defs, version = reg.get_definitions(), reg.version
+    assert reg.get_definitions() is defs
+    assert json.loads(reg.get_definitions_json()) == defs
+
+    reg.unregister("missing")
+    assert reg.version == version and reg.get_definitions() is defs
+
+    reg.register(ExecTool())
+    assert reg.version == version + 1
+    assert [d["function"]["name"] for d in reg.get_definitions()] == ["sample", "exec"]
+    assert '"exec"' in reg.get_definitions_json()
+
+    reg.unregister("exec")
+    assert reg.version == version + 2 and reg.get_definitions() == defs
+
+
+def test_sizing_a_subset_keeps_the_cached_subset() -> None:
+    reg = ToolRegistry()
+    reg.register(SampleTool())
+    reg.register(ExecTool())
+    sample_json = json.dumps(reg.get_definitions(["sample"])[0], ensure_ascii=False)
+    offered = reg.get_definitions(["sample", "exec"])
+    assert reg.definitions_tokens(["sample", "missing"], 4.0) == -(-len(sample_json) // 4)
+    assert reg.get_definitions(["exec", "sample"]) is offered
+
+
 def test_exec_extract_absolute_paths_keeps_full_windows_path() -> None:
     cmd = r"type C:\user\workspace\txt"
     paths = ExecTool._extract_absolute_paths(cmd)
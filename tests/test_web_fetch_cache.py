@@ -0,0 +1,134 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from loguru import logger
+
+from nanobot.agent.tools.web import WebFetchTool
+from nanobot.agent.tools.web_cache import WebFetchCache
+
+
+class _Pool:
+    """Stand-in for HttpClientPool that routes requests to a handler."""
+
+    def __init__(self, handler):
+        self.requests: list[httpx.Request] = []
+
+        async def record(request: httpx.Request) -> httpx.Response:
+            self.requests.append(request)
+            return await handler(request)
+
+        self.client = httpx.AsyncClient(transport=httpx.MockTransport(record))
+
+    def get(self, proxy=None, verify=True):
+        return self.client
+
+
+def _page(body: str, **headers: str) -> httpx.Response:
+    return httpx.Response(200, text=body, headers={"content-type": "text/plain", **headers})
+
+
+@pytest.mark.asyncio
+async def test_fresh_entry_served_without_request(tmp_path) -> None:
+    async def handler(request):
+        return _page("hello", **{"cache-control": "max-age=600"})
+
+    pool = _Pool(handler)
+    tool = WebFetchTool(http_pool=pool, cache=WebFetchCache(tmp_path))
+
+    first = json.loads(await tool.execute("https://example.com/a"))
+    second = json.loads(await tool.execute("https://example.com/a", maxChars=3))
+
+    assert first["cache"] == "miss" and first["text"] == "hello"
+    assert second["cache"] == "hit" and second["text"] == "hel" and second["truncated"]
+    assert len(pool.requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_stats_are_logged(tmp_path) -> None:
+    async def handler(request):
+        return _page("hello", **{"cache-control": "max-age=600"})
+
+    tool = WebFetchTool(http_pool=_Pool(handler), cache=WebFetchCache(tmp_path))
+    messages: list[str] = []
+    sink = logger.add(messages.append, level="DEBUG", format="{message}")
+    try:
+        await tool.execute("https://example.com/a")
+        await tool.execute("https://example.com/a")
+    finally:
+        logger.remove(sink)
+
+    stats = [m.strip() for m in messages if m.startswith("WebFetch cache")]
+    assert stats[-1].startswith("WebFetch cache hit for https://example.com/a (hit rate 50%, 1 entries,")
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_revalidated_with_etag(tmp_path) -> None:
+    async def handler(request):
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304, headers={"etag": '"v1"'})
+        return _page("body", etag='"v1"', **{"cache-control": "no-cache"})
+
+    pool = _Pool(handler)
+    cache = WebFetchCache(tmp_path)
+    tool = WebFetchTool(http_pool=pool, cache=cache)
+
+    await tool.execute("https://example.com/b")
+    result = json.loads(await tool.execute("https://example.com/b"))
+
+    assert result["cache"] == "revalidated" and result["text"] == "body"
+    assert pool.requests[1].headers["if-none-match"] == '"v1"'
+    assert cache.report()["miss"] == 1
+
+
+@pytest.mark.asyncio
+async def test_no_store_and_validatorless_responses_not_cached(tmp_path) -> None:
+    async def handler(request):
+        if request.url.path == "/ns":
+            return _page("x", **{"cache-control": "no-store, max-age=60"})
+        return _page("y")
+
+    cache = WebFetchCache(tmp_path)
+    tool = WebFetchTool(http_pool=_Pool(handler), cache=cache)
+    await tool.execute("https://example.com/ns")
+    await tool.execute("https://example.com/plain")
+
+    assert cache.report()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_fetches_collapse(tmp_path) -> None:
+    release = asyncio.Event()
+
+    async def handler(request):
+        await release.wait()
+        return _page("shared", **{"cache-control": "max-age=60"})
+
+    pool = _Pool(handler)
+    cache = WebFetchCache(tmp_path)
+    tool = WebFetchTool(http_pool=pool, cache=cache)
+
+    tasks = [asyncio.create_task(tool.execute("https://example.com/c")) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = [json.loads(r) for r in await asyncio.gather(*tasks)]
+
+    assert len(pool.requests) == 1
+    assert sorted(r["cache"] for r in results) == ["collapsed", "collapsed", "miss"]
+    assert cache.report()["collapsed"] == 2
+
+
+def test_lru_eviction_and_persistence(tmp_path) -> None:
+    cache = WebFetchCache(tmp_path, max_bytes=600)
+    entry = {"page": {"text": "x" * 200}, "fresh_until": 0}
+    cache.put("a", entry)
+    cache.put("b", entry)
+    assert cache.get("a") is not None  # a is now most recently used
+    cache.put("c", entry)
+
+    assert cache.get("b") is None
+    assert cache.report()["evicted"] == 1
+
+    reopened = WebFetchCache(tmp_path, max_bytes=600)
+    assert reopened.get("a") is not None and reopened.get("c") is not None
@@ -0,0 +1,107 @@
+import asyncio
+import json
+import threading
+
+import httpx
+import pytest
+
+import nanobot.agent.tools.web as web
+from nanobot.agent.tools.web import WebFetchTool
+
+
+class _Pool:
+    def __init__(self, handler):
+        self.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    def get(self, proxy=None, verify=True):
+        return self.client
+
+
+@pytest.mark.asyncio
+async def test_download_stops_at_byte_cap() -> None:
+    async def handler(request):
+        return httpx.Response(200, content=b"a" * 10_000, headers={"content-type": "text/plain"})
+
+    tool = WebFetchTool(http_pool=_Pool(handler), max_download_bytes=1000)
+    result = json.loads(await tool.execute("https://example.com/big"))
+
+    assert result["downloadCapped"] is True
+    assert result["length"] == 1000
+
+
+@pytest.mark.asyncio
+async def test_html_extraction_runs_off_event_loop(monkeypatch) -> None:
+    seen: list[bool] = []
+    real = web._extract_text
+
+    def spy(*args):
+        seen.append(threading.current_thread() is threading.main_thread())
+        return real(*args)
+
+    monkeypatch.setattr(web, "_extract_text", spy)
+
+    async def handler(request):
+        html = "<html><head><title>T</title></head><body><article><h1>Hi</h1><p>Body text here.</p></article></body></html>"
+        return httpx.Response(200, text=html, headers={"content-type": "text/html"})
+
+    result = json.loads(await WebFetchTool(http_pool=_Pool(handler)).execute("https://example.com/"))
+
+    assert seen == [False]
+    assert result["extractor"] == "readability" and "Body text here." in result["text"]
+
+
+@pytest.mark.asyncio
+async def test_extraction_timeout_reports_error(monkeypatch) -> None:
+    release = threading.Event()
+
+    def slow(*args):
+        release.wait(5)
+        return "", "raw"
+
+    monkeypatch.setattr(web, "_extract_text", slow)
+
+    async def handler(request):
+        return httpx.Response(200, text="x", headers={"content-type": "text/plain"})
+
+    tool = WebFetchTool(http_pool=_Pool(handler), extract_timeout=0.05)
+    try:
+        result = json.loads(await tool.execute("https://example.com/slow"))
+    finally:
+        release.set()
+
+    assert "timed out" in result["error"]
+    await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_stuck_workers_fail_fast(monkeypatch) -> None:
+    release = threading.Event()
+    real = web._extract_text
+
+    def maybe_slow(body, *args):
+        if body == "slow":
+            release.wait(5)
+        return real(body, *args)
+
+    monkeypatch.setattr(web, "_extract_text", maybe_slow)
+    monkeypatch.setattr(web, "_extract_pool", None)
+    monkeypatch.setattr(web, "_extract_stuck", set())
+
+    async def handler(request):
+        return httpx.Response(200, text=request.url.path.strip("/"), headers={"content-type": "text/plain"})
+
+    tool = WebFetchTool(http_pool=_Pool(handler), extract_timeout=0.05)
+    try:
+        for _ in range(web.EXTRACT_WORKERS):
+            assert "timed out" in json.loads(await tool.execute("https://example.com/slow"))["error"]
+
+        result = json.loads(await asyncio.wait_for(tool.execute("https://example.com/fast"), timeout=1))
+        assert "workers are still busy" in result["error"]
+    finally:
+        release.set()
+
+    for _ in range(100):
+        if not web._extract_stuck:
+            break
+        await asyncio.sleep(0.01)
+    assert json.loads(await tool.execute("https://example.com/fast"))["text"] == "fast"
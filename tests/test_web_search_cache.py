@@ -0,0 +1,63 @@
+import time
+
+import httpx
+import pytest
+
+from nanobot.agent.tools.web import WebSearchTool
+from nanobot.agent.tools.web_cache import WebSearchCache, normalize_query
+from nanobot.utils.http import RateLimiter
+
+
+class _Pool:
+    def __init__(self):
+        self.calls = 0
+
+        async def handler(request):
+            self.calls += 1
+            q = request.url.params["q"]
+            return httpx.Response(200, json={"web": {"results": [{"title": q, "url": "https://x", "description": "d"}]}})
+
+        self.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    def get(self, proxy=None, verify=True):
+        return self.client
+
+
+def test_normalize_query() -> None:
+    assert normalize_query("  Python\tAsyncIO  ") == normalize_query("python asyncio")
+
+
+@pytest.mark.asyncio
+async def test_repeated_query_served_from_cache(tmp_path) -> None:
+    pool = _Pool()
+    cache = WebSearchCache(tmp_path / "search.json", ttl=60)
+    tool = WebSearchTool(api_key="k", http_pool=pool, cache=cache)
+
+    first = await tool.execute("Nanobot  Agents", count=3)
+    second = await tool.execute("nanobot agents", count=3)
+    await tool.execute("nanobot agents", count=4)
+
+    assert first.splitlines()[1:] == second.splitlines()[1:]
+    assert pool.calls == 2
+    assert cache.stats == {"hit": 1, "miss": 2}
+
+
+@pytest.mark.asyncio
+async def test_cache_persists_and_expires(tmp_path) -> None:
+    path = tmp_path / "search.json"
+    WebSearchCache(path, ttl=60).put("q", 5, [{"title": "t"}])
+
+    assert WebSearchCache(path, ttl=60).get("Q", 5) == [{"title": "t"}]
+
+    expired = WebSearchCache(path, ttl=60)
+    expired._load()["5:q"]["stored_at"] = time.time() - 61
+    assert expired.get("q", 5) is None
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_spaces_requests() -> None:
+    limiter = RateLimiter(rate=20, burst=1)
+    start = time.monotonic()
+    for _ in range(3):
+        await limiter.acquire()
+    assert time.monotonic() - start >= 0.09